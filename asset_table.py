@@ -0,0 +1,255 @@
+# asset_table.py
+
+"""
+扫描结果的紧凑表示：
+  - AssetRecord: 使用 __slots__ 的单条资产记录，插件直接构造它而不是七个中文键的字典；
+  - AssetTable: 按列存储的资产表，类别与品牌采用字典编码（驻留字符串 + 整数编码），
+    通过 AssetRow 视图按行访问而不复制数据。
+
+AssetRecord 与 AssetRow 都实现了只读的 Mapping 接口（键为中文字段名），
+因此 csv.DictWriter、导出插件和 Snipe-IT 同步中 row['型号']、row.get('序列号')、row.items() 等写法保持不变。
+ASSET_FIELDS 以外的键（旧插件或快照中的附加字段）保存在 extras 中，按行读取和转换成字典时原样保留；
+按列导出（iter_tuples、columns）只包含 ASSET_FIELDS。
+"""
+
+import itertools
+import sys
+from array import array
+from collections.abc import Mapping
+
+# 报告中的字段顺序，也是导出文件的列顺序
+ASSET_FIELDS = ('类别', '品牌', '型号', '大小', '序列号', '生产日期', '保修查询链接')
+# 中文字段名 -> AssetRecord 的属性名
+FIELD_ATTRIBUTES = {
+    '类别': 'category',
+    '品牌': 'brand',
+    '型号': 'model',
+    '大小': 'size',
+    '序列号': 'serial',
+    '生产日期': 'production_date',
+    '保修查询链接': 'warranty_url',
+}
+# 取值高度重复的字段，在 AssetTable 中做字典编码
+DICTIONARY_FIELDS = ('类别', '品牌')
+DEFAULT_VALUE = 'N/A'
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class AssetRecord(Mapping):
+    """
+    一条硬件资产记录。类别和品牌会被驻留，大量同类记录共享同一个字符串对象。
+    未提供的字段默认为 'N/A'，与插件原先手写的字典一致；extras 为 ASSET_FIELDS 以外的附加字段（没有时为 None）。
+    """
+
+    __slots__ = tuple(FIELD_ATTRIBUTES.values()) + ('extras',)
+
+    def __init__(self, category, brand=DEFAULT_VALUE, model=DEFAULT_VALUE, size=DEFAULT_VALUE,
+                 serial=DEFAULT_VALUE, production_date=DEFAULT_VALUE, warranty_url=DEFAULT_VALUE, extras=None):
+        self.category = _intern(category)
+        self.brand = _intern(brand)
+        self.model = model
+        self.size = size
+        self.serial = serial
+        self.production_date = production_date
+        self.warranty_url = warranty_url
+        self.extras = dict(extras) if extras else None
+
+    @classmethod
+    def from_mapping(cls, row):
+        """旧插件返回的字典（或快照缓存中反序列化的字典）到 AssetRecord 的适配器。"""
+        if isinstance(row, cls):
+            return row
+        return cls(*(row.get(field, DEFAULT_VALUE) for field in ASSET_FIELDS), extras=extra_fields(row))
+
+    def values_tuple(self):
+        return (self.category, self.brand, self.model, self.size, self.serial, self.production_date,
+                self.warranty_url)
+
+    def __getitem__(self, field):
+        attribute = FIELD_ATTRIBUTES.get(field)
+        if attribute is not None:
+            return getattr(self, attribute)
+        if self.extras and field in self.extras:
+            return self.extras[field]
+        raise KeyError(field)
+
+    def __iter__(self):
+        if self.extras:
+            return itertools.chain(ASSET_FIELDS, self.extras)
+        return iter(ASSET_FIELDS)
+
+    def __len__(self):
+        return len(ASSET_FIELDS) + (len(self.extras) if self.extras else 0)
+
+    def __repr__(self):
+        extras = f", extras={self.extras!r}" if self.extras else ""
+        return f"AssetRecord({', '.join(repr(value) for value in self.values_tuple())}{extras})"
+
+
+class AssetRow(Mapping):
+    """AssetTable 中某一行的只读视图，读取时直接访问列数据，不复制。"""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, field):
+        return self._table.value(self._index, field)
+
+    @property
+    def extras(self):
+        return self._table._extras.get(self._index)
+
+    def __iter__(self):
+        extras = self.extras
+        if extras:
+            return itertools.chain(ASSET_FIELDS, extras)
+        return iter(ASSET_FIELDS)
+
+    def __len__(self):
+        extras = self.extras
+        return len(ASSET_FIELDS) + (len(extras) if extras else 0)
+
+    def values_tuple(self):
+        return tuple(self._table.value(self._index, field) for field in ASSET_FIELDS)
+
+    def __repr__(self):
+        return f"AssetRow({self._index}, {dict(self)!r})"
+
+
+class AssetTable:
+    """
+    按列存储的资产表。类别和品牌列保存为整数编码（array('I')）与去重后的取值表，
+    其它列各自是一个列表；迭代或下标访问返回 AssetRow 视图。
+    ASSET_FIELDS 以外的附加字段按行号稀疏地保存在 _extras 中（{行号: {字段名: 值}}）。
+    可以像列表一样使用：len()、真值判断、for 循环、table[i]。
+    """
+
+    def __init__(self, rows=()):
+        self._codes = {field: array('I') for field in DICTIONARY_FIELDS}
+        self._pools = {field: [] for field in DICTIONARY_FIELDS}
+        self._pool_index = {field: {} for field in DICTIONARY_FIELDS}
+        self._columns = {field: [] for field in ASSET_FIELDS if field not in DICTIONARY_FIELDS}
+        self._extras = {}
+        self.extend(rows)
+
+    @classmethod
+    def coerce(cls, rows):
+        """已经是 AssetTable 时原样返回，否则（字典列表、AssetRecord 列表等）构造一个新表。"""
+        return rows if isinstance(rows, cls) else cls(rows)
+
+    def append(self, row):
+        """
+        追加一行；接受 AssetRecord、AssetRow 或任何以中文字段名为键的映射（旧插件返回的字典）。
+        映射中 ASSET_FIELDS 以外的键作为该行的附加字段保留。
+        """
+        if isinstance(row, (AssetRecord, AssetRow)):
+            values, extras = row.values_tuple(), row.extras
+        else:
+            values, extras = tuple(row.get(field, DEFAULT_VALUE) for field in ASSET_FIELDS), extra_fields(row)
+        if extras:
+            self._extras[len(self)] = dict(extras)
+        for field, value in zip(ASSET_FIELDS, values):
+            if field in self._codes:
+                self._codes[field].append(self._encode(field, value))
+            else:
+                self._columns[field].append(value)
+
+    def extend(self, rows):
+        for row in rows or ():
+            self.append(row)
+
+    def _encode(self, field, value):
+        index = self._pool_index[field]
+        code = index.get(value)
+        if code is None:
+            code = len(self._pools[field])
+            self._pools[field].append(_intern(value))
+            index[value] = code
+        return code
+
+    def value(self, index, field):
+        if field in self._codes:
+            return self._pools[field][self._codes[field][index]]
+        column = self._columns.get(field)
+        if column is not None:
+            return column[index]
+        extras = self._extras.get(index)
+        if extras and field in extras:
+            return extras[field]
+        raise KeyError(field)
+
+    def column(self, field):
+        """返回一列数据。普通列直接返回内部列表（调用方不应修改）；字典编码的列按需解码成新列表。"""
+        if field in self._codes:
+            pool = self._pools[field]
+            return [pool[code] for code in self._codes[field]]
+        return self._columns[field]
+
+    def columns(self):
+        """{字段名: 列数据}，字段按 ASSET_FIELDS 排序，可直接交给 pandas.DataFrame 或按列写出。"""
+        return {field: self.column(field) for field in ASSET_FIELDS}
+
+    def distinct(self, field):
+        """字典编码列中出现过的所有取值（按首次出现顺序）。"""
+        return list(self._pools[field])
+
+    def iter_tuples(self):
+        """按行产出与 ASSET_FIELDS 顺序一致的元组，适合 csv.writer 等按行写出的场景。"""
+        columns = [self._codes[field] if field in self._codes else self._columns[field] for field in ASSET_FIELDS]
+        pools = [self._pools.get(field) for field in ASSET_FIELDS]
+        for values in zip(*columns):
+            yield tuple(pool[value] if pool is not None else value for pool, value in zip(pools, values))
+
+    def iter_items(self):
+        """按行产出 (字段名, 值) 列表，先 ASSET_FIELDS 后附加字段，与迭代 AssetRow 的 items() 顺序一致。"""
+        extras = self._extras
+        for index, values in enumerate(self.iter_tuples()):
+            items = list(zip(ASSET_FIELDS, values))
+            if index in extras:
+                items.extend(extras[index].items())
+            yield items
+
+    def to_dicts(self):
+        """转换为普通字典列表（含附加字段），用于 JSON 序列化。"""
+        rows = [dict(zip(ASSET_FIELDS, values)) for values in self.iter_tuples()]
+        for index, extras in self._extras.items():
+            rows[index].update(extras)
+        return rows
+
+    def __len__(self):
+        return len(self._columns['型号'])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [AssetRow(self, i) for i in range(*index.indices(len(self)))]
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("AssetTable index out of range")
+        return AssetRow(self, index)
+
+    def __iter__(self):
+        return (AssetRow(self, i) for i in range(len(self)))
+
+    def __repr__(self):
+        return f"<AssetTable {len(self)} rows>"
+
+
+def extra_fields(row):
+    """映射中 ASSET_FIELDS 以外的键值，没有时返回 None。"""
+    extras = {key: value for key, value in row.items() if key not in FIELD_ATTRIBUTES}
+    return extras or None
+
+
+def rows_to_dicts(rows):
+    """把 AssetTable、AssetRecord 列表或字典列表统一转换成普通字典列表。"""
+    if isinstance(rows, AssetTable):
+        return rows.to_dicts()
+    return [dict(row) for row in rows]
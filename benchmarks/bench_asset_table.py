@@ -0,0 +1,75 @@
+# benchmarks/bench_asset_table.py
+
+"""
+资产数据内存基准测试：模拟汇总大量机器的扫描结果，比较三种表示的内存占用与构造耗时：
+  - 每行一个中文键字典（旧做法）
+  - AssetRecord 列表
+  - AssetTable 列存储
+
+用法:
+    python benchmarks/bench_asset_table.py --rows 200000
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_table import AssetRecord, AssetTable  # noqa: E402
+
+CATEGORIES = ('CPU', '内存', '硬盘', '显卡', '网卡', '显示器', '键盘', '鼠标', '主板/整机', '操作系统')
+BRANDS = ('Intel', 'Samsung', 'Kingston', 'Dell Inc.', 'Lenovo', 'HP', 'Logitech', 'Microsoft')
+
+
+def row_values(i):
+    # 每次调用都生成新的字符串对象，模拟从 WMI 读取到的独立取值
+    return (''.join(CATEGORIES[i % len(CATEGORIES)]), ''.join(BRANDS[i % len(BRANDS)]), f"Model-{i % 500:04d}",
+            'N/A', f"SN{i:010d}", 'N/A', 'N/A')
+
+
+def build_dicts(count):
+    fields = ('类别', '品牌', '型号', '大小', '序列号', '生产日期', '保修查询链接')
+    return [dict(zip(fields, row_values(i))) for i in range(count)]
+
+
+def build_records(count):
+    return [AssetRecord(*row_values(i)) for i in range(count)]
+
+
+def build_table(count):
+    table = AssetTable()
+    for i in range(count):
+        table.append(AssetRecord(*row_values(i)))
+    return table
+
+
+def measure(builder, count):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = builder(count)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="资产数据内存基准测试")
+    parser.add_argument('--rows', type=int, default=200000)
+    args = parser.parse_args()
+
+    print(f"行数: {args.rows}")
+    baseline = None
+    for label, builder in (("字典列表", build_dicts), ("AssetRecord 列表", build_records), ("AssetTable", build_table)):
+        result, elapsed, memory = measure(builder, args.rows)
+        baseline = baseline or memory
+        print(f"{label}: 内存 {memory / 1024 / 1024:.1f}MB ({memory / baseline:.0%}), "
+              f"每行 {memory / args.rows:.0f} 字节, 构造耗时 {elapsed:.2f}s")
+        del result
+
+
+if __name__ == "__main__":
+    main()
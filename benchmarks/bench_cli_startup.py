@@ -0,0 +1,46 @@
+# benchmarks/bench_cli_startup.py
+
+"""
+命令行入口启动时间基准测试：多次以子进程运行 `cli.py --list`，统计墙钟时间，
+并检查导入 cli 后没有加载任何 GUI 模块。
+
+用法:
+    python benchmarks/bench_cli_startup.py --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+GUI_MODULES = ('PySide6', 'pywinstyles', 'win32print', 'winreg', 'main')
+
+CHECK_IMPORTS = (
+    "import sys, cli; "
+    f"print(','.join(m for m in {GUI_MODULES!r} if m in sys.modules))"
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="命令行入口启动时间基准测试")
+    parser.add_argument('--runs', type=int, default=10)
+    args = parser.parse_args()
+
+    loaded = subprocess.run([sys.executable, '-c', CHECK_IMPORTS], cwd=ROOT_DIR, capture_output=True,
+                            text=True).stdout.strip()
+    print(f"导入 cli 后加载的 GUI 模块: {loaded or '无'}")
+
+    timings = []
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, 'cli.py', '--list'], cwd=ROOT_DIR, capture_output=True)
+        timings.append(time.perf_counter() - start)
+    print(f"cli.py --list 运行 {args.runs} 次: 中位数 {statistics.median(timings):.3f}s, "
+          f"最快 {min(timings):.3f}s, 最慢 {max(timings):.3f}s")
+
+
+if __name__ == "__main__":
+    main()
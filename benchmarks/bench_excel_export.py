@@ -0,0 +1,123 @@
+# benchmarks/bench_excel_export.py
+
+"""
+Excel 导出基准测试：对同一份资产表，比较旧版导出（pandas DataFrame + openpyxl 普通工作簿，
+写完后再多次遍历工作表设置格式）与流式只写导出的耗时和峰值内存（tracemalloc）。
+安装 lxml 时 openpyxl 会用它序列化 XML，两者的耗时都会明显下降。
+两种方式写出的单元格值、超链接与列宽会被读回比对。
+
+用法:
+    python benchmarks/bench_excel_export.py --rows 200000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_table import ASSET_FIELDS, AssetRecord, AssetTable  # noqa: E402
+from plugins.export_excel import ExcelExportPlugin, sanitize_for_excel  # noqa: E402
+
+CATEGORIES = ('CPU', '内存', '硬盘', '显卡', '网卡', '显示器', '键盘', '鼠标', '主板/整机', '操作系统')
+BRANDS = ('Intel', 'Samsung', 'Kingston', 'Dell Inc.', 'Lenovo', 'HP', 'Logitech', 'Microsoft')
+HEADER_TEXT = '2024 年度资产盘点 - 信息部'
+
+
+def make_table(count):
+    table = AssetTable()
+    for i in range(count):
+        url = f"https://pcsupport.lenovo.com/warranty?sn=SN{i:010d}" if i % 10 == 8 else 'N/A'
+        table.append(AssetRecord(CATEGORIES[i % len(CATEGORIES)], BRANDS[i % len(BRANDS)],
+                                 f"Model-{i % 500:04d}\x0b" if i % 1000 == 0 else f"Model-{i % 500:04d}",
+                                 f"{8 * (i % 4 + 1)} GB", f"SN{i:010d}", '2023-01-01', url))
+    return table
+
+
+def legacy_export(data, file_path, header_text, log_callback):
+    """v1.1 的导出实现，作为对照。"""
+    import pandas as pd
+    from openpyxl.styles import Alignment, Font
+    from openpyxl.utils import get_column_letter
+
+    df = pd.DataFrame(AssetTable.coerce(data).columns(), columns=list(ASSET_FIELDS))
+    df = df.map(sanitize_for_excel)
+    start_row = 1 if header_text else 0
+    with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
+        df.to_excel(writer, index=False, sheet_name='电脑配置信息', startrow=start_row)
+        worksheet = writer.sheets['电脑配置信息']
+        if header_text:
+            worksheet.merge_cells(f'A1:{get_column_letter(df.shape[1])}1')
+            header_cell = worksheet['A1']
+            header_cell.value = header_text
+            header_cell.font = Font(name='微软雅黑', size=14, bold=True, color="808080")
+            header_cell.alignment = Alignment(horizontal='center', vertical='center')
+        for cell in worksheet[start_row + 1]:
+            cell.font = Font(bold=True)
+        alignment = Alignment(horizontal='left', vertical='center')
+        for row_cells in worksheet.iter_rows(min_row=start_row + 1):
+            for cell in row_cells:
+                cell.alignment = alignment
+                if isinstance(cell.value, str) and 'http' in cell.value:
+                    cell.font = Font(color="0000FF", underline="single")
+                    cell.hyperlink = cell.value
+        for col_idx, column in enumerate(worksheet.columns, 1):
+            max_length = 0
+            for cell in column:
+                if len(str(cell.value)) > max_length:
+                    max_length = len(str(cell.value))
+            worksheet.column_dimensions[get_column_letter(col_idx)].width = min((max_length + 2) * 1.2, 60)
+    return file_path
+
+
+def measure(export, table, file_path):
+    """先不开 tracemalloc 计时（它会显著拖慢纯 Python 的 XML 序列化），再单独运行一次统计峰值内存。"""
+    start = time.perf_counter()
+    export(table, file_path, HEADER_TEXT, lambda message: None)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    export(table, file_path, HEADER_TEXT, lambda message: None)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def read_back(file_path):
+    from openpyxl import load_workbook
+    worksheet = load_workbook(file_path).active
+    values = [tuple(cell.value for cell in row) for row in worksheet.iter_rows()]
+    links = sorted((cell.coordinate, cell.hyperlink.target) for row in worksheet.iter_rows()
+                   for cell in row if cell.hyperlink)
+    widths = {letter: round(dimension.width, 1) for letter, dimension in worksheet.column_dimensions.items()}
+    return values, links, widths, [str(ref) for ref in worksheet.merged_cells.ranges]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel 导出基准测试")
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--skip-legacy', action='store_true', help="只测试流式导出")
+    args = parser.parse_args()
+
+    table = make_table(args.rows)
+    print(f"行数: {args.rows}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        exports = [("流式只写", ExcelExportPlugin().export)]
+        if not args.skip_legacy:
+            exports.insert(0, ("旧版 (pandas + 普通工作簿)", legacy_export))
+        paths = []
+        for label, export in exports:
+            path = os.path.join(temp_dir, f"{len(paths)}.xlsx")
+            elapsed, peak = measure(export, table, path)
+            paths.append(path)
+            print(f"{label}: 耗时 {elapsed:.2f}s, 峰值内存 {peak / 1024 / 1024:.1f}MB, "
+                  f"文件 {os.path.getsize(path) / 1024 / 1024:.1f}MB")
+        if len(paths) == 2 and args.rows <= 50000:
+            same = read_back(paths[0]) == read_back(paths[1])
+            print(f"输出一致: {'是' if same else '否'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# benchmarks/bench_fleet_scan.py
+
+"""
+批量远程扫描基准测试：使用假连接器模拟一批主机（其中一部分不可达、一部分很慢），
+在不同的主机并发数下运行 FleetScanner，报告每分钟完成的主机数。
+
+用法:
+    python benchmarks/bench_fleet_scan.py --hosts 60 --concurrency 1 4 16
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fake_wmi import make_fleet_connector_factory  # noqa: E402
+from fleet_scanner import FleetScanner  # noqa: E402
+from plugin_manager import PluginManager  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量远程扫描基准测试")
+    parser.add_argument('--hosts', type=int, default=60, help="模拟的主机数")
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 16], help="要比较的主机并发数")
+    parser.add_argument('--unreachable', type=float, default=0.1, help="不可达主机的比例")
+    parser.add_argument('--slow', type=float, default=0.1, help="慢主机的比例")
+    parser.add_argument('--latency-scale', type=float, default=0.1, help="按比例缩小假 WMI 延迟以缩短运行时间")
+    parser.add_argument('--host-timeout', type=float, default=3.0)
+    args = parser.parse_args()
+
+    manager = PluginManager(log_callback=lambda message: None)
+    manager.discover_plugins()
+    plugins = manager.get_scan_plugins()
+
+    hosts = [f"PC-{i:04d}" for i in range(args.hosts)]
+    unreachable = hosts[:int(args.hosts * args.unreachable)]
+    slow = hosts[len(unreachable):len(unreachable) + int(args.hosts * args.slow)]
+    latencies = {'SoftwareLicensingProduct': 2.0 * args.latency_scale, 'WmiMonitorID': 0.8 * args.latency_scale,
+                 'Win32_Keyboard': 0.4 * args.latency_scale, 'Win32_PointingDevice': 0.4 * args.latency_scale}
+    factory = make_fleet_connector_factory(unreachable, slow, latencies=latencies,
+                                           default_latency=0.1 * args.latency_scale,
+                                           unreachable_delay=1.0 * args.latency_scale * 10)
+
+    print(f"主机 {args.hosts} 台: 不可达 {len(unreachable)} 台, 慢主机 {len(slow)} 台, "
+          f"单机期限 {args.host_timeout:g}s")
+    for concurrency in args.concurrency:
+        with tempfile.TemporaryDirectory() as output_dir:
+            scanner = FleetScanner(plugins, connector_factory=factory, host_concurrency=concurrency,
+                                   host_timeout=args.host_timeout, retries=1, retry_delay=0.1,
+                                   output_dir=output_dir, log_callback=lambda message: None)
+            start = time.perf_counter()
+            statuses = {}
+            for result in scanner.scan(hosts):
+                statuses[result.status] = statuses.get(result.status, 0) + 1
+            elapsed = time.perf_counter() - start
+            snapshots = len(os.listdir(output_dir))
+        summary = ', '.join(f"{status} {count}" for status, count in sorted(statuses.items()))
+        print(f"并发 {concurrency:>3}: 耗时 {elapsed:6.2f}s, {args.hosts / elapsed * 60:7.1f} 台/分钟, "
+              f"快照 {snapshots} 个 ({summary})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+# benchmarks/bench_pdf_fonts.py
+
+"""
+PDF 字体注册与渲染缓存基准测试：连续多次导出同一份 PDF，比较
+  - 每次导出都重新查找、解析并注册字体（迁移前的做法，用每次新建的 FontRegistry 模拟）
+  - 共享进程级 FontRegistry（首次导出解析字体，之后直接复用）
+  - 共享 FontRegistry + PDF 渲染缓存（内容不变时不再重新排版）
+的每次导出耗时。前两种情况每次导出前都会清空渲染缓存。
+没有中文字体的机器（例如 Linux 构建机）可用 --font-dir 与 --font 指定任意 TrueType 字体。
+
+用法:
+    python benchmarks/bench_pdf_fonts.py --exports 10 --rows 200
+    python benchmarks/bench_pdf_fonts.py --font-dir /usr/share/fonts --font DejaVuSans.ttf
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pdf_fonts  # noqa: E402
+from asset_table import AssetRecord, AssetTable  # noqa: E402
+from pdf_fonts import PREFERRED_FONTS, FontRegistry, font_search_path  # noqa: E402
+from pdf_report import default_render_cache  # noqa: E402
+from plugins.export_pdf import PDFExportPlugin  # noqa: E402
+
+CATEGORIES = ('CPU', '内存', '硬盘', '显卡', '网卡', '显示器', '主板/整机', '操作系统')
+
+
+def make_table(count):
+    return AssetTable(AssetRecord(CATEGORIES[i % len(CATEGORIES)], 'Lenovo', f"Model-{i:04d}", '16 GB',
+                                  f"SN{i:010d}") for i in range(count))
+
+
+def run_exports(plugin, table, count, fresh_registry, render_cache):
+    timings = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for i in range(count):
+            if fresh_registry is not None:
+                pdf_fonts._default_registry = fresh_registry()
+            if not render_cache:
+                default_render_cache().clear()
+            start = time.perf_counter()
+            result = plugin.export(table, os.path.join(temp_dir, f"{i}.pdf"), "资产报告", lambda message: None)
+            timings.append(time.perf_counter() - start)
+            if not (isinstance(result, str) and result.endswith('.pdf')):
+                raise SystemExit(f"导出失败: {result}")
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 字体注册基准测试")
+    parser.add_argument('--exports', type=int, default=10)
+    parser.add_argument('--rows', type=int, default=200)
+    parser.add_argument('--font-dir', action='append', help="额外的字体目录，可重复使用")
+    parser.add_argument('--font', action='append', help="要使用的字体文件名，默认使用中文字体偏好列表")
+    args = parser.parse_args()
+
+    search_path = font_search_path(args.font_dir)
+    plugin = PDFExportPlugin()
+    if args.font:
+        plugin.preferred_fonts = tuple(args.font)
+    font_path = pdf_fonts.find_font(plugin.preferred_fonts, search_path)
+    if font_path is None:
+        raise SystemExit(f"找不到字体 {', '.join(args.font or PREFERRED_FONTS)}，请用 --font-dir/--font 指定。")
+    print(f"字体: {font_path} ({os.path.getsize(font_path) / 1024 / 1024:.1f}MB), "
+          f"导出 {args.exports} 次, 每次 {args.rows} 行")
+
+    table = make_table(args.rows)
+    for label, fresh, render_cache in (("每次重新注册", lambda: FontRegistry(search_path), False),
+                                       ("共享注册表", None, False),
+                                       ("共享注册表 + 渲染缓存", None, True)):
+        pdf_fonts._default_registry = FontRegistry(search_path)
+        default_render_cache().clear()
+        timings = run_exports(plugin, table, args.exports, fresh, render_cache)
+        rest = timings[1:] or timings
+        print(f"{label}: 总耗时 {sum(timings):.2f}s, 首次 {timings[0] * 1000:.0f}ms, "
+              f"之后平均 {sum(rest) / len(rest) * 1000:.0f}ms")
+    print(f"共享注册表解析字体次数: {pdf_fonts.default_font_registry().parses}, "
+          f"渲染缓存: {default_render_cache().stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/bench_pdf_render_cache.py
+
+"""
+PDF 渲染缓存键的正确性检查：两份只在附加字段（例如 资产名称）上不同的 AssetTable 必须得到不同的缓存键，
+第二次渲染不能命中第一次的缓存；内容完全相同的表则必须命中。另外统计 --rows 行数据计算一次缓存键的耗时。
+使用 reportlab 内置的 Helvetica 字体，不需要中文字体。任一检查失败时以非零状态退出。
+
+用法:
+    python benchmarks/bench_pdf_render_cache.py --rows 140000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_table import AssetRecord, AssetTable  # noqa: E402
+from pdf_report import PDFRenderCache, report_key  # noqa: E402
+
+FONT_NAME = 'Helvetica'
+
+
+def make_table(asset_name):
+    table = AssetTable()
+    table.append({'类别': '主板/整机', '品牌': 'LENOVO', '型号': 'ThinkCentre M920t', '序列号': 'SN0001',
+                  '资产名称': asset_name})
+    table.append(AssetRecord('CPU', 'Intel', 'Core i7-9700', '8 核'))
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 渲染缓存键检查")
+    parser.add_argument('--rows', type=int, default=140000, help="计时用的表格行数")
+    args = parser.parse_args()
+
+    failures = []
+
+    def check(condition, message):
+        print(f"{'✅' if condition else '❌'} {message}")
+        if not condition:
+            failures.append(message)
+
+    first, second, same = make_table('财务部-01'), make_table('财务部-02'), make_table('财务部-01')
+    check(report_key(first, '', FONT_NAME, 'list') != report_key(second, '', FONT_NAME, 'list'),
+          "只有附加字段不同的两张表缓存键不同")
+    check(report_key(first, '', FONT_NAME, 'list') == report_key(same, '', FONT_NAME, 'list'),
+          "内容相同的两张表缓存键相同")
+
+    cache = PDFRenderCache()
+    pdf_first, _ = cache.render(first, '', FONT_NAME, 'list')
+    pdf_second, cached_second = cache.render(second, '', FONT_NAME, 'list')
+    _, cached_same = cache.render(same, '', FONT_NAME, 'list')
+    check(not cached_second and pdf_first != pdf_second, "附加字段变化后重新渲染，不返回旧的 PDF")
+    check(cached_same, "内容相同的表命中渲染缓存")
+
+    table = AssetTable(AssetRecord('内存', 'Samsung', f"M378A{i:06d}", '8 GB', f"SN{i:08d}")
+                       for i in range(args.rows))
+    for index in range(0, args.rows, 100):
+        table._extras[index] = {'资产名称': f"PC-{index:06d}"}
+    start = time.perf_counter()
+    report_key(table, '资产报告', FONT_NAME)
+    print(f"{args.rows} 行 (其中 {len(table._extras)} 行带附加字段) 计算缓存键耗时 "
+          f"{(time.perf_counter() - start) * 1000:.0f}ms")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+# benchmarks/bench_pdf_report.py
+
+"""
+PDF 版式基准测试：对 10 / 1k / 10k 台机器的合成资产数据（每台约 14 个配件），
+比较按类别逐项列出的旧版式（list）与每个配件一行的表格版式（table）的渲染耗时、页数和文件大小；
+加 --memory 时另外运行一次统计 tracemalloc 峰值内存；两种版式的峰值内存都随页数增长，表格版式只是页数少得多。
+旧版式在机器很多时需要数分钟，默认只在不超过 --list-max 台机器时运行。
+
+用法:
+    python benchmarks/bench_pdf_report.py
+    python benchmarks/bench_pdf_report.py --machines 10 1000 10000 --memory --font-dir /usr/share/fonts --font DejaVuSans.ttf
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from asset_table import AssetRecord, AssetTable  # noqa: E402
+from pdf_fonts import PREFERRED_FONTS, FontRegistry, font_search_path  # noqa: E402
+from pdf_report import LAYOUTS  # noqa: E402
+
+# 每台机器的配件：(类别, 品牌, 型号, 大小)
+MACHINE_PARTS = (
+    ('主板/整机', 'LENOVO', 'ThinkCentre M920t', 'N/A'),
+    ('CPU', 'Intel', 'Intel(R) Core(TM) i7-9700 CPU @ 3.00GHz', '8 核 / 8 线程'),
+    ('内存', 'Samsung', 'M378A1K43CB2-CTD', '8 GB'),
+    ('内存', 'Samsung', 'M378A1K43CB2-CTD', '8 GB'),
+    ('硬盘', 'Samsung', 'SAMSUNG MZVLB512HBJQ-000L7', '476.94 GB'),
+    ('硬盘', 'Seagate', 'ST1000DM010-2EP102', '931.51 GB'),
+    ('显卡', 'NVIDIA', 'NVIDIA GeForce GT 730', '2 GB'),
+    ('网卡', 'Intel', 'Intel(R) Ethernet Connection (7) I219-V', 'N/A'),
+    ('网卡', 'Realtek', 'Realtek RTL8822BE 802.11ac PCIe Adapter', 'N/A'),
+    ('显示器', 'Dell Inc.', 'DELL P2419H', '24 英寸'),
+    ('键盘', 'Logitech', 'USB 输入设备', 'N/A'),
+    ('鼠标', 'Logitech', 'HID-compliant mouse', 'N/A'),
+    ('操作系统', 'Microsoft', 'Microsoft Windows 10 专业版', '64 位'),
+    ('激活状态', 'Microsoft', 'Windows(R), Professional edition', '已激活'),
+)
+
+
+def make_fleet(machines):
+    table = AssetTable()
+    for machine in range(machines):
+        for part, (category, brand, model, size) in enumerate(MACHINE_PARTS):
+            serial = f"SN{machine:06d}{part:02d}"
+            url = f"https://pcsupport.lenovo.com/warranty?serial={serial}" if part == 0 else 'N/A'
+            table.append(AssetRecord(category, brand, model, size, serial, '2021-06-18', url))
+    return table
+
+
+def measure(layout, table, font_name, memory):
+    start = time.perf_counter()
+    pdf = LAYOUTS[layout](table, "2024 年度资产盘点", font_name)
+    elapsed = time.perf_counter() - start
+    peak = None
+    if memory:
+        tracemalloc.start()
+        LAYOUTS[layout](table, "2024 年度资产盘点", font_name)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return elapsed, pdf.count(b'/Type /Page\n'), len(pdf), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF 版式基准测试")
+    parser.add_argument('--machines', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--list-max', type=int, default=1000, help="超过此机器数时跳过旧版式")
+    parser.add_argument('--memory', action='store_true', help="另外运行一次统计峰值内存")
+    parser.add_argument('--font-dir', action='append', help="额外的字体目录，可重复使用")
+    parser.add_argument('--font', action='append', help="要使用的字体文件名，默认使用中文字体偏好列表")
+    args = parser.parse_args()
+
+    font = FontRegistry(font_search_path(args.font_dir)).register(args.font or PREFERRED_FONTS)
+    if font is None:
+        raise SystemExit(f"找不到字体 {', '.join(args.font or PREFERRED_FONTS)}，请用 --font-dir/--font 指定。")
+    print(f"字体: {font.path}")
+
+    for machines in args.machines:
+        table = make_fleet(machines)
+        for layout in ('list', 'table'):
+            if layout == 'list' and machines > args.list_max:
+                print(f"{machines:>6} 台 ({len(table)} 行) {layout:>5}: 跳过")
+                continue
+            elapsed, pages, size, peak = measure(layout, table, font.name, args.memory)
+            memory = f", 峰值内存 {peak / 1024 / 1024:.1f}MB" if peak is not None else ""
+            print(f"{machines:>6} 台 ({len(table)} 行) {layout:>5}: 耗时 {elapsed:.2f}s, {pages} 页, "
+                  f"文件 {size / 1024 / 1024:.1f}MB{memory}")
+
+
+if __name__ == "__main__":
+    main()
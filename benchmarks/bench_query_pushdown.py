@@ -0,0 +1,79 @@
+# benchmarks/bench_query_pushdown.py
+
+"""
+属性投影与 WHERE 下推基准测试：对每个扫描插件，比较其声明的查询以 SELECT *（迁移前的写法）
+与窄查询（迁移后）执行时的耗时。
+默认使用假连接器，耗时是按 fake_wmi.FakeWMIConnector 的耗时模型（实际返回数据的序列化大小）合成的，
+只能说明投影与下推减少了多少返回数据，不能当作真实机器上的收益；
+在 Windows 上加 --real 直接查询本机 WMI，得到真实耗时。
+
+用法:
+    python benchmarks/bench_query_pushdown.py
+    python benchmarks/bench_query_pushdown.py --real --repeat 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_wmi import make_connector_factory, serialized_size
+from plugin_interface import WMIQuery
+from plugin_manager import PluginManager
+from wmi_broker import WMIQueryBroker
+
+
+def _row_size(row):
+    return serialized_size([{name: getattr(row, name, None) for name in vars(row)}])
+
+
+def time_queries(queries, factory, repeat):
+    """每次重复都新建代理（不命中缓存），返回最快一次的耗时、行数与返回数据的近似大小。"""
+    best, rows = None, []
+    for _ in range(repeat):
+        broker = WMIQueryBroker(factory)
+        start = time.perf_counter()
+        rows = [row for query in queries for row in broker.fetch(query)]
+        elapsed = time.perf_counter() - start
+        broker.release()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(rows), sum(_row_size(row) for row in rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WMI 属性投影与 WHERE 下推基准测试")
+    parser.add_argument('--real', action='store_true', help="查询本机真实的 WMI（仅 Windows）")
+    parser.add_argument('--repeat', type=int, default=1, help="每种查询重复次数，取最快一次")
+    args = parser.parse_args()
+
+    manager = PluginManager()
+    manager.discover_plugins()
+    if args.real:
+        import pythoncom
+        pythoncom.CoInitialize()
+        factory = None
+        print("\n数据来源: 本机 WMI（真实耗时）")
+    else:
+        factory = make_connector_factory(default_latency=0.2)
+        print("\n数据来源: 假连接器（合成耗时，按返回数据大小计算，仅供比较返回数据量）")
+
+    print(f"{'插件':<14}{'SELECT * (s)':>14}{'窄查询 (s)':>12}{'行数':>12}{'返回数据 (KB)':>18}")
+    total_before = total_after = 0.0
+    for plugin in manager.get_scan_plugins():
+        declared = list(getattr(plugin, 'queries', {}).values())
+        if not declared:
+            continue
+        # 迁移前：不带属性列表、在 Python 中过滤
+        legacy = [WMIQuery(q.class_name, namespace=q.namespace) for q in declared]
+        before, rows_before, size_before = time_queries(legacy, factory, args.repeat)
+        after, rows_after, size_after = time_queries(declared, factory, args.repeat)
+        total_before += before
+        total_after += after
+        print(f"{plugin.name:<14}{before:>14.3f}{after:>12.3f}{rows_before:>7} -> {rows_after:<4}"
+              f"{size_before / 1024:>9.1f} -> {size_after / 1024:.1f}")
+    print(f"{'合计':<14}{total_before:>14.3f}{total_after:>12.3f}")
+
+if __name__ == "__main__":
+    main()
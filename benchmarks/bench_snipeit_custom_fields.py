@@ -0,0 +1,105 @@
+# benchmarks/bench_snipeit_custom_fields.py
+
+"""
+验证 --custom-field：通过 cli.main 把单台机器的快照同步到本地 Snipe-IT 替身服务器。
+服务器上已有该资产（型号相同，CPU 自定义字段是旧值，内存字段为空），第一次同步必须只 PATCH 这两个自定义字段；
+再同步一次必须没有任何写请求（比较的字段与写入的字段一致，不会反复更新）；
+不带 --custom-field 时自定义字段不受管理，同样不产生写请求；服务器上不存在的机器新建时带上自定义字段，
+“主板/整机”行中带有 资产名称/资产标签 时新建的资产使用这两个值，否则使用“品牌 型号”与序列号。
+任一检查失败时以非零状态退出。
+
+用法:
+    python benchmarks/bench_snipeit_custom_fields.py
+"""
+
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_snipeit import MockSnipeIT  # noqa: E402
+
+CUSTOM_FIELDS = ['--custom-field', 'CPU=_snipeit_cpu_1', '--custom-field', '内存=_snipeit_ram_2']
+
+
+def host_rows(serial, **extras):
+    return [
+        {'类别': '主板/整机', '品牌': 'Dell Inc.', '型号': 'OptiPlex 7090', '大小': 'N/A', '序列号': serial, **extras},
+        {'类别': 'CPU', '品牌': 'Intel', '型号': 'Core i7-10700', '大小': '8 核', '序列号': 'N/A'},
+        {'类别': '内存', '品牌': 'Samsung', '型号': 'M378A2K43DB1', '大小': '16GB', '序列号': 'A1'},
+        {'类别': '内存', '品牌': 'Samsung', '型号': 'M378A2K43DB1', '大小': '16GB', '序列号': 'A2'},
+    ]
+
+
+def writes(server):
+    return {key: count for key, count in server.stats()['counts'].items() if key[0] in ('POST', 'PATCH', 'PUT')}
+
+
+def main():
+    failures = []
+
+    def check(condition, message):
+        print(f"{'✅' if condition else '❌'} {message}")
+        if not condition:
+            failures.append(message)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.environ['LOCALAPPDATA'] = temp_dir
+        import cli
+        from snapshot_cache import write_snapshot
+
+        existing = write_snapshot(os.path.join(temp_dir, 'PC-001.json'), host_rows('SN-EXISTING'))
+        new = write_snapshot(os.path.join(temp_dir, 'PC-002.json'), host_rows('SN-NEW'))
+        named = write_snapshot(os.path.join(temp_dir, 'PC-003.json'),
+                               host_rows('SN-NAMED', 资产名称='行政部-07', 资产标签='ADM-0007'))
+        with MockSnipeIT() as server:
+            server.entities['manufacturers'][10] = {'id': 10, 'name': 'Dell Inc.'}
+            server.entities['models'][20] = {'id': 20, 'name': 'OptiPlex 7090', 'manufacturer': {'id': 10}}
+            asset_id = server.add_asset('SN-EXISTING', model_id=20, name='财务部-01', asset_tag='FIN-0001',
+                                        _snipeit_cpu_1='Core i5-8500')
+
+            def sync(path, *extra):
+                before = writes(server)
+                code = cli.main(['--quiet', '--input', path, '--sync', '--snipeit-url', server.url,
+                                 '--snipeit-key', 'benchmark', *extra])
+                after = writes(server)
+                return code, {key: after[key] - before.get(key, 0) for key in after if after[key] != before.get(key, 0)}
+
+            code, delta = sync(existing, *CUSTOM_FIELDS)
+            asset = server.hardware[asset_id]
+            check(code == 0 and delta == {('PATCH', 'hardware'): 1}, f"已有资产只更新一次: {delta}")
+            check(asset['_snipeit_cpu_1'] == 'Core i7-10700 8 核'
+                  and asset['_snipeit_ram_2'] == 'M378A2K43DB1 16GB / M378A2K43DB1 16GB',
+                  f"自定义字段已写入: {asset['_snipeit_cpu_1']!r}, {asset['_snipeit_ram_2']!r}")
+            check(asset['name'] == '财务部-01' and asset['asset_tag'] == 'FIN-0001', "名称与资产标签未被覆盖")
+
+            code, delta = sync(existing, *CUSTOM_FIELDS)
+            check(code == 0 and not delta, f"再次同步无写请求: {delta}")
+            code, delta = sync(existing)
+            check(code == 0 and not delta, f"未配置自定义字段时无写请求: {delta}")
+
+            code, delta = sync(new, *CUSTOM_FIELDS)
+            created = [a for a in server.hardware.values() if a['serial'] == 'SN-NEW']
+            check(code == 0 and len(created) == 1 and created[0].get('_snipeit_ram_2') == asset['_snipeit_ram_2'],
+                  f"新资产创建时带有自定义字段: {delta}")
+            check(created and created[0]['name'] == 'Dell Inc. OptiPlex 7090' and created[0]['asset_tag'] == 'SN-NEW',
+                  "未提供名称与资产标签时使用“品牌 型号”与序列号")
+
+            code, delta = sync(named)
+            created = [a for a in server.hardware.values() if a['serial'] == 'SN-NAMED']
+            check(code == 0 and len(created) == 1 and created[0]['name'] == '行政部-07'
+                  and created[0]['asset_tag'] == 'ADM-0007',
+                  f"新资产使用行中的资产名称与资产标签: {[(a['name'], a['asset_tag']) for a in created]}")
+
+            code, _ = sync(existing, '--custom-field', 'CPU=处理器')
+            check(code == 2, f"列名格式错误时拒绝执行 (退出码 {code})")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/bench_snipeit_dry_run.py
+
+"""
+验证命令行的 --sync --dry-run：通过 cli.main 把快照同步到本地 Snipe-IT 替身服务器，
+服务器上已有一部分资产（型号不同，需要更新）以及几台扫描数据中没有的资产，离线发件箱中预先放入一个待重放的操作。
+dry-run 必须只输出计划：服务器不能收到任何 POST/PATCH/PUT，发件箱文件保持不变；
+同时带上 --reconcile，核对报告必须列出服务器上多余的资产（资产数少于自动预取阈值时也要生效）。
+随后不带 --dry-run 再运行一次，确认同样的入口确实会写入（说明上面的检查是有效的）。
+任一检查失败时以非零状态退出。缓存与发件箱都放在临时目录中，不影响本机数据。
+
+用法:
+    python benchmarks/bench_snipeit_dry_run.py --assets 30 --existing 10 --orphans 3
+"""
+
+import argparse
+import csv
+import os
+import sys
+import tempfile
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_snipeit import MockSnipeIT, make_scan_rows  # noqa: E402
+
+WRITE_METHODS = ('POST', 'PATCH', 'PUT')
+
+
+def writes(server):
+    return sum(count for (method, _), count in server.stats()['counts'].items() if method in WRITE_METHODS)
+
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="命令行 Snipe-IT dry-run 验证")
+    parser.add_argument('--assets', type=int, default=30)
+    parser.add_argument('--existing', type=int, default=10, help="服务器上已存在（型号不同）的资产数")
+    parser.add_argument('--orphans', type=int, default=3, help="服务器上存在但扫描数据中没有的资产数")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # 必须在导入 cli 之前设置，使 ID 缓存与离线发件箱都落在临时目录中
+        os.environ['LOCALAPPDATA'] = temp_dir
+        import cli
+        from snapshot_cache import write_snapshot
+        from snipeit_outbox import SyncOutbox
+
+        rows = make_scan_rows(args.assets + 1)
+        snapshot_path = write_snapshot(os.path.join(temp_dir, 'fleet.json'), rows[:args.assets])
+        outbox = SyncOutbox()
+        outbox.enqueue(rows[-1]['序列号'], [rows[-1]])
+        outbox_before = read_bytes(outbox.path)
+
+        failures = []
+        with MockSnipeIT() as server:
+            for row in rows[:args.existing]:
+                server.add_asset(row['序列号'], model_id=1, name=row['型号'])
+            for i in range(args.orphans):
+                server.add_asset(f"ORPHAN{i:03d}", model_id=1, name="已报废")
+            hardware_before = len(server.hardware)
+            argv = ['--quiet', '--input', snapshot_path, '--sync', '--snipeit-url', server.url,
+                    '--snipeit-key', 'benchmark']
+
+            code = cli.main(argv + ['--dry-run', '--reconcile'])
+            dry_writes = writes(server)
+            print(f"dry-run: 退出码 {code}, 请求 {server.stats()['requests']} 个, 写请求 {dry_writes} 个, "
+                  f"资产 {hardware_before} -> {len(server.hardware)} 台")
+            if code != 0:
+                failures.append(f"dry-run 退出码为 {code}")
+            if dry_writes or len(server.hardware) != hardware_before or server.entities['models']:
+                failures.append("dry-run 向服务器写入了数据")
+            if read_bytes(outbox.path) != outbox_before:
+                failures.append("dry-run 修改了离线发件箱")
+            report_path = os.path.join(os.path.dirname(outbox.path), 'snipeit_orphans.csv')
+            if not os.path.exists(report_path):
+                failures.append("--reconcile 没有写出核对报告")
+            else:
+                with open(report_path, 'r', encoding='utf-8-sig') as f:
+                    orphans = sorted(row['序列号'] for row in csv.DictReader(f))
+                print(f"核对报告: {len(orphans)} 台仅存在于 Snipe-IT")
+                if orphans != [f"ORPHAN{i:03d}" for i in range(args.orphans)]:
+                    failures.append(f"核对报告内容不正确: {orphans}")
+
+            code = cli.main(argv)
+            real_writes = writes(server)
+            print(f"正式同步: 退出码 {code}, 写请求 {real_writes} 个, 资产 {len(server.hardware)} 台, "
+                  f"发件箱剩余 {len(SyncOutbox())} 个")
+            if code != 0 or real_writes == 0 or len(server.hardware) != args.assets + 1 + args.orphans:
+                failures.append("正式同步没有按预期写入，上面的 dry-run 检查无效")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("✅ dry-run 未写入任何数据。")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# benchmarks/bench_snipeit_outbox.py
+
+"""
+离线发件箱基准测试：N 台资产逐台入队，之后重放时每台先失败一次、再成功出队，
+统计耗时与实际写入磁盘的字节数，并估算“每次修改都重写整个 JSON 文件”时的写入量作为对照。
+最后检查重新加载后的队列内容一致，以及日志末尾被截断（进程中途被结束）时不会丢失之前的记录。
+任一检查失败时以非零状态退出。
+
+用法:
+    python benchmarks/bench_snipeit_outbox.py --assets 100 1000 5000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_snipeit import make_scan_rows  # noqa: E402
+from snipeit_outbox import SyncOutbox  # noqa: E402
+
+
+class WriteCounter:
+    """记录发件箱文件的增长量；压缩重写时计入整个新文件。"""
+
+    def __init__(self, path):
+        self.path = path
+        self.written = 0
+        self._size = 0
+
+    def update(self):
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        self.written += size - self._size if size >= self._size else size
+        self._size = size
+
+
+def run(count, temp_dir):
+    path = os.path.join(temp_dir, f'outbox_{count}.jsonl')
+    outbox = SyncOutbox(path, base_delay=0)
+    counter = WriteCounter(path)
+    rows = make_scan_rows(count)
+    entry_sizes = [len(json.dumps({'rows': [row]}, ensure_ascii=False)) + 120 for row in rows]
+    rewrite_bytes, state = 0, 0
+
+    start = time.perf_counter()
+    for row, size in zip(rows, entry_sizes):
+        outbox.enqueue(row['序列号'], [row])
+        counter.update()
+        state += size
+        rewrite_bytes += state
+    for op in outbox.due():
+        outbox.fail(op, error='HTTP 503')
+        counter.update()
+        rewrite_bytes += state
+    for op, size in zip(outbox.due(), entry_sizes):
+        outbox.complete(op)
+        counter.update()
+        state -= size
+        rewrite_bytes += state
+    elapsed = time.perf_counter() - start
+    return elapsed, counter.written, rewrite_bytes, len(SyncOutbox(path))
+
+
+def check_recovery(temp_dir):
+    """截断最后一行后重新加载：之前的记录都在，之后追加的记录也能正确读回。"""
+    path = os.path.join(temp_dir, 'outbox_torn.jsonl')
+    outbox = SyncOutbox(path)
+    rows = make_scan_rows(3)
+    for row in rows:
+        outbox.enqueue(row['序列号'], [row])
+    with open(path, 'rb+') as f:
+        f.truncate(os.path.getsize(path) - 10)
+    reloaded = SyncOutbox(path)
+    survivors = len(reloaded)
+    reloaded.enqueue('SN-AFTER', [dict(rows[0], 序列号='SN-AFTER')])
+    return survivors, len(SyncOutbox(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线发件箱基准测试")
+    parser.add_argument('--assets', type=int, nargs='+', default=[100, 1000, 5000])
+    args = parser.parse_args()
+
+    failures = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for count in args.assets:
+            elapsed, written, rewrite_bytes, remaining = run(count, temp_dir)
+            print(f"{count:>6} 台: 入队 + 失败 + 出队耗时 {elapsed:6.2f}s, 写入 {written / 1024:9.1f} KB, "
+                  f"每次重写整个文件约 {rewrite_bytes / 1024:11.1f} KB, 剩余 {remaining} 个")
+            if remaining:
+                failures.append(f"{count} 台全部出队后重新加载仍剩余 {remaining} 个")
+        survivors, after = check_recovery(temp_dir)
+        print(f"日志末行被截断: 重新加载后剩余 {survivors} 个, 继续入队后 {after} 个")
+        if (survivors, after) != (2, 3):
+            failures.append("日志末行被截断后恢复不正确")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# benchmarks/bench_snipeit_sync.py
+
+"""
+Snipe-IT 并发同步基准测试：本地替身服务器按 --server-rate 限制每秒请求数（超出返回 429 + Retry-After），
+在不同的并发数下同步同一批资产，比较总耗时、被限流次数，以及同名型号是否被重复创建。
+--client-rate 为客户端令牌桶速率，设为略低于服务端限制时可以基本避免 429。
+
+用法:
+    python benchmarks/bench_snipeit_sync.py --assets 200 --concurrency 1 4 8 --server-rate 200 --client-rate 180
+"""
+
+import argparse
+import os
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_snipeit import MockSnipeIT, make_scan_rows  # noqa: E402
+from plugin_manager import PluginManager  # noqa: E402
+from worker_tasks import HeadlessWorker  # noqa: E402
+
+
+def run(plugin, rows, concurrency, client_rate, args):
+    with MockSnipeIT(latency=args.latency, rate_limit=args.server_rate) as server:
+        worker = HeadlessWorker(lambda message: None)
+        config = {'key': 'benchmark', 'internal_url': server.url, 'id_cache': False,
+                  'concurrency': concurrency, 'rate_limit': client_rate}
+        start = time.perf_counter()
+        plugin.sync(worker, rows, config)
+        elapsed = time.perf_counter() - start
+        models = len(server.entities['models'])
+        return elapsed, server.stats(), models, len(server.hardware)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Snipe-IT 并发同步基准测试")
+    parser.add_argument('--assets', type=int, default=200)
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8])
+    parser.add_argument('--latency', type=float, default=0.02, help="服务端处理每个请求的耗时（秒）")
+    parser.add_argument('--server-rate', type=int, default=200, help="替身服务器每秒允许的请求数")
+    parser.add_argument('--client-rate', type=float, default=None, help="客户端令牌桶速率（每秒请求数）")
+    args = parser.parse_args()
+
+    manager = PluginManager(log_callback=lambda message: None)
+    manager.discover_plugins()
+    plugin = manager.get_sync_plugins()[0]
+    rows = make_scan_rows(args.assets)
+
+    print(f"资产 {args.assets} 台, 请求处理 {args.latency * 1000:g}ms, 服务端限流 {args.server_rate} 次/秒, "
+          f"客户端限速 {args.client_rate or '无'}")
+    for concurrency in args.concurrency:
+        elapsed, stats, models, assets = run(plugin, rows, concurrency, args.client_rate, args)
+        print(f"并发 {concurrency:>2}: 总耗时 {elapsed:6.2f}s, 每台资产 {elapsed / args.assets * 1000:6.1f}ms, "
+              f"请求 {stats['requests']} 个, 429 {stats['rate_limited']} 次, 型号 {models} 个, 资产 {assets} 台")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# benchmarks/bench_wmi_broker.py
+
+"""
+WMI 查询代理基准测试：先扫描、再诊断，比较共享同一个 WMIQueryBroker 与各自直连时的 WMI 往返次数和耗时。
+共享代理时诊断直接复用扫描缓存的操作系统信息与硬盘列表，只有服务状态、事件日志、硬盘 S.M.A.R.T. 状态等易变数据重新查询；
+各自查询时诊断要为这些类再付一次往返。
+
+用法:
+    python benchmarks/bench_wmi_broker.py --default-latency 0.3
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_wmi import FakeWMIConnector
+from plugin_manager import PluginManager
+from scan_engine import ScanEngine
+from wmi_broker import WMIQueryBroker
+
+
+class CountingFactory:
+    """记录所有连接器上发生的实际查询次数。"""
+
+    def __init__(self, default_latency):
+        self.default_latency = default_latency
+        self.connectors = []
+        self._lock = threading.Lock()
+
+    def __call__(self, namespace=None):
+        connector = FakeWMIConnector(latencies={}, default_latency=self.default_latency, namespace=namespace)
+        with self._lock:
+            self.connectors.append(connector)
+        return connector
+
+    @property
+    def round_trips(self):
+        return sum(sum(c.call_counts.values()) for c in self.connectors)
+
+
+def run_session(manager, default_latency, shared):
+    factory = CountingFactory(default_latency)
+    engine = ScanEngine(connector_factory=factory)
+    start = time.perf_counter()
+    scan_broker = WMIQueryBroker(factory)
+    engine.run(manager.get_scan_plugins(), log_callback=lambda message: None, broker=scan_broker)
+    diag_broker = scan_broker if shared else WMIQueryBroker(factory)
+    for plugin in manager.get_diagnostic_plugins():
+        plugin.run_diagnostic(diag_broker)
+    diag_broker.release()
+    return time.perf_counter() - start, factory.round_trips, scan_broker.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WMI 查询代理基准测试")
+    parser.add_argument('--default-latency', type=float, default=0.3, help="每次 WMI 往返的模拟延迟（秒）")
+    args = parser.parse_args()
+
+    manager = PluginManager()
+    manager.discover_plugins()
+
+    for label, shared in (("扫描与诊断各自查询", False), ("共享查询代理", True)):
+        elapsed, round_trips, stats = run_session(manager, args.default_latency, shared)
+        print(f"  {label:<12} 耗时 {elapsed:6.2f}s  WMI 往返 {round_trips:3d} 次  "
+              f"命中 {stats['hits']} / 未命中 {stats['misses']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+# benchmarks/fake_wmi.py
+
+"""
+用于基准测试的假 WMI 连接器：按类名返回固定的样例数据，并按配置的延迟模拟 COM 往返耗时。
+可在 Linux 上运行，不依赖 wmi / pywin32。
+"""
+
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+# 各 WMI 类的样例数据，字段名与真实 WMI 属性一致
+SAMPLE_ROWS = {
+    'Win32_Processor': [
+        {'Manufacturer': 'GenuineIntel', 'Name': 'Intel(R) Core(TM) i7-10700 CPU @ 2.90GHz ',
+         'ProcessorId': 'BFEBFBFF000A0655'},
+    ],
+    'Win32_BaseBoard': [
+        {'Manufacturer': 'Dell Inc.', 'Product': '0K240Y', 'SerialNumber': ' 7XJ2K53 '},
+    ],
+    'Win32_PhysicalMemory': [
+        {'Manufacturer': 'Samsung', 'PartNumber': 'M378A1K43EB2-CWE ', 'Capacity': '8589934592',
+         'SerialNumber': '41D2A1F0'},
+        {'Manufacturer': 'Samsung', 'PartNumber': 'M378A1K43EB2-CWE ', 'Capacity': '8589934592',
+         'SerialNumber': '41D2A1F1'},
+    ],
+    'Win32_DiskDrive': [
+        {'Model': 'SAMSUNG MZVLB512HBJQ-000L7', 'Size': '512105932800', 'SerialNumber': ' S4ENNX0N123456 ',
+         'Caption': 'SAMSUNG MZVLB512HBJQ-000L7', 'Status': 'OK'},
+    ],
+    'Win32_VideoController': [
+        {'Name': 'Intel(R) UHD Graphics 630'},
+    ],
+    'Win32_NetworkAdapterConfiguration': [
+        {'Description': 'Intel(R) Ethernet Connection (11) I219-LM', 'MACAddress': '00:11:22:33:44:55',
+         'IPAddress': ('10.0.0.23', 'fe80::1'), 'IPEnabled': True},
+    ],
+    'Win32_OperatingSystem': [
+        {'Caption': 'Microsoft Windows 10 Pro', 'SerialNumber': '00330-80000-00000-AA123',
+         'InstallDate': '20230105093000.000000+480', 'LastBootUpTime': '20261016080000.500000+480'},
+    ],
+    'Win32_Keyboard': [
+        {'Name': 'Logitech K120', 'Description': 'Logitech USB Keyboard'},
+    ],
+    'Win32_PointingDevice': [
+        {'Name': 'Logitech M90', 'Description': 'Logitech USB Optical Mouse', 'Manufacturer': 'Logitech'},
+    ],
+    'SoftwareLicensingProduct': [
+        {'Description': 'Windows(R) Operating System, RETAIL channel', 'PartialProductKey': 'ABCDE',
+         'LicenseStatus': 1},
+    ] + [
+        # 真实机器上 SoftwareLicensingProduct 通常有上百条未安装密钥的授权条目
+        {'Description': f'Office 16, Product {i:03d}', 'PartialProductKey': None, 'LicenseStatus': 0}
+        for i in range(120)
+    ],
+    'WmiMonitorID': [
+        {'ManufacturerName': tuple(map(ord, 'DEL')) + (0,), 'UserFriendlyName': tuple(map(ord, 'DELL P2419H')) + (0,),
+         'SerialNumberID': tuple(map(ord, 'CN0ABC123')) + (0,), 'YearOfManufacture': 2021, 'WeekOfManufacture': 14},
+    ],
+}
+
+# 每次往返中与返回数据量无关的固定开销（COM 调用、提供程序枚举）占完整延迟的比例
+ROUND_TRIP_SHARE = 0.1
+
+# 模拟真实机器上的典型耗时（秒）：激活、显示器和外设相关的类明显更慢
+DEFAULT_LATENCIES = {
+    'SoftwareLicensingProduct': 2.0,
+    'WmiMonitorID': 0.8,
+    'Win32_Keyboard': 0.4,
+    'Win32_PointingDevice': 0.4,
+}
+
+
+WQL_RE = re.compile(r"^\s*SELECT\s+(?P<fields>.+?)\s+FROM\s+(?P<cls>\w+)(?:\s+WHERE\s+(?P<where>.+))?$",
+                    re.IGNORECASE | re.DOTALL)
+CONDITION_RE = re.compile(r"^(?P<prop>\w+)\s*(?:(?P<null>IS\s+(?:NOT\s+)?NULL)|(?P<op>=|<>|!=|>=|<=|>|<|LIKE)\s*(?P<value>.+))$",
+                          re.IGNORECASE)
+
+
+def serialized_size(rows):
+    """近似计算一批 WMI 对象按 MOF 文本序列化后的字节数：每个属性记为 名称 = 值;"""
+    return sum(len(name) + len(repr(value)) + 4 for row in rows for name, value in row.items())
+
+
+def _parse_literal(text):
+    text = text.strip()
+    if text.startswith("'") and text.endswith("'"):
+        return text[1:-1].replace("\\'", "'").replace("\\\\", "\\")
+    if text.upper() in ('TRUE', 'FALSE'):
+        return text.upper() == 'TRUE'
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _match_condition(row, condition):
+    match = CONDITION_RE.match(condition.strip())
+    if not match:
+        raise ValueError(f"无法解析的 WQL 条件: {condition}")
+    actual = row.get(match.group('prop'))
+    if match.group('null'):
+        is_null = actual is None
+        return not is_null if 'NOT' in match.group('null').upper() else is_null
+    op, expected = match.group('op').upper(), _parse_literal(match.group('value'))
+    if op == 'LIKE':
+        pattern = '^' + re.escape(str(expected)).replace('%', '.*').replace('_', '.') + '$'
+        return actual is not None and re.match(pattern, str(actual), re.IGNORECASE) is not None
+    if actual is None:
+        return False
+    if isinstance(actual, str) and isinstance(expected, str):
+        actual, expected = actual.lower(), expected.lower()
+    return {'=': actual == expected, '<>': actual != expected, '!=': actual != expected,
+            '>': actual > expected, '<': actual < expected,
+            '>=': actual >= expected, '<=': actual <= expected}[op]
+
+
+class FakeWMIConnector:
+    """
+    模拟 wmi.WMI() 连接，支持 connector.Win32_Xxx(**filters) 与 connector.query(wql) 两种写法。
+    每次查询按类名休眠指定的延迟，然后返回样例数据构成的对象列表；没有样例数据的类返回空列表。
+
+    耗时模型（合成数据，不代表真实 WMI 的耗时）：SELECT * 且不带条件时耗时为该类的完整延迟，
+    其中 ROUND_TRIP_SHARE 为固定开销，其余部分按本次实际返回的数据序列化后的大小
+    （serialized_size）占该类全部样例数据大小的比例计算。样例数据只包含插件会读取的属性，
+    因此投影节省的耗时只来自真正被丢弃的属性，WHERE 节省的耗时来自被过滤掉的行。
+    """
+
+    def __init__(self, latencies=None, default_latency=0.1, rows=None, namespace=None):
+        self.latencies = dict(DEFAULT_LATENCIES if latencies is None else latencies)
+        self.default_latency = default_latency
+        self.rows = rows if rows is not None else SAMPLE_ROWS
+        self.namespace = namespace
+        self.call_counts = {}
+        self._lock = threading.Lock()
+
+    def __getattr__(self, class_name):
+        if class_name.startswith('_'):
+            raise AttributeError(class_name)
+
+        def _query(**filters):
+            with self._lock:
+                self.call_counts[class_name] = self.call_counts.get(class_name, 0) + 1
+            time.sleep(self.latencies.get(class_name, self.default_latency))
+            matched = [row for row in self.rows.get(class_name, [])
+                       if all(row.get(key) == value for key, value in filters.items())]
+            return [SimpleNamespace(**row) for row in matched]
+
+        return _query
+
+    def query(self, wql):
+        match = WQL_RE.match(wql)
+        if not match:
+            raise ValueError(f"无法解析的 WQL: {wql}")
+        class_name = match.group('cls')
+        all_rows = self.rows.get(class_name, [])
+        conditions = re.split(r"\s+AND\s+", match.group('where'), flags=re.IGNORECASE) if match.group('where') else []
+        matched = [row for row in all_rows if all(_match_condition(row, c) for c in conditions)]
+
+        fields = [f.strip() for f in match.group('fields').split(',')]
+        returned = matched if fields == ['*'] else [{f: row.get(f) for f in fields} for row in matched]
+        full_size = serialized_size(all_rows)
+        size_ratio = serialized_size(returned) / full_size if full_size else 1.0
+        latency = self.latencies.get(class_name, self.default_latency)
+
+        with self._lock:
+            self.call_counts[class_name] = self.call_counts.get(class_name, 0) + 1
+        time.sleep(latency * (ROUND_TRIP_SHARE + (1 - ROUND_TRIP_SHARE) * size_ratio))
+        return [SimpleNamespace(**row) for row in returned]
+
+
+def make_connector_factory(latencies=None, default_latency=0.1):
+    """返回一个连接器工厂，每次调用都创建一个新的 FakeWMIConnector。"""
+
+    def factory(*args, **kwargs):
+        return FakeWMIConnector(latencies=latencies, default_latency=default_latency,
+                                namespace=kwargs.get('namespace'))
+
+    return factory
+
+
+def make_fleet_connector_factory(unreachable=(), slow=(), latencies=None, default_latency=0.1, slow_factor=10.0,
+                                 connect_delay=0.05, unreachable_delay=1.0):
+    """
+    返回供 FleetScanner 使用的 connector_factory(host)，模拟远程主机：
+      - 每次建立连接耗时 connect_delay 秒（DCOM 握手）；
+      - unreachable 中的主机在 unreachable_delay 秒后连接失败（模拟 RPC 服务器不可用）；
+      - slow 中的主机所有查询延迟乘以 slow_factor。
+    """
+    unreachable, slow = set(unreachable), set(slow)
+    base_latencies = dict(DEFAULT_LATENCIES if latencies is None else latencies)
+
+    def host_factory(host):
+        factor = slow_factor if host in slow else 1.0
+        host_latencies = {name: latency * factor for name, latency in base_latencies.items()}
+
+        def factory(*args, **kwargs):
+            if host in unreachable:
+                time.sleep(unreachable_delay)
+                raise ConnectionError(f"RPC 服务器不可用: {host}")
+            time.sleep(connect_delay)
+            return FakeWMIConnector(latencies=host_latencies, default_latency=default_latency * factor,
+                                    namespace=kwargs.get('namespace'))
+
+        return factory
+
+    return host_factory
@@ -0,0 +1,275 @@
+# benchmarks/mock_snipeit.py
+
+"""
+用于基准测试的本地 Snipe-IT 替身服务器，只实现同步插件用到的 /api/v1 接口：
+statuslabels、manufacturers、models、categories 的查询（search/limit/offset）、按 ID 读取与创建，
+hardware 的分页列表、byserial 查询、按 ID 读取、创建与 PATCH 更新。
+
+可以模拟：
+  - latency: 每个请求的服务端处理耗时；
+  - connect_latency: 每个新连接的建立耗时（模拟 TLS 握手，连接复用时只付一次）；
+  - rate_limit: 每秒允许的请求数，超出时返回 429 和 Retry-After 头；
+  - fail_every: 每 N 个请求返回一次 502，模拟反向代理的瞬时错误。
+"""
+
+import json
+import re
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ENTITY_TYPES = ('manufacturers', 'models', 'categories', 'statuslabels')
+# Snipe-IT 分页接口允许的最大 limit
+MAX_PAGE_LIMIT = 500
+
+
+class MockSnipeIT:
+    def __init__(self, latency=0.0, connect_latency=0.0, rate_limit=None, fail_every=0):
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.rate_limit = rate_limit
+        self.fail_every = fail_every
+        self.entities = {entity: {} for entity in ENTITY_TYPES}
+        self.entities['statuslabels'][2] = {'id': 2, 'name': 'Ready to Deploy'}
+        for category_id, name in ((1, '台式机'), (2, '笔记本'), (3, '显示器')):
+            self.entities['categories'][category_id] = {'id': category_id, 'name': name}
+        self.hardware = {}
+        self.request_count = 0
+        self.connection_count = 0
+        self.rate_limited = 0
+        self.counts = {}  # (方法, 资源) -> 次数
+        self._next_id = 100
+        self._lock = threading.Lock()
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self._server = None
+
+    # ---- 生命周期 ----
+
+    def start(self):
+        mock = self
+
+        class Handler(_Handler):
+            server_state = mock
+
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---- 数据 ----
+
+    def new_id(self):
+        with self._lock:
+            self._next_id += 1
+            return self._next_id
+
+    def add_asset(self, serial, model_id, name, asset_tag=None, **fields):
+        asset_id = self.new_id()
+        self.hardware[asset_id] = dict({'id': asset_id, 'serial': serial, 'name': name,
+                                        'asset_tag': asset_tag or serial, 'model': {'id': model_id},
+                                        'status_label': {'id': 2}}, **fields)
+        return asset_id
+
+    def stats(self):
+        with self._lock:
+            return {'requests': self.request_count, 'connections': self.connection_count,
+                    'rate_limited': self.rate_limited, 'counts': dict(self.counts)}
+
+    # ---- 请求计数与限流 ----
+
+    def _admit(self, method, resource):
+        """记录请求；超出速率限制时返回需要等待的秒数，否则返回 0。"""
+        with self._lock:
+            self.request_count += 1
+            self.counts[(method, resource)] = self.counts.get((method, resource), 0) + 1
+            if not self.rate_limit:
+                return 0
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start, self._window_count = now, 0
+            if self._window_count >= self.rate_limit:
+                self.rate_limited += 1
+                return max(0.0, 1.0 - (now - self._window_start))
+            self._window_count += 1
+            return 0
+
+
+def _serialize_hardware(asset):
+    """按 Snipe-IT 的格式返回资产：以 _snipeit_ 开头的自定义字段放在 custom_fields 中。"""
+    row = {key: value for key, value in asset.items() if not key.startswith('_snipeit_')}
+    row['custom_fields'] = {key: {'field': key, 'value': value}
+                            for key, value in asset.items() if key.startswith('_snipeit_')}
+    return row
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_state = None
+
+    def setup(self):
+        super().setup()
+        # 关闭 Nagle 算法，避免 keep-alive 连接上出现 40ms 的延迟确认等待
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        state = self.server_state
+        with state._lock:
+            state.connection_count += 1
+        if state.connect_latency:
+            time.sleep(state.connect_latency)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        # 响应头与响应体合并为一次写入
+        self._headers_buffer.append(b"\r\n" + data)
+        self.flush_headers()
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length) or b'{}') if length else {}
+
+    def _handle(self, method):
+        state = self.server_state
+        parsed = urlparse(self.path)
+        path = parsed.path.rstrip('/')
+        query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+        body = self._body() if method in ('POST', 'PATCH', 'PUT') else {}
+        match = re.match(r'^/api/v1/(?P<resource>[a-z]+)(?:/(?P<rest>.+))?$', path)
+        if not match:
+            return self._send(404, {'status': 'error', 'messages': 'Not found'})
+        resource, rest = match.group('resource'), match.group('rest')
+
+        retry_after = state._admit(method, resource if not rest or rest.isdigit() else f"{resource}/{rest.split('/')[0]}")
+        if retry_after:
+            return self._send(429, {'status': 'error', 'messages': 'Too Many Attempts.'},
+                              {'Retry-After': str(max(1, round(retry_after)))})
+        if state.fail_every and state.request_count % state.fail_every == 0:
+            return self._send(502, {'status': 'error', 'messages': 'Bad Gateway'})
+        if state.latency:
+            time.sleep(state.latency)
+
+        if resource in ENTITY_TYPES:
+            return self._entities(method, resource, rest, query, body)
+        if resource == 'hardware':
+            return self._hardware(method, rest, query, body)
+        return self._send(404, {'status': 'error', 'messages': 'Not found'})
+
+    def _page(self, rows, query):
+        limit = min(int(query.get('limit', 50)), MAX_PAGE_LIMIT)
+        offset = int(query.get('offset', 0))
+        return {'total': len(rows), 'rows': rows[offset:offset + limit]}
+
+    def _entities(self, method, resource, rest, query, body):
+        state = self.server_state
+        table = state.entities[resource]
+        if rest:
+            with state._lock:
+                row = table.get(int(rest)) if rest.isdigit() else None
+            if row is None:
+                return self._send(404, {'status': 'error', 'messages': 'Not found'})
+            return self._send(200, dict(row))
+        if method == 'GET':
+            search = query.get('search', '').lower()
+            with state._lock:
+                rows = [dict(row) for row in table.values() if search in row['name'].lower()]
+            return self._send(200, self._page(rows, query))
+        if method == 'POST':
+            name = body.get('name', '')
+            with state._lock:
+                if any(row['name'].lower() == name.lower() for row in table.values()):
+                    return self._send(200, {'status': 'error',
+                                            'messages': {'name': ['The name has already been taken.']}})
+                state._next_id += 1
+                row = dict(body, id=state._next_id)
+                table[row['id']] = row
+            return self._send(200, {'status': 'success', 'messages': 'Created', 'payload': row})
+        return self._send(405, {'status': 'error', 'messages': 'Method not allowed'})
+
+    def _hardware(self, method, rest, query, body):
+        state = self.server_state
+        if rest and rest.startswith('byserial/'):
+            serial = rest.split('/', 1)[1]
+            with state._lock:
+                rows = [_serialize_hardware(a) for a in state.hardware.values() if a['serial'] == serial]
+            return self._send(200, {'total': len(rows), 'rows': rows})
+        if rest and rest.isdigit():
+            asset_id = int(rest)
+            with state._lock:
+                asset = state.hardware.get(asset_id)
+                if asset is None:
+                    return self._send(404, {'status': 'error', 'messages': 'Asset does not exist.'})
+                if method in ('PATCH', 'PUT'):
+                    for key, value in body.items():
+                        if key == 'model_id':
+                            asset['model'] = {'id': value}
+                        elif key == 'status_id':
+                            asset['status_label'] = {'id': value}
+                        else:
+                            asset[key] = value
+                    return self._send(200, {'status': 'success', 'messages': 'Updated',
+                                            'payload': _serialize_hardware(asset)})
+                return self._send(200, _serialize_hardware(asset))
+        if method == 'GET':
+            with state._lock:
+                rows = [_serialize_hardware(a) for a in state.hardware.values()]
+            return self._send(200, self._page(rows, query))
+        if method == 'POST':
+            with state._lock:
+                tag = body.get('asset_tag')
+                if tag and any(a['asset_tag'] == tag for a in state.hardware.values()):
+                    return self._send(200, {'status': 'error',
+                                            'messages': {'asset_tag': ['The asset tag must be unique.']}})
+            fields = {k: v for k, v in body.items() if k not in ('serial', 'model_id', 'name', 'asset_tag', 'status_id')}
+            asset_id = state.add_asset(body.get('serial'), body.get('model_id'), body.get('name'),
+                                       body.get('asset_tag'), **fields)
+            return self._send(200, {'status': 'success', 'messages': 'Created',
+                                    'payload': _serialize_hardware(state.hardware[asset_id])})
+        return self._send(405, {'status': 'error', 'messages': 'Method not allowed'})
+
+    def do_GET(self):
+        self._handle('GET')
+
+    def do_POST(self):
+        self._handle('POST')
+
+    def do_PATCH(self):
+        self._handle('PATCH')
+
+    def do_PUT(self):
+        self._handle('PUT')
+
+
+def make_scan_rows(count, models=12, manufacturers=('Dell Inc.', 'HP', 'LENOVO')):
+    """生成 count 台机器的“主板/整机”扫描行，型号在 models 个之间重复。"""
+    rows = []
+    for i in range(count):
+        rows.append({'类别': '主板/整机', '品牌': manufacturers[i % len(manufacturers)],
+                     '型号': f"OptiPlex {7000 + i % models}", '大小': 'N/A', '序列号': f"SN{i:06d}",
+                     '生产日期': 'N/A', '保修查询链接': 'N/A'})
+    return rows
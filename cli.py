@@ -0,0 +1,276 @@
+# -*- coding: utf-8 -*-
+
+"""
+IT 资产信息导出工具 - 命令行入口
+
+面向登录脚本等批量部署场景：不导入任何 GUI 模块，直接运行扫描插件并写出快照或导出文件。
+
+用法示例:
+    python cli.py --list
+    python cli.py --snapshot C:\\Temp\\asset.json
+    python cli.py --only "CPU 信息" --only 内存条 --export C:\\Temp\\asset.csv --header "某某公司"
+    python cli.py --export C:\\Temp\\asset.jsonl.gz --quiet
+    python cli.py --export C:\\Temp\\fleet.pdf --pdf-layout table --header "2024 年度资产盘点"
+    python cli.py --hosts hosts.txt --output-dir \\\\fileserver\\assets --host-concurrency 16 --user CORP\\scanner
+    python cli.py --sync --dry-run --snipeit-url http://192.168.1.100
+    python cli.py --input D:\\Assets\\PC-001.json --sync --snipeit-url https://assets.example.com
+"""
+
+import argparse
+import getpass
+import os
+import re
+import sys
+
+from fleet_scanner import (DEFAULT_HOST_CONCURRENCY, DEFAULT_HOST_TIMEOUT, DEFAULT_RETRIES, FleetScanner,
+                           read_host_list)
+from pdf_fonts import FONT_PATH_ENV, default_font_registry
+from pdf_report import DEFAULT_LAYOUT, LAYOUTS
+from plugin_manager import PluginManager, plugin_class_name
+from scan_engine import DEFAULT_MAX_WORKERS, DEFAULT_PLUGIN_TIMEOUT, ScanEngine
+from snapshot_cache import SnapshotCache, read_snapshot, write_snapshot
+from worker_tasks import HeadlessWorker, _export_worker_task, _scan_worker_task_plugin, _sync_worker_task
+
+# pythoncom 仅在 Windows 上可用
+try:
+    import pythoncom
+except ImportError:
+    pythoncom = None
+
+# 未通过 --snipeit-key 指定时从该环境变量读取 API 密钥，避免密钥出现在命令行与进程列表中
+SNIPEIT_KEY_ENV = 'SNIPEIT_API_KEY'
+
+
+def export_extensions(plugin):
+    """插件的 file_extension 以及 file_filter 中 *.ext 形式的扩展名（例如 jsonl.gz），均为小写、不带点。"""
+    extensions = {str(getattr(plugin, 'file_extension', '')).lstrip('.').lower()}
+    extensions.update(ext.lower() for ext in re.findall(r'\*\.([\w.]+)', str(getattr(plugin, 'file_filter', ''))))
+    extensions.discard('')
+    return extensions
+
+
+def find_export_plugin(plugins, path):
+    """按输出文件的扩展名选择导出插件，多个插件都匹配时取匹配最长的扩展名（.jsonl.gz 优先于 .gz）。"""
+    path = path.lower()
+    best, best_length = None, 0
+    for plugin in plugins:
+        for extension in export_extensions(plugin):
+            if path.endswith('.' + extension) and len(extension) > best_length:
+                best, best_length = plugin, len(extension)
+    return best
+
+
+def select_scan_plugins(plugins, names):
+    if not names:
+        return list(plugins)
+    wanted = {name.lower() for name in names}
+    return [p for p in plugins if getattr(p, 'name', '').lower() in wanted or plugin_class_name(p).lower() in wanted]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="IT 资产信息导出工具 (命令行版)")
+    parser.add_argument('--list', action='store_true', help="列出可用的扫描与导出插件后退出")
+    parser.add_argument('--only', action='append', metavar='插件名', help="只运行指定的扫描插件，可重复使用")
+    parser.add_argument('--snapshot', metavar='PATH', help="把扫描结果写成 JSON 快照")
+    parser.add_argument('--export', metavar='PATH', help="按扩展名选择导出插件导出报告，例如 .csv/.xlsx/.pdf/.jsonl/.jsonl.gz")
+    parser.add_argument('--header', default='', help="报告页眉文本")
+    parser.add_argument('--pdf-layout', choices=sorted(LAYOUTS),
+                        help=f"PDF 导出的版式：list 按类别逐项列出，table 每个配件一行的紧凑表格（默认 {DEFAULT_LAYOUT}）")
+    parser.add_argument('--refresh', action='store_true', help="忽略快照缓存，强制重新扫描")
+    parser.add_argument('--no-cache', action='store_true', help="不读取也不写入快照缓存")
+    parser.add_argument('--workers', type=int, default=DEFAULT_MAX_WORKERS, help="并发扫描线程数")
+    parser.add_argument('--timeout', type=float, default=DEFAULT_PLUGIN_TIMEOUT, help="插件默认超时（秒）")
+    parser.add_argument('--quiet', action='store_true', help="只输出错误信息")
+    parser.add_argument('--font-dir', action='append', metavar='DIR',
+                        help=f"PDF 导出使用的中文字体目录，可重复使用；也可通过环境变量 {FONT_PATH_ENV} 指定")
+    parser.add_argument('--input', metavar='SNAPSHOT', help="不扫描本机，改为读取已有的 JSON 快照（例如批量扫描的输出）")
+
+    sync = parser.add_argument_group("同步到 Snipe-IT")
+    sync.add_argument('--sync', action='store_true', help="把扫描结果同步到 Snipe-IT")
+    sync.add_argument('--snipeit-url', metavar='URL', help="Snipe-IT 内网地址")
+    sync.add_argument('--snipeit-external-url', metavar='URL', help="Snipe-IT 外网地址")
+    sync.add_argument('--snipeit-key', metavar='KEY', help=f"Snipe-IT API 密钥；默认读取环境变量 {SNIPEIT_KEY_ENV}")
+    sync.add_argument('--dry-run', action='store_true', help="只输出同步计划（新建/更新哪些资产），不向服务器写入任何数据")
+    sync.add_argument('--reconcile', action='store_true',
+                      help="预取服务器上的全部资产并列出扫描数据中没有的资产（资产数达到 20 台时自动进行），"
+                           "完整列表写入 --orphan-report 或缓存目录下的 snipeit_orphans.csv")
+    sync.add_argument('--orphan-report', metavar='CSV', help="核对结果的 CSV 文件路径，指定时隐含 --reconcile")
+    sync.add_argument('--custom-field', action='append', metavar='类别=列名',
+                      help="把某一类别的配件汇总写入 Snipe-IT 自定义字段，例如 CPU=_snipeit_cpu_1，可重复使用；"
+                           "只在单台机器的扫描数据中生效")
+
+    fleet = parser.add_argument_group("批量远程扫描")
+    fleet.add_argument('--hosts', metavar='FILE', help="主机列表文件（每行一台），通过 WMI 远程扫描这些主机")
+    fleet.add_argument('--output-dir', metavar='DIR', help="每台主机的快照输出目录，文件名为 <主机名>.json")
+    fleet.add_argument('--host-concurrency', type=int, default=DEFAULT_HOST_CONCURRENCY, help="同时扫描的主机数")
+    fleet.add_argument('--host-timeout', type=float, default=DEFAULT_HOST_TIMEOUT, help="单台主机的执行期限（秒）")
+    fleet.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help="主机不可达或超时后的重试次数")
+    fleet.add_argument('--user', help="远程 WMI 登录账号，例如 DOMAIN\\user；密码会在运行时提示输入")
+    return parser
+
+
+def run_fleet(args, scan_plugins, log):
+    """批量远程扫描：逐台写出快照，结束时输出汇总。全部成功返回 0，否则返回 1。"""
+    try:
+        hosts = read_host_list(args.hosts)
+    except OSError as e:
+        print(f"❌ 无法读取主机列表: {e}", file=sys.stderr)
+        return 2
+    if not hosts:
+        print("❌ 主机列表为空。", file=sys.stderr)
+        return 2
+
+    password = getpass.getpass(f"{args.user} 的密码: ") if args.user else None
+    scanner = FleetScanner(scan_plugins, user=args.user, password=password, host_concurrency=args.host_concurrency,
+                           host_timeout=args.host_timeout, retries=args.retries, workers_per_host=args.workers,
+                           plugin_timeout=args.timeout, output_dir=args.output_dir, log_callback=log)
+    log(f"--- 开始批量扫描 {len(hosts)} 台主机 (并发 {scanner.host_concurrency}) ---")
+    failed = []
+    results = scanner.scan(hosts)
+    try:
+        for result in results:
+            if not result.succeeded:
+                failed.append(result)
+    except KeyboardInterrupt:
+        results.close()
+        print("⛔ 批量扫描被用户中断。", file=sys.stderr)
+        return 130
+
+    log(f"--- 批量扫描结束: 成功 {len(hosts) - len(failed)} 台，失败 {len(failed)} 台 ---")
+    for result in failed:
+        print(f"  - {result.host}: {result.status} {result.error or ''}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def build_sync_config(args):
+    """把命令行参数转换为同步插件的 config，键与图形界面传入的一致；自定义字段映射格式错误时抛出 ValueError。"""
+    from snipeit_client import parse_custom_fields
+    return {
+        'internal_url': (args.snipeit_url or '').strip(),
+        'external_url': (args.snipeit_external_url or '').strip(),
+        'key': (args.snipeit_key or os.environ.get(SNIPEIT_KEY_ENV, '')).strip(),
+        'dry_run': args.dry_run,
+        'reconcile': args.reconcile or bool(args.orphan_report),
+        'orphan_report_path': args.orphan_report,
+        'custom_fields': parse_custom_fields(args.custom_field),
+    }
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    log = (lambda message: None) if args.quiet else print
+
+    manager = PluginManager(log_callback=log)
+    manager.discover_plugins()
+
+    if args.list:
+        print("扫描插件:")
+        for plugin in manager.get_scan_plugins():
+            print(f"  - {getattr(plugin, 'name', '未命名插件')}")
+        print("导出插件:")
+        for plugin in manager.get_export_plugins():
+            print(f"  - {getattr(plugin, 'name', '未命名插件')} ({getattr(plugin, 'file_extension', '')})")
+        return 0
+
+    if args.hosts and not args.output_dir:
+        print("❌ 批量扫描需要指定 --output-dir。", file=sys.stderr)
+        return 2
+    if args.hosts and (args.snapshot or args.export or args.sync or args.input):
+        print("❌ --hosts 不能与 --snapshot、--export、--sync 或 --input 一起使用；"
+              "批量扫描写出的快照可以再用 --input <主机名>.json 导出或同步。", file=sys.stderr)
+        return 2
+    if not args.hosts and not args.snapshot and not args.export and not args.sync:
+        print("❌ 请至少指定 --snapshot、--export 或 --sync 之一。", file=sys.stderr)
+        return 2
+    if (args.dry_run or args.reconcile or args.orphan_report or args.custom_field) and not args.sync:
+        print("❌ --dry-run、--reconcile、--orphan-report 与 --custom-field 需要与 --sync 一起使用。", file=sys.stderr)
+        return 2
+
+    if args.font_dir:
+        default_font_registry().configure(args.font_dir)
+
+    export_plugin = None
+    if args.export:
+        export_plugin = find_export_plugin(manager.get_export_plugins(), args.export)
+        if export_plugin is None:
+            print(f"❌ 没有可以导出 '{args.export}' 的插件。", file=sys.stderr)
+            return 2
+        if args.pdf_layout and hasattr(export_plugin, 'layout'):
+            export_plugin.layout = args.pdf_layout
+
+    sync_plugin, sync_config = None, None
+    if args.sync:
+        sync_plugins = manager.get_sync_plugins()
+        if not sync_plugins:
+            print("❌ 未找到同步插件。", file=sys.stderr)
+            return 2
+        try:
+            sync_plugin, sync_config = sync_plugins[0], build_sync_config(args)
+        except ValueError as e:
+            print(f"❌ {e}", file=sys.stderr)
+            return 2
+        if not sync_config['internal_url'] and not sync_config['external_url']:
+            print("❌ 同步需要指定 --snipeit-url 或 --snipeit-external-url。", file=sys.stderr)
+            return 2
+        if not sync_config['key']:
+            print(f"❌ 同步需要 API 密钥：请使用 --snipeit-key 或设置环境变量 {SNIPEIT_KEY_ENV}。", file=sys.stderr)
+            return 2
+
+    worker = HeadlessWorker(log)
+    if args.input:
+        try:
+            data = read_snapshot(args.input)['data']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ 无法读取快照: {e}", file=sys.stderr)
+            return 2
+        log(f"已读取快照 {args.input}: {len(data)} 条记录。")
+    else:
+        scan_plugins = select_scan_plugins(manager.get_scan_plugins(), args.only)
+        if not scan_plugins:
+            print("❌ 没有匹配的扫描插件。", file=sys.stderr)
+            return 2
+
+        if args.hosts:
+            return run_fleet(args, scan_plugins, log)
+
+        if pythoncom:
+            pythoncom.CoInitialize()
+        try:
+            engine = ScanEngine(max_workers=args.workers, default_timeout=args.timeout)
+            cache = None if args.no_cache else SnapshotCache()
+            data = _scan_worker_task_plugin(worker, scan_plugins, snapshot_cache=cache, force_refresh=args.refresh,
+                                            engine=engine)
+        except KeyboardInterrupt:
+            print("⛔ 扫描被用户中断。", file=sys.stderr)
+            return 130
+        finally:
+            if pythoncom:
+                pythoncom.CoUninitialize()
+
+    if data is None:
+        print("❌ 扫描失败，未获得任何数据。", file=sys.stderr)
+        return 1
+
+    if args.snapshot:
+        write_snapshot(args.snapshot, data)
+        log(f"✅ 快照已写入: {args.snapshot}")
+
+    if export_plugin is not None:
+        result = _export_worker_task(worker, export_plugin, data, args.export, args.header, None)
+        if not (isinstance(result, str) and os.path.exists(result)):
+            print(f"❌ 导出失败: {result}", file=sys.stderr)
+            return 1
+        log(f"✅ 报告已导出: {result}")
+
+    if sync_plugin is not None:
+        try:
+            if not _sync_worker_task(worker, sync_plugin, data, sync_config):
+                return 1
+        except KeyboardInterrupt:
+            print("⛔ 同步被用户中断。", file=sys.stderr)
+            return 130
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
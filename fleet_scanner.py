@@ -0,0 +1,204 @@
+# fleet_scanner.py
+
+"""
+批量远程扫描：对主机列表中的每台计算机通过 wmi.WMI(computer=...) 远程运行现有的扫描插件。
+多台主机并发扫描（数量有上限），每台主机有独立的执行期限与重试次数，
+每台主机扫描完成后立即写出各自的 JSON 快照，不必等待整批结束。
+"""
+
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from scan_engine import DEFAULT_PLUGIN_TIMEOUT, ScanEngine
+from snapshot_cache import write_snapshot
+from wmi_broker import remote_connector_factory
+
+# pythoncom 仅在 Windows 上可用；使用假连接器做基准测试时优雅降级
+try:
+    import pythoncom
+except ImportError:
+    pythoncom = None
+
+# 同时扫描的主机数
+DEFAULT_HOST_CONCURRENCY = 8
+# 单台主机（含所有插件）的执行期限（秒）
+DEFAULT_HOST_TIMEOUT = 120
+# 主机无法连接或超时后的重试次数
+DEFAULT_RETRIES = 1
+# 第 n 次重试前等待 n * DEFAULT_RETRY_DELAY 秒
+DEFAULT_RETRY_DELAY = 5
+# 每台主机内部并发执行插件的线程数；远程 DCOM 连接开销较大，保持较小
+DEFAULT_WORKERS_PER_HOST = 2
+
+# 可以重试的结果状态
+RETRYABLE_STATUSES = ('unreachable', 'timeout', 'error')
+
+
+def read_host_list(path):
+    """读取主机列表文件：每行一台主机，忽略空行与 # 开头的注释，去除重复项并保持顺序。"""
+    hosts = []
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        for line in f:
+            host = line.split('#', 1)[0].strip()
+            if host and host not in hosts:
+                hosts.append(host)
+    return hosts
+
+
+def snapshot_filename(host):
+    return re.sub(r'[^\w.-]', '_', host) + '.json'
+
+
+class HostResult:
+    """单台主机的扫描结果。status: ok / partial / timeout / unreachable / error / cancelled。"""
+
+    def __init__(self, host, status, data=None, attempts=0, elapsed=0.0, error=None, snapshot_path=None):
+        self.host = host
+        self.status = status
+        self.data = data
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.error = error
+        self.snapshot_path = snapshot_path
+
+    @property
+    def succeeded(self):
+        return self.status in ('ok', 'partial')
+
+    def __repr__(self):
+        return f"HostResult({self.host!r}, {self.status!r}, attempts={self.attempts}, elapsed={self.elapsed:.2f})"
+
+
+class FleetScanner:
+    """
+    并发扫描多台远程主机。
+    connector_factory(host) 返回该主机的连接器工厂（签名同 wmi_broker.default_connector_factory），
+    默认使用 remote_connector_factory；测试与基准测试可以注入模拟慢主机或不可达主机的假工厂。
+    每次尝试前先在主机线程中建立一次探测连接，不可达的主机不会进入扫描引擎，避免每个插件各等一次 DCOM 超时。
+    """
+
+    def __init__(self, scan_plugins, connector_factory=None, user=None, password=None,
+                 host_concurrency=DEFAULT_HOST_CONCURRENCY, host_timeout=DEFAULT_HOST_TIMEOUT,
+                 retries=DEFAULT_RETRIES, retry_delay=DEFAULT_RETRY_DELAY, workers_per_host=DEFAULT_WORKERS_PER_HOST,
+                 plugin_timeout=DEFAULT_PLUGIN_TIMEOUT, output_dir=None, log_callback=print, verbose=False):
+        self.scan_plugins = list(scan_plugins)
+        self.connector_factory = connector_factory or (lambda host: remote_connector_factory(host, user, password))
+        self.host_concurrency = max(1, int(host_concurrency))
+        self.host_timeout = host_timeout
+        self.retries = max(0, int(retries))
+        self.retry_delay = retry_delay
+        self.workers_per_host = workers_per_host
+        self.plugin_timeout = plugin_timeout
+        self.output_dir = output_dir
+        self.log = log_callback
+        self.verbose = verbose
+        self.cancel_event = threading.Event()
+        self._active_events = set()
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """停止调度新的主机，并让正在扫描的主机尽快结束。"""
+        self.cancel_event.set()
+        with self._lock:
+            for event in self._active_events:
+                event.set()
+
+    def scan(self, hosts):
+        """按完成顺序逐台产出 HostResult；提前关闭生成器会取消剩余主机。"""
+        hosts = list(hosts)
+        if not hosts:
+            return
+        if self.output_dir:
+            os.makedirs(self.output_dir, exist_ok=True)
+        with ThreadPoolExecutor(max_workers=min(self.host_concurrency, len(hosts))) as pool:
+            futures = [pool.submit(self.scan_host, host) for host in hosts]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                if not all(future.done() for future in futures):
+                    self.cancel()
+
+    def scan_host(self, host):
+        """扫描一台主机（含重试），写出快照并返回 HostResult。"""
+        start = time.perf_counter()
+        status, data, error, attempts = 'cancelled', None, None, 0
+        while not self.cancel_event.is_set():
+            attempts += 1
+            status, data, error = self._attempt(host)
+            if status not in RETRYABLE_STATUSES or attempts > self.retries:
+                break
+            delay = self.retry_delay * attempts
+            self.log(f"⚠️ [{host}] {error}，{delay:g} 秒后进行第 {attempts} 次重试...")
+            if self.cancel_event.wait(delay):
+                status = 'cancelled'
+                break
+
+        result = HostResult(host, status, data, attempts, time.perf_counter() - start, error)
+        if self.output_dir and status != 'cancelled':
+            try:
+                result.snapshot_path = write_snapshot(os.path.join(self.output_dir, snapshot_filename(host)), data,
+                                                      host=host, status=status, attempts=attempts, error=error)
+            except OSError as e:
+                self.log(f"⚠️ [{host}] 快照写入失败: {e}")
+
+        if result.succeeded:
+            self.log(f"✅ [{host}] 扫描完成: {len(data)} 条记录 (耗时 {result.elapsed:.1f}s, 尝试 {attempts} 次)。")
+        elif status != 'cancelled':
+            self.log(f"❌ [{host}] 扫描失败 ({status}): {error}")
+        return result
+
+    def _attempt(self, host):
+        """对主机执行一次完整扫描，返回 (状态, 数据, 错误信息)。"""
+        factory = self.connector_factory(host)
+        if pythoncom:
+            pythoncom.CoInitialize()
+        try:
+            # 探测连接：不可达的主机在这里失败一次即可
+            factory()
+        except Exception as e:
+            return 'unreachable', None, f"无法连接: {e}"
+        finally:
+            if pythoncom:
+                pythoncom.CoUninitialize()
+
+        host_cancel = threading.Event()
+        with self._lock:
+            self._active_events.add(host_cancel)
+        if self.cancel_event.is_set():
+            host_cancel.set()
+        timer = threading.Timer(self.host_timeout, host_cancel.set)
+        timer.daemon = True
+        timer.start()
+
+        errors = []
+
+        def host_log(message):
+            if message.startswith('❌'):
+                errors.append(message)
+            if self.verbose:
+                self.log(f"[{host}] {message}")
+
+        engine = ScanEngine(connector_factory=factory, max_workers=self.workers_per_host,
+                            default_timeout=self.plugin_timeout)
+        try:
+            data = engine.run(self.scan_plugins, log_callback=host_log, cancel_event=host_cancel)
+        except Exception as e:
+            return 'error', None, str(e)
+        finally:
+            timer.cancel()
+            with self._lock:
+                self._active_events.discard(host_cancel)
+
+        if data is None:
+            return 'unreachable', None, errors[-1] if errors else "WMI 连接失败"
+        if self.cancel_event.is_set():
+            return 'cancelled', data, "扫描已取消"
+        if host_cancel.is_set():
+            return 'timeout', data, f"超过 {self.host_timeout:g} 秒未完成"
+        if engine.timed_out:
+            return 'partial', data, f"部分模块超时: {', '.join(sorted(engine.timed_out))}"
+        return 'ok', data, None
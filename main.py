@@ -7,7 +7,6 @@ IT 资产信息导出工具 (v2.0)
 # 基础库导入
 import os
 import sys
-import wmi
 import traceback
 import pythoncom
 import re
@@ -15,6 +14,7 @@ import ctypes
 import winreg
 import time
 import inspect
+import threading
 
 # UI 主题与风格库
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QHBoxLayout,
@@ -30,7 +30,12 @@ import pywinstyles
 import win32print
 
 # 本地模块导入
+from pdf_report import DEFAULT_LAYOUT
 from plugin_manager import PluginManager
+from snapshot_cache import SnapshotCache
+from snipeit_client import parse_custom_fields
+from wmi_broker import WMIQueryBroker
+from worker_tasks import _scan_worker_task_plugin, _diagnostics_worker_task, _export_worker_task
 
 # --- 全局定义 ---
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -79,6 +84,11 @@ class Worker(QObject):
         self.task = task
         self.args = args
         self.kwargs = kwargs
+        # 协作式取消标志，由支持取消的任务函数自行检查
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
 
     def run(self):
         pythoncom.CoInitialize()
@@ -242,6 +252,11 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 1100, 800)
         self.current_theme = theme
         self.scanned_data = None
+        self.active_tasks = []  # 正在运行的 (QThread, Worker)，保持引用直到线程结束
+        self.scan_worker = None
+        # 会话级 WMI 查询代理：扫描与诊断共享，每次重新扫描时重建
+        self.wmi_broker = WMIQueryBroker()
+        self.snapshot_cache = SnapshotCache()
         self.nav_pane_expanded = True
         print("正在初始化插件管理器...")
         self.plugin_manager = PluginManager()
@@ -399,6 +414,13 @@ class MainWindow(QMainWindow):
         snipe_key_layout.addWidget(snipe_key_label)
         snipe_key_layout.addWidget(self.snipe_key_edit)
         card_layout.addLayout(snipe_key_layout)
+        custom_fields_layout = QHBoxLayout()
+        custom_fields_label = QLabel("Snipe-IT 自定义字段:")
+        self.snipe_custom_fields_edit = QLineEdit()
+        self.snipe_custom_fields_edit.setPlaceholderText("类别=数据库列名，例如: CPU=_snipeit_cpu_1; 内存=_snipeit_ram_2")
+        custom_fields_layout.addWidget(custom_fields_label)
+        custom_fields_layout.addWidget(self.snipe_custom_fields_edit)
+        card_layout.addLayout(custom_fields_layout)
         theme_layout = QHBoxLayout()
         self.theme_check = QCheckBox("暗黑模式")
         self.theme_check.setChecked(self.current_theme == 'dark')
@@ -434,6 +456,12 @@ class MainWindow(QMainWindow):
         self.scan_button.clicked.connect(self.start_scan)
         if self.icons: self.scan_button.setIcon(self.icons.get("scan")); self.scan_button.setIconSize(QSize(20, 20))
         card_layout_action.addWidget(self.scan_button)
+        self.cancel_scan_button = QPushButton("取消扫描")
+        self.cancel_scan_button.clicked.connect(self.cancel_scan)
+        self.cancel_scan_button.setVisible(False)
+        card_layout_action.addWidget(self.cancel_scan_button)
+        self.force_refresh_check = QCheckBox("强制刷新（忽略快照缓存）")
+        card_layout_action.addWidget(self.force_refresh_check)
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
         self.progress_bar.setTextVisible(False)
@@ -514,6 +542,10 @@ class MainWindow(QMainWindow):
             self.export_buttons[plugin.name] = button
             col += 1
             if col % 2 == 0: row, col = row + 1, 0
+        if col != 0: row, col = row + 1, 0
+        self.pdf_table_layout_check = QCheckBox("PDF/打印使用紧凑表格版式（每个配件一行，适合多台机器汇总）")
+        self.card_layout.addWidget(self.pdf_table_layout_check, row, col, 1, 2)
+        row += 1
         sync_plugins = self.plugin_manager.get_sync_plugins()
         if sync_plugins:
             self.sync_button = QPushButton(getattr(sync_plugins[0], 'name', '未命名插件'))
@@ -525,6 +557,10 @@ class MainWindow(QMainWindow):
                 self.sync_button.setIconSize(QSize(24, 24))
             if col != 0: row, col = row + 1, 0
             self.card_layout.addWidget(self.sync_button, row, col, 1, 2)
+            self.sync_dry_run_check = QCheckBox("仅预览同步计划（dry-run，不写入 Snipe-IT）")
+            self.card_layout.addWidget(self.sync_dry_run_check, row + 1, 0, 1, 2)
+            self.sync_reconcile_check = QCheckBox("核对 Snipe-IT 中多余的资产（列表写入缓存目录的 snipeit_orphans.csv）")
+            self.card_layout.addWidget(self.sync_reconcile_check, row + 2, 0, 1, 2)
         page_layout.addStretch(1)
         page_layout.addWidget(card)
         page_layout.addStretch(1)
@@ -568,18 +604,26 @@ class MainWindow(QMainWindow):
         pywinstyles.change_header_color(self, header_color)
 
     def start_task(self, task, on_finish, *args, **kwargs):
-        self.thread = QThread()
-        self.worker = Worker(task, *args, **kwargs)
-        self.worker.moveToThread(self.thread)
-        self.thread.started.connect(self.worker.run)
-        self.worker.finished.connect(on_finish)
-        self.worker.finished.connect(self.thread.quit)
-        self.worker.finished.connect(self.worker.deleteLater)
-        self.thread.finished.connect(self.thread.deleteLater)
-        self.worker.log_message.connect(self.update_log)
-        self.worker.error_message.connect(self.show_error_message)
-        self.worker.progress_update.connect(self.update_progress)
-        self.thread.start()
+        thread = QThread()
+        worker = Worker(task, *args, **kwargs)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.finished.connect(on_finish)
+        worker.finished.connect(thread.quit)
+        worker.finished.connect(worker.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.finished.connect(lambda entry=(thread, worker): self._task_finished(entry))
+        worker.log_message.connect(self.update_log)
+        worker.error_message.connect(self.show_error_message)
+        worker.progress_update.connect(self.update_progress)
+        # 保存引用，避免新任务覆盖仍在运行的线程对象
+        self.active_tasks.append((thread, worker))
+        thread.start()
+        return worker
+
+    def _task_finished(self, entry):
+        if entry in self.active_tasks:
+            self.active_tasks.remove(entry)
 
     def start_scan(self):
         self.set_buttons_state(False)
@@ -599,9 +643,21 @@ class MainWindow(QMainWindow):
             self.scan_button.setText("开始扫描硬件信息")
             self.progress_bar.setVisible(False)
             return
-        self.start_task(_scan_worker_task_plugin, self._scan_finished, selected_plugins)
+        self.wmi_broker = WMIQueryBroker()
+        self.cancel_scan_button.setEnabled(True)
+        self.cancel_scan_button.setVisible(True)
+        self.scan_worker = self.start_task(_scan_worker_task_plugin, self._scan_finished, selected_plugins,
+                                           self.wmi_broker, self.snapshot_cache, self.force_refresh_check.isChecked())
+
+    def cancel_scan(self):
+        if self.scan_worker is not None:
+            self.update_log("⛔ 正在取消扫描，等待当前模块释放资源...")
+            self.cancel_scan_button.setEnabled(False)
+            self.scan_worker.cancel()
 
     def _scan_finished(self, scanned_data):
+        self.scan_worker = None
+        self.cancel_scan_button.setVisible(False)
         self.scanned_data = scanned_data
         self.scan_button.setText("重新扫描硬件信息")
         self.progress_bar.setVisible(False)
@@ -619,10 +675,18 @@ class MainWindow(QMainWindow):
         if not sync_plugins:
             QMessageBox.critical(self, "错误", "未找到同步插件。")
             return
+        try:
+            custom_fields = parse_custom_fields(self.snipe_custom_fields_edit.text())
+        except ValueError as e:
+            QMessageBox.warning(self, "配置错误", str(e))
+            return
         config = {
             'internal_url': self.snipe_internal_url_edit.text().strip(),
             'external_url': self.snipe_external_url_edit.text().strip(),
-            'key': self.snipe_key_edit.text().strip()
+            'key': self.snipe_key_edit.text().strip(),
+            'dry_run': self.sync_dry_run_check.isChecked(),
+            'reconcile': self.sync_reconcile_check.isChecked(),
+            'custom_fields': custom_fields,
         }
         print(f"--- 调试信息: 准备传递给插件的配置 ---\n{config}\n------------------------------------")
         self.start_task(sync_plugins[0].sync, self._sync_finished, self.scanned_data, config)
@@ -643,7 +707,7 @@ class MainWindow(QMainWindow):
             self.set_buttons_state(True)
             self.start_diag_button.setText("开始系统诊断")
             return
-        self.start_task(_diagnostics_worker_task, self._diagnostics_finished, diag_plugins)
+        self.start_task(_diagnostics_worker_task, self._diagnostics_finished, diag_plugins, self.wmi_broker)
 
     def _diagnostics_finished(self, results):
         if results:
@@ -665,6 +729,8 @@ class MainWindow(QMainWindow):
         if self.scanned_data is None:
             QMessageBox.warning(self, "无数据", "请先扫描硬件信息后再导出。")
             return
+        if hasattr(plugin, 'layout'):
+            plugin.layout = 'table' if self.pdf_table_layout_check.isChecked() else DEFAULT_LAYOUT
         if plugin.name == "打印报告":
             self.set_buttons_state(False)
             self.update_log("\n正在准备打印...")
@@ -710,9 +776,6 @@ class MainWindow(QMainWindow):
             self.update_log("✅ 打印预览已在默认PDF阅读器中打开。")
             self.show_error_message("请手动打印",
                                     "报告已在您的默认PDF阅读器中打开。\n\n请在该程序中使用打印功能 (通常是按 Ctrl+P) 来完成打印。")
-            cleanup_worker = CleanupWorker(result.get("path"), parent=self)
-            cleanup_worker.log_message.connect(self.update_log)
-            cleanup_worker.start()
         elif isinstance(result, str) and (os.path.exists(result) or "失败" in result):
             if "失败" in result:
                 self.update_log(f"❌ 操作失败。返回信息: {result}")
@@ -723,88 +786,6 @@ class MainWindow(QMainWindow):
         self.set_buttons_state(True)
 
 
-# --- 打印后清理文件的线程 ---
-class CleanupWorker(QThread):
-    log_message = Signal(str)
-
-    def __init__(self, path, parent=None):
-        super().__init__(parent); self.path = path
-
-    def run(self):
-        self.sleep(15)
-        try:
-            if self.path and os.path.exists(self.path):
-                os.remove(self.path)
-                self.log_message.emit("  -> 已清理临时打印文件。")
-        except Exception as e:
-            self.log_message.emit(f"  -> 清理临时文件失败: {e}")
-
-
-# --- 后台任务函数 (全局) ---
-def _scan_worker_task_plugin(worker, scan_plugins):
-    log_signal, progress_signal = worker.log_message.emit, worker.progress_update.emit
-    hardware_data = []
-    total_steps = len(scan_plugins)
-    current_step = 0
-    if total_steps == 0: return []
-    log_signal("正在连接 WMI 核心服务...")
-    try:
-        c_wmi = wmi.WMI()
-    except Exception as e:
-        log_signal(f"❌ WMI 连接失败: {e}"); return None
-    for plugin in scan_plugins:
-        log_signal(f"--- 正在扫描: {getattr(plugin, 'name', '未命名插件')} ---")
-        try:
-            result = plugin.scan(c_wmi)
-            if result:
-                hardware_data.extend(result); log_signal(f"✅ 模块 '{plugin.name}' 扫描成功。")
-            else:
-                log_signal(f"⚠️ 模块 '{plugin.name}' 扫描完成，但未返回数据。")
-        except Exception as e:
-            log_signal(f"❌ 模块 '{plugin.name}' 扫描失败: {e}")
-        current_step += 1
-        progress_signal(int((current_step / total_steps) * 100))
-    progress_signal(100)
-    return hardware_data
-
-
-def _diagnostics_worker_task(worker, diag_plugins):
-    log_signal = worker.log_message.emit
-    all_results = {}
-    for plugin in diag_plugins:
-        plugin_name = getattr(plugin, 'name', '未命名插件')
-        log_signal(f"--- 正在运行诊断: {plugin_name} ---")
-        try:
-            results = plugin.run_diagnostic()
-            all_results[plugin_name] = results
-            log_signal(f"✅ 模块 '{plugin_name}' 诊断完成。")
-        except Exception as e:
-            log_signal(f"❌ 模块 '{plugin.name}' 诊断失败: {e}")
-            all_results[plugin_name] = [{'task': '插件执行', 'status': '错误', 'message': str(e)}]
-    return all_results
-
-
-def _export_worker_task(worker, plugin, data, file_path, header_text, printer_name):
-    result = None
-    try:
-        worker.log_message.emit(f"  -> 正在尝试调用插件 '{getattr(plugin, 'name', '未命名插件')}'...")
-        try:
-            result = plugin.export(data, file_path, header_text, worker.log_message.emit, printer_name)
-        except TypeError:
-            try:
-                result = plugin.export(data, file_path, header_text, worker.log_message.emit)
-            except TypeError:
-                try:
-                    result = plugin.export(data, file_path, header_text)
-                except TypeError as final_e:
-                    worker.log_message.emit(
-                        f"❌ 插件 '{getattr(plugin, 'name', '未知插件')}' 的调用失败，参数不匹配。最终错误: {final_e}")
-    except Exception as general_e:
-        worker.log_message.emit(f"❌ 插件 {getattr(plugin, 'name', '未知插件')} 导出时发生内部错误: {general_e}")
-        worker.log_message.emit(traceback.format_exc())
-    return result
-
-
 # --- 程序入口 ---
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -0,0 +1,122 @@
+# pdf_fonts.py
+
+"""
+PDF 导出与打印共用的中文字体注册表：每个字体文件在进程内只查找、解析并向 reportlab 注册一次，
+之后的导出直接使用已注册的字体名，不再重复解析 msyh.ttf / simsun.ttc 这类十几 MB 的字体文件。
+字体搜索路径可以通过环境变量 ASSET_TOOL_FONT_PATH（多个目录用 os.pathsep 分隔）或 configure() 指定，
+随后依次搜索 Windows、Linux、macOS 的常见字体目录，因此在 Linux 构建机上也能导出 PDF。
+"""
+
+import os
+import threading
+import time
+
+FONT_PATH_ENV = 'ASSET_TOOL_FONT_PATH'
+# 按优先顺序排列的中文字体文件名；reportlab 只支持 TrueType 轮廓，Noto CJK 等 CFF 字体不在此列
+PREFERRED_FONTS = ('msyh.ttf', 'msyh.ttc', 'simhei.ttf', 'deng.ttf', 'simsun.ttc',
+                   'wqy-microhei.ttc', 'wqy-zenhei.ttc', 'DroidSansFallbackFull.ttf')
+FONT_NAME_PREFIX = 'CJK-'
+
+
+def default_font_dirs():
+    """系统与当前用户的字体目录，不存在的目录会在搜索时跳过。"""
+    system_root = os.environ.get('SystemRoot', 'C:\\Windows')
+    home = os.path.expanduser('~')
+    dirs = [os.path.join(system_root, 'Fonts')]
+    if os.environ.get('LOCALAPPDATA'):
+        # Windows 10 起普通用户安装的字体位于此处
+        dirs.append(os.path.join(os.environ['LOCALAPPDATA'], 'Microsoft', 'Windows', 'Fonts'))
+    dirs += ['/usr/share/fonts', '/usr/local/share/fonts', os.path.join(home, '.local', 'share', 'fonts'),
+             os.path.join(home, '.fonts'), '/Library/Fonts', '/System/Library/Fonts']
+    return dirs
+
+
+def font_search_path(extra_dirs=None):
+    """搜索顺序：显式指定的目录、ASSET_TOOL_FONT_PATH、系统默认目录。"""
+    env_dirs = [d for d in os.environ.get(FONT_PATH_ENV, '').split(os.pathsep) if d]
+    return list(extra_dirs or ()) + env_dirs + default_font_dirs()
+
+
+def find_font(font_names, search_path):
+    """
+    按 font_names 的优先顺序返回第一个找到的字体文件路径，找不到时返回 None。
+    Linux 的字体按厂商分布在子目录中，因此递归搜索；文件名比较不区分大小写。
+    """
+    wanted = {name.lower(): rank for rank, name in enumerate(font_names)}
+    best_rank, best_path = len(wanted), None
+    for font_dir in search_path:
+        if not os.path.isdir(font_dir):
+            continue
+        for root, _, files in os.walk(font_dir):
+            for filename in files:
+                rank = wanted.get(filename.lower())
+                if rank is not None and rank < best_rank:
+                    best_rank, best_path = rank, os.path.join(root, filename)
+        if best_rank == 0:
+            break
+    return best_path
+
+
+class FontFace:
+    def __init__(self, name, path, parse_seconds):
+        self.name = name                    # 在 reportlab 中注册的字体名，传给 canvas.setFont()
+        self.path = path
+        self.parse_seconds = parse_seconds  # 首次解析字体文件的耗时
+
+    def __repr__(self):
+        return f"<FontFace {self.name} {self.path}>"
+
+
+class FontRegistry:
+    """
+    进程级的字体注册表。register() 的结果按字体偏好列表缓存：同一列表只查找一次字体文件，
+    同一字体文件只解析、注册一次，PDF 导出与打印拿到的是同一个注册名。
+    找不到字体的结果同样会被缓存，修改搜索路径请调用 configure()。
+    """
+
+    def __init__(self, search_path=None):
+        self._search_path = search_path
+        self._lookups = {}
+        self._faces = {}
+        self._lock = threading.Lock()
+        self.parses = 0
+
+    @property
+    def search_path(self):
+        return self._search_path if self._search_path is not None else font_search_path()
+
+    def configure(self, search_path=None):
+        """指定额外的字体目录（排在环境变量与系统目录之前），并清空已缓存的查找结果。"""
+        with self._lock:
+            self._search_path = font_search_path(search_path) if search_path else None
+            self._lookups.clear()
+
+    def register(self, font_names=PREFERRED_FONTS):
+        """返回已注册的 FontFace；找不到任何可用字体时返回 None。"""
+        key = tuple(font_names)
+        with self._lock:
+            if key not in self._lookups:
+                path = find_font(key, self.search_path)
+                self._lookups[key] = self._face_locked(path) if path else None
+            return self._lookups[key]
+
+    def _face_locked(self, path):
+        face = self._faces.get(os.path.normcase(os.path.abspath(path)))
+        if face is None:
+            from reportlab.pdfbase import pdfmetrics
+            from reportlab.pdfbase.ttfonts import TTFont
+
+            name = FONT_NAME_PREFIX + os.path.splitext(os.path.basename(path))[0]
+            start = time.perf_counter()
+            pdfmetrics.registerFont(TTFont(name, path))
+            face = FontFace(name, path, time.perf_counter() - start)
+            self._faces[os.path.normcase(os.path.abspath(path))] = face
+            self.parses += 1
+        return face
+
+
+_default_registry = FontRegistry()
+
+
+def default_font_registry():
+    return _default_registry
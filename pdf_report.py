@@ -0,0 +1,346 @@
+# pdf_report.py
+
+"""
+PDF 报告渲染：PDF 导出与打印共用同一套排版，报告渲染到内存中的字节串，
+并按 (数据内容, 页眉文本, 字体, 版式) 的哈希缓存。同一次扫描结果重复导出或打印时直接复用缓存，不再重新排版。
+
+两种版式：
+  - list: 按类别分组、每个字段占一行的版式（默认）；
+  - table: 横向页面上每个配件一行的紧凑表格，每页重复表头，适合汇总多台机器的报告，
+    可在命令行用 --pdf-layout table 或在导出页面勾选“紧凑表格版式”选用。
+"""
+
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from itertools import accumulate, islice
+
+from asset_table import ASSET_FIELDS, DICTIONARY_FIELDS, AssetTable
+
+# 渲染缓存占用的内存上限（字节）；最近一次渲染的报告总会保留
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+# 打印用临时文件所在目录，以及它们被清理前至少保留的时间（秒），保证 PDF 阅读器已经打开文件
+PRINT_DIR_NAME = 'IT-Asset-Tool-print'
+PRINT_FILE_MAX_AGE = 3600
+
+DEFAULT_LAYOUT = 'list'
+# 表格版式的尺寸（pt）
+TABLE_MARGIN = 36
+TABLE_FONT_SIZE = 8
+TABLE_TITLE_FONT_SIZE = 14
+TABLE_ROW_HEIGHT = 12
+TABLE_CELL_PADDING = 3
+ELLIPSIS = '...'
+# 每列缓存的截断结果数量上限，序列号等几乎不重复的列不会让缓存无限增长
+FIT_CACHE_SIZE = 4096
+
+
+def _item_pairs(data):
+    """按排版时的顺序产出每条记录的 (键, 值) 列表。"""
+    if isinstance(data, AssetTable):
+        # 附加字段（例如 资产名称）也会被逐项版式输出，必须计入缓存键
+        yield from data.iter_items()
+    else:
+        for item in data:
+            yield item.items()
+
+
+def report_key(data, header_text, font_name, layout=DEFAULT_LAYOUT):
+    """数据内容、页眉文本、字体与版式的 SHA-256，用作渲染缓存的键。"""
+    digest = hashlib.sha256()
+    digest.update(f"{layout}\x1d{font_name}\x1d{header_text or ''}\x1d".encode('utf-8'))
+    for pairs in _item_pairs(data):
+        digest.update('\x1f'.join(f"{key}\x1c{value}" for key, value in pairs).encode('utf-8', 'replace'))
+        digest.update(b'\x1e')
+    return digest.hexdigest()
+
+
+def render_list_report(data, header_text, font_name):
+    """按类别分组逐行排版资产数据，返回 PDF 字节串。font_name 为已在 reportlab 中注册的字体名。"""
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    y_position = height - 40
+
+    if header_text:
+        c.setFont(font_name, 16)
+        c.drawCentredString(width / 2.0, y_position, header_text)
+        y_position -= 40
+
+    last_category = None
+    for item in data:
+        # 检查是否需要换页
+        if y_position < 60:
+            c.showPage()
+            y_position = height - 40
+            last_category = None  # 换页后重新打印类别标题
+
+        current_category = item.get('类别', '未知类别')
+
+        # 如果是新的类别，打印一个大的类别标题
+        if current_category != last_category:
+            y_position -= 20  # 与上一个类别拉开间距
+            c.setFont(font_name, 14)
+            c.drawString(50, y_position, f"--- {current_category} ---")
+            y_position -= 25
+            last_category = current_category
+
+        # 遍历这条数据的所有键值对
+        for key, value in item.items():
+            # 我们已经打印过大的类别标题了，所以跳过'类别'这个键
+            if key == '类别':
+                continue
+
+            # 检查是否需要换页
+            if y_position < 40:
+                c.showPage()
+                y_position = height - 40
+                # 换页后把大标题也重新打上
+                c.setFont(font_name, 14)
+                c.drawString(50, y_position, f"--- {current_category} ---")
+                y_position -= 25
+
+            # 将键作为“项目”，值作为“详细信息”打印出来
+            c.setFont(font_name, 10)
+            c.drawString(70, y_position, f"{key}: {value}")
+            y_position -= 20  # 减小行距
+
+    c.save()
+    return buffer.getvalue()
+
+
+class StringWidths:
+    """
+    带缓存的字符串宽度测量。reportlab 对 TrueType 字体不做字距调整，字符串宽度等于各字符宽度之和，
+    因此按字符缓存 stringWidth() 的结果，中文字体下每个字符只测量一次。
+    """
+
+    def __init__(self, font_name, font_size):
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        self.font_name = font_name
+        self.font_size = font_size
+        self._string_width = stringWidth
+        self._chars = {}
+
+    def width(self, text):
+        chars = self._chars
+        total = 0.0
+        for char in text:
+            char_width = chars.get(char)
+            if char_width is None:
+                char_width = chars[char] = self._string_width(char, self.font_name, self.font_size)
+            total += char_width
+        return total
+
+    def fit(self, text, max_width):
+        """text 超出 max_width 时截断并加省略号。"""
+        if self.width(text) <= max_width:
+            return text
+        limit = max_width - self.width(ELLIPSIS)
+        total = 0.0
+        for index, char in enumerate(text):
+            total += self.width(char)
+            if total > limit:
+                return text[:index] + ELLIPSIS
+        return text
+
+
+def fit_columns(natural, available):
+    """
+    分配列宽：自然宽度不超过平均份额的列保持自然宽度，其余列平分剩余宽度（超出的文字在绘制时截断）。
+    所有列都比较窄时表格比页面窄，不做拉伸。
+    """
+    result = list(natural)
+    remaining = list(range(len(natural)))
+    space = available
+    while remaining:
+        share = space / len(remaining)
+        wide = [i for i in remaining if natural[i] > share]
+        if len(wide) == len(remaining):
+            for i in wide:
+                result[i] = share
+            break
+        space -= sum(natural[i] for i in remaining if natural[i] <= share)
+        remaining = wide
+    return result
+
+
+def _column_widths(table, widths, available):
+    """测量一次各列的自然宽度（类别、品牌等字典编码列只测量去重后的取值）并分配到页面宽度内。"""
+    natural = []
+    for field in ASSET_FIELDS:
+        values = table.distinct(field) if field in DICTIONARY_FIELDS else table.column(field)
+        longest = max((widths.width(str(value)) for value in values), default=0.0)
+        natural.append(max(widths.width(field), longest) + 2 * TABLE_CELL_PADDING)
+    return fit_columns(natural, available)
+
+
+def render_table_report(data, header_text, font_name):
+    """
+    每个配件一行的表格版式，返回 PDF 字节串。列宽在开始排版前测量一次，之后按页逐批取出数据行排版；
+    页面内容流由 reportlab 在 save() 时压缩 (pageCompression)。reportlab 的公开接口没有逐页写出的方式，
+    save() 之前所有页面的内容都留在内存中，峰值内存随页数线性增长（1 万台机器约 3200 页、44MB）。
+    """
+    from reportlab.lib.pagesizes import landscape, letter
+    from reportlab.pdfgen import canvas
+
+    table = AssetTable.coerce(data)
+    widths = StringWidths(font_name, TABLE_FONT_SIZE)
+    page_width, page_height = landscape(letter)
+    column_widths = _column_widths(table, widths, page_width - 2 * TABLE_MARGIN)
+    lefts = [TABLE_MARGIN + offset for offset in accumulate([0.0] + column_widths[:-1])]
+    table_width = sum(column_widths)
+    text_widths = [width - 2 * TABLE_CELL_PADDING for width in column_widths]
+    header_cells = [widths.fit(field, width) for field, width in zip(ASSET_FIELDS, text_widths)]
+    fit_caches = [{} for _ in ASSET_FIELDS]
+
+    buffer = io.BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(page_width, page_height), pageCompression=1)
+    rows = table.iter_tuples()
+    page = 0
+    while True:
+        page += 1
+        top = page_height - TABLE_MARGIN
+        if page == 1 and header_text:
+            c.setFont(font_name, TABLE_TITLE_FONT_SIZE)
+            c.drawCentredString(page_width / 2.0, top - TABLE_TITLE_FONT_SIZE, header_text)
+            top -= TABLE_TITLE_FONT_SIZE + 14
+        capacity = max(1, int((top - TABLE_MARGIN) // TABLE_ROW_HEIGHT) - 1)
+        page_rows = list(islice(rows, capacity))
+        if not page_rows and page > 1:
+            break
+
+        # 表头与隔行底色
+        c.setFillGray(0.85)
+        c.rect(TABLE_MARGIN, top - TABLE_ROW_HEIGHT, table_width, TABLE_ROW_HEIGHT, stroke=0, fill=1)
+        c.setFillGray(0.95)
+        for index in range(1, len(page_rows), 2):
+            c.rect(TABLE_MARGIN, top - TABLE_ROW_HEIGHT * (index + 2), table_width, TABLE_ROW_HEIGHT,
+                   stroke=0, fill=1)
+        c.setFillGray(0)
+
+        # 按列输出文字：每列只设置一次起点，之后以固定行距逐行换行，不必为每个单元格计算坐标和宽度
+        text = c.beginText()
+        text.setFont(font_name, TABLE_FONT_SIZE, leading=TABLE_ROW_HEIGHT)
+        for column, (left, header, width, cache) in enumerate(zip(lefts, header_cells, text_widths, fit_caches)):
+            text.setTextOrigin(left + TABLE_CELL_PADDING, top - TABLE_ROW_HEIGHT + 3)
+            text.textLine(header)
+            for values in page_rows:
+                value = str(values[column])
+                cell = cache.get(value)
+                if cell is None:
+                    cell = widths.fit(value, width)
+                    if len(cache) < FIT_CACHE_SIZE:
+                        cache[value] = cell
+                text.textLine(cell)
+        c.drawText(text)
+        c.setFont(font_name, TABLE_FONT_SIZE)
+        c.drawRightString(page_width - TABLE_MARGIN, TABLE_MARGIN / 2, f"第 {page} 页")
+        c.showPage()
+
+    c.save()
+    return buffer.getvalue()
+
+
+LAYOUTS = {'table': render_table_report, 'list': render_list_report}
+
+
+class PDFRenderCache:
+    """
+    进程级的 PDF 渲染缓存，{report_key: PDF 字节串}，按最近使用顺序淘汰，总大小不超过 max_bytes。
+    render() 返回 (PDF 字节串, 是否命中缓存)。
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.render_seconds = 0.0
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def render(self, data, header_text, font_name, layout=DEFAULT_LAYOUT):
+        key = report_key(data, header_text, font_name, layout)
+        with self._lock:
+            pdf = self._entries.get(key)
+            if pdf is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return pdf, True
+        start = time.perf_counter()
+        pdf = LAYOUTS[layout](data, header_text, font_name)
+        with self._lock:
+            self.misses += 1
+            self.render_seconds += time.perf_counter() - start
+            self._store_locked(key, pdf)
+        return pdf, False
+
+    def _store_locked(self, key, pdf):
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = pdf
+        self._size += len(pdf)
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries), 'bytes': self._size,
+                    'render_seconds': self.render_seconds}
+
+
+def write_pdf(pdf, path):
+    """先写临时文件再替换，避免导出中断时留下不完整的 PDF。"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(pdf)
+    os.replace(temp_path, path)
+    return path
+
+
+def print_file_path(pdf):
+    """
+    返回内容为 pdf 的打印用临时文件路径。文件名取自内容哈希，同一份报告再次打印时直接复用已有文件；
+    同时清理超过 PRINT_FILE_MAX_AGE 的旧文件（仍被 PDF 阅读器占用而无法删除的文件留待下次清理）。
+    """
+    print_dir = os.path.join(tempfile.gettempdir(), PRINT_DIR_NAME)
+    os.makedirs(print_dir, exist_ok=True)
+    path = os.path.join(print_dir, f"asset_report_{hashlib.sha256(pdf).hexdigest()[:16]}.pdf")
+    _prune_print_files(print_dir, keep=path)
+    if os.path.exists(path) and os.path.getsize(path) == len(pdf):
+        os.utime(path)
+        return path
+    return write_pdf(pdf, path)
+
+
+def _prune_print_files(print_dir, keep):
+    now = time.time()
+    for entry in os.scandir(print_dir):
+        try:
+            if entry.path != keep and entry.is_file() and now - entry.stat().st_mtime > PRINT_FILE_MAX_AGE:
+                os.remove(entry.path)
+        except OSError:
+            pass
+
+
+_default_cache = PDFRenderCache()
+
+
+def default_render_cache():
+    return _default_cache
@@ -0,0 +1,112 @@
+# plugin_index.py
+
+"""
+插件发现索引：把每个插件文件的静态扫描结果（类名、接口类型、名称、图标、扩展名等）持久化到磁盘，
+以 路径 + 修改时间 + 文件大小 + 内容哈希 作为键。未改动的插件在启动时既不读取也不解析。
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from snapshot_cache import default_cache_path
+
+# 索引格式或静态扫描规则变化时递增，旧索引会被整体丢弃
+INDEX_VERSION = 1
+
+
+def default_index_path():
+    return os.path.join(os.path.dirname(default_cache_path()), 'plugin_index.json')
+
+
+def file_digest(content):
+    return hashlib.sha1(content).hexdigest()
+
+
+class PluginIndex:
+    """
+    磁盘上的插件发现索引，结构为 {绝对路径: {mtime, size, sha1, entry}}。
+    查找时 mtime 与大小都一致则直接复用；否则读取文件比较内容哈希，
+    哈希一致（例如文件只是被重新复制过）时更新时间戳后复用，不一致才需要重新扫描。
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_index_path()
+        self.hits = 0
+        self.misses = 0
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def lookup(self, module_path, stat_result, read_source):
+        """
+        返回 (是否命中, 清单条目, 文件内容)。mtime 与大小一致时不调用 read_source()，文件内容为 None；
+        否则通过 read_source() 读取文件内容（bytes），未命中时调用方扫描后应调用 store() 写回。
+        """
+        with self._lock:
+            record = self._load().get(module_path)
+            if record and record.get('mtime') == stat_result.st_mtime_ns and record.get('size') == stat_result.st_size:
+                self.hits += 1
+                return True, record.get('entry'), None
+
+        content = read_source()
+        digest = file_digest(content)
+        with self._lock:
+            if record and record.get('sha1') == digest:
+                record['mtime'], record['size'] = stat_result.st_mtime_ns, stat_result.st_size
+                self._dirty = True
+                self.hits += 1
+                return True, record.get('entry'), content
+            self.misses += 1
+            return False, None, content
+
+    def store(self, module_path, stat_result, content, entry):
+        """记录一个插件文件的扫描结果；entry 为 None 表示该文件需要导入后才能识别。"""
+        with self._lock:
+            self._load()[module_path] = {
+                'mtime': stat_result.st_mtime_ns, 'size': stat_result.st_size,
+                'sha1': file_digest(content), 'entry': entry,
+            }
+            self._dirty = True
+
+    def prune(self, existing_paths, folder=None):
+        """
+        删除已不存在的插件文件的记录。多个插件目录共用同一个索引文件，
+        指定 folder 时只清理直接位于该目录下的记录，其它目录的记录保持不变。
+        """
+        existing_paths = set(existing_paths)
+        folder = os.path.normcase(os.path.abspath(folder)) if folder else None
+        with self._lock:
+            entries = self._load()
+            for module_path in [p for p in entries if p not in existing_paths]:
+                if folder is not None and os.path.normcase(os.path.dirname(os.path.abspath(module_path))) != folder:
+                    continue
+                del entries[module_path]
+                self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': INDEX_VERSION, 'entries': self._entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+            self._dirty = False
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = json.load(f)
+                if content.get('version') == INDEX_VERSION:
+                    self._entries = content.get('entries', {})
+            except (OSError, ValueError):
+                pass  # 索引文件不存在或已损坏时视为空索引，所有插件重新扫描
+        return self._entries
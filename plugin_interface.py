@@ -2,9 +2,69 @@
 
 from abc import ABC, abstractmethod
 
+from asset_table import AssetRecord
+
+
+class WMIQuery:
+    """
+    插件声明的 WMI 查询：只选取需要的属性，并把过滤条件下推到 WQL 的 WHERE 子句，
+    避免 SELECT * 后再在 Python 中逐条过滤。
+    where 可以是 {属性: 值} 形式的等值条件，也可以是原样使用的 WQL 条件字符串。
+    """
+
+    def __init__(self, class_name, properties=(), where=None, namespace=None):
+        self.class_name = class_name
+        self.properties = tuple(properties)
+        self.where = where
+        self.namespace = namespace
+
+    def where_clause(self) -> str:
+        if not self.where:
+            return ""
+        if isinstance(self.where, str):
+            return self.where
+        return " AND ".join(f"{key} = {_wql_literal(value)}" for key, value in self.where.items())
+
+    def wql(self, properties=None) -> str:
+        """生成 WQL 语句；properties 为 None 时使用声明的属性，空元组表示 SELECT *。"""
+        properties = self.properties if properties is None else properties
+        wql = f"SELECT {', '.join(properties) if properties else '*'} FROM {self.class_name}"
+        clause = self.where_clause()
+        if clause:
+            wql += f" WHERE {clause}"
+        return wql
+
+    def __repr__(self):
+        return f"WMIQuery({self.wql()!r}, namespace={self.namespace!r})"
+
+
+def _wql_literal(value):
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, (int, float)):
+        return str(value)
+    escaped = str(value).replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+# 被多个插件共用的查询：声明完全一致才能在查询代理中命中同一条缓存
+OPERATING_SYSTEM_QUERY = WMIQuery('Win32_OperatingSystem',
+                                  ('Caption', 'SerialNumber', 'InstallDate', 'LastBootUpTime'))
+DISK_DRIVE_QUERY = WMIQuery('Win32_DiskDrive', ('Model', 'Size', 'SerialNumber', 'Caption', 'Status'))
+BASEBOARD_QUERY = WMIQuery('Win32_BaseBoard', ('Manufacturer', 'Product', 'SerialNumber'))
+
+
 class ScanPlugin(ABC):
+    # 插件需要的 WMI 查询，{名称: WMIQuery}；scan() 中通过 wmi_connector.fetch(self.queries[名称]) 获取结果
+    queries = {}
+    # 扫描结果在磁盘快照缓存中的有效期（秒），0 表示每次都重新扫描
+    cache_ttl = 24 * 3600
+    # 单次扫描的执行期限（秒），超时后以标记行代替结果；None 表示使用扫描引擎的默认期限
+    timeout = None
+
     @abstractmethod
     def scan(self, wmi_instance) -> list:
+        # 返回 AssetRecord 列表；旧插件返回的中文键字典列表仍然兼容，会在合并时被适配
         pass
 
 class ExportPlugin(ABC):
@@ -14,10 +74,10 @@ class ExportPlugin(ABC):
 
 class DiagnosticPlugin(ABC):
     @abstractmethod
-    def run_diagnostic(self) -> list:
+    def run_diagnostic(self, wmi_broker=None) -> list:
         pass
 
 class SyncPlugin(ABC):
     @abstractmethod
     def sync(self, worker, data: list, config: dict):
-        pass
\ No newline at end of file
+        pass
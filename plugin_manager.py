@@ -1,20 +1,173 @@
 # plugin_manager.py (Corrected Version)
 
+import ast
 import os
 import importlib.util
 import inspect
+import threading
 
 # Ensure all plugin interfaces are imported
 from plugin_interface import ScanPlugin, ExportPlugin, DiagnosticPlugin, SyncPlugin
+from plugin_index import PluginIndex
+
+# Interface class name -> (interface, kind). The order is the precedence used by the eager inheritance checks.
+PLUGIN_INTERFACES = {
+    'SyncPlugin': (SyncPlugin, 'sync'),
+    'ScanPlugin': (ScanPlugin, 'scan'),
+    'ExportPlugin': (ExportPlugin, 'export'),
+    'DiagnosticPlugin': (DiagnosticPlugin, 'diagnostic'),
+}
+
+KIND_LABELS = {'sync': 'Sync', 'scan': 'Scan', 'export': 'Export', 'diagnostic': 'Diagnostic'}
+
+# Attributes the UI reads before a plugin is used; they are answered from the manifest without importing.
+METADATA_ATTRIBUTES = ('name', 'icon_name', 'file_extension', 'file_filter')
+
+
+def scan_plugin_source(source):
+    """
+    Statically inspects a plugin module without executing it.
+    Returns a manifest entry {class_name, kind, metadata, requires}, or None when no class in the
+    module inherits directly from a plugin interface.
+    """
+    tree = ast.parse(source)
+
+    # Only unconditional top-level imports are hard requirements; imports inside try/except are optional.
+    requires = set()
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            requires.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            requires.add(node.module.split('.')[0])
+
+    candidates = []
+    interface_order = list(PLUGIN_INTERFACES)
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        base_names = {base.id if isinstance(base, ast.Name) else getattr(base, 'attr', None) for base in node.bases}
+        for interface_name in interface_order:
+            if interface_name in base_names:
+                candidates.append((interface_order.index(interface_name), node.name, node))
+                break
+    if not candidates:
+        return None
+
+    # Same choice as the eager loader, which takes the first match in inspect.getmembers() (alphabetical) order.
+    interface_index, class_name, class_node = min(candidates, key=lambda c: c[1])
+    return {
+        'class_name': class_name,
+        'kind': PLUGIN_INTERFACES[interface_order[interface_index]][1],
+        'metadata': _extract_metadata(class_node),
+        'requires': sorted(requires),
+    }
+
+
+def _extract_metadata(class_node):
+    """Collects constant metadata from class attributes, @property getters and self.x = ... in __init__."""
+    metadata = {}
+    for node in class_node.body:
+        if isinstance(node, ast.Assign) and isinstance(node.value, ast.Constant):
+            for target in node.targets:
+                if isinstance(target, ast.Name) and target.id in METADATA_ATTRIBUTES:
+                    metadata[target.id] = node.value.value
+        elif isinstance(node, ast.FunctionDef) and node.name in METADATA_ATTRIBUTES:
+            is_property = any(isinstance(d, ast.Name) and d.id == 'property' for d in node.decorator_list)
+            returns = [n for n in ast.walk(node) if isinstance(n, ast.Return)]
+            if is_property and len(returns) == 1 and isinstance(returns[0].value, ast.Constant):
+                metadata[node.name] = returns[0].value.value
+        elif isinstance(node, ast.FunctionDef) and node.name == '__init__':
+            for stmt in ast.walk(node):
+                if not (isinstance(stmt, ast.Assign) and isinstance(stmt.value, ast.Constant)):
+                    continue
+                for target in stmt.targets:
+                    if (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                            and target.value.id == 'self' and target.attr in METADATA_ATTRIBUTES):
+                        metadata[target.attr] = stmt.value.value
+    return metadata
+
+
+def plugin_class_name(plugin):
+    """Class name of a plugin, whether it is a loaded instance or a LazyPlugin proxy."""
+    if isinstance(plugin, LazyPlugin):
+        return plugin.class_name
+    return type(plugin).__name__
+
+
+class LazyPlugin:
+    """
+    Stands in for a plugin instance until it is actually used.
+    Manifest metadata (name, icon_name, file_extension, file_filter) is answered directly; any other
+    attribute imports the module and instantiates the plugin class exactly once.
+    Assigning an attribute (e.g. an export plugin's layout) sets it on the real instance.
+    """
+
+    # Attributes owned by the proxy itself; every other assignment is plugin configuration.
+    _PROXY_ATTRIBUTES = frozenset(('module_name', 'module_path', 'class_name', 'kind', 'cache_key', '_metadata',
+                                   '_instance', '_lock'))
+
+    def __init__(self, module_name, module_path, class_name, kind, metadata):
+        self.module_name = module_name
+        self.module_path = module_path
+        self.class_name = class_name
+        self.kind = kind
+        # Snapshot cache entries are keyed by class name, which must not change with lazy loading.
+        self.cache_key = class_name
+        self._metadata = dict(metadata)
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._instance is not None
+
+    def load(self):
+        """Imports the plugin module (once, thread-safe) and returns the real plugin instance."""
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    spec = importlib.util.spec_from_file_location(self.module_name, self.module_path)
+                    module = importlib.util.module_from_spec(spec)
+                    spec.loader.exec_module(module)
+                    self._instance = getattr(module, self.class_name)()
+        return self._instance
+
+    def __getattr__(self, attribute):
+        # Only called for attributes not set in __init__; never load for dunder lookups (copy, pickle, ...).
+        if attribute.startswith('__'):
+            raise AttributeError(attribute)
+        metadata = self.__dict__.get('_metadata', {})
+        if attribute in metadata:
+            return metadata[attribute]
+        return getattr(self.load(), attribute)
+
+    def __setattr__(self, attribute, value):
+        if attribute in self._PROXY_ATTRIBUTES:
+            object.__setattr__(self, attribute, value)
+            return
+        setattr(self.load(), attribute, value)
+        self._metadata.pop(attribute, None)
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<LazyPlugin {self.class_name} from {os.path.basename(self.module_path)} ({state})>"
 
 
 class PluginManager:
     """
-    Finds, loads, and manages all types of plugins by inspecting their class inheritance.
+    Finds, loads, and manages all types of plugins.
+    By default plugin modules are only parsed at startup and wrapped in LazyPlugin proxies, so heavy
+    dependencies (pandas, reportlab, requests, psutil, ...) are imported on first use instead.
+    The parse results are kept in a PluginIndex keyed by path, mtime, size and content hash.
+    With lazy=False every module is imported and its class inheritance inspected, as before.
     """
 
-    def __init__(self, plugin_folder='plugins'):
+    def __init__(self, plugin_folder='plugins', log_callback=print, lazy=True, index=None, use_index=True):
         self.plugin_folder = plugin_folder
+        self.log = log_callback
+        self.lazy = lazy
+        # Persistent discovery index (lazy mode only): unchanged plugin files are neither read nor parsed.
+        self.index = (index or PluginIndex()) if lazy and use_index else None
         self.scan_plugins = []
         self.export_plugins = []
         self.diagnostic_plugins = []
@@ -28,44 +181,90 @@ class PluginManager:
         plugin_path = os.path.join(base_dir, self.plugin_folder)
 
         if not os.path.isdir(plugin_path):
-            print(f"Error: Plugin directory '{plugin_path}' not found.")
+            self.log(f"Error: Plugin directory '{plugin_path}' not found.")
             return
 
-        print(f"--- Loading plugins from '{plugin_path}' ---")
-        for filename in os.listdir(plugin_path):
+        self.log(f"--- Loading plugins from '{plugin_path}' ---")
+        seen_paths = []
+        # scandir() returns the stat data from the directory listing itself on Windows, saving a call per file
+        with os.scandir(plugin_path) as entries:
+            plugin_files = [entry for entry in entries if entry.is_file()]
+        for dir_entry in plugin_files:
+            filename = dir_entry.name
             if not filename.endswith('.py') or filename.startswith('__'):
                 continue
 
             module_name = filename[:-3]
-            module_path = os.path.join(plugin_path, filename)
+            module_path = dir_entry.path
+            seen_paths.append(module_path)
 
             try:
-                spec = importlib.util.spec_from_file_location(module_name, module_path)
-                module = importlib.util.module_from_spec(spec)
-                spec.loader.exec_module(module)
-
-                for name, obj in inspect.getmembers(module):
-                    if inspect.isclass(obj) and obj.__module__ == module_name:
-                        # Check inheritance against all known interfaces
-                        if issubclass(obj, SyncPlugin) and obj is not SyncPlugin:
-                            self.sync_plugins.append(obj())
-                            print(f"  [Success] Loaded Sync Plugin: {obj.__name__} from {filename}")
-                            break
-                        elif issubclass(obj, ScanPlugin) and obj is not ScanPlugin:
-                            self.scan_plugins.append(obj())
-                            print(f"  [Success] Loaded Scan Plugin: {obj.__name__} from {filename}")
-                            break
-                        elif issubclass(obj, ExportPlugin) and obj is not ExportPlugin:
-                            self.export_plugins.append(obj())
-                            print(f"  [Success] Loaded Export Plugin: {obj.__name__} from {filename}")
-                            break
-                        elif issubclass(obj, DiagnosticPlugin) and obj is not DiagnosticPlugin:
-                            self.diagnostic_plugins.append(obj())
-                            print(f"  [Success] Loaded Diagnostic Plugin: {obj.__name__} from {filename}")
-                            break
+                if self.lazy:
+                    self._register_lazy(module_name, module_path, filename, dir_entry.stat())
+                else:
+                    self._load_module(module_name, module_path, filename)
             except Exception as e:
-                print(f"  [Failed] Could not load {filename}: {e}")
-        print("--- Plugin loading complete ---")
+                self.log(f"  [Failed] Could not load {filename}: {e}")
+
+        if self.index is not None:
+            self.index.prune(seen_paths, folder=plugin_path)
+            try:
+                self.index.save()
+            except OSError as e:
+                self.log(f"  [Warning] Could not save plugin index: {e}")
+            stats = self.index.stats()
+            self.log(f"Plugin index: {stats['hits']} unchanged, {stats['misses']} scanned.")
+        self.log("--- Plugin loading complete ---")
+
+    def _manifest_entry(self, module_path, stat_result):
+        """Returns the static manifest entry of a plugin file, from the index when the file is unchanged."""
+        def read_source():
+            with open(module_path, 'rb') as f:
+                return f.read()
+
+        if self.index is None:
+            return scan_plugin_source(read_source())
+        hit, entry, content = self.index.lookup(module_path, stat_result, read_source)
+        if not hit:
+            entry = scan_plugin_source(content)
+            self.index.store(module_path, stat_result, content, entry)
+        return entry
+
+    def _register_lazy(self, module_name, module_path, filename, stat_result):
+        entry = self._manifest_entry(module_path, stat_result)
+        if entry is None:
+            # Indirect subclasses cannot be resolved statically; fall back to importing the module.
+            self._load_module(module_name, module_path, filename)
+            return
+
+        # Keep the old behaviour of hiding plugins whose dependencies are not installed,
+        # but check with find_spec() instead of importing them.
+        missing = [name for name in entry['requires'] if importlib.util.find_spec(name) is None]
+        if missing:
+            raise ImportError(f"No module named {', '.join(repr(name) for name in missing)}")
+
+        kind = entry['kind']
+        self._plugins_of_kind(kind).append(
+            LazyPlugin(module_name, module_path, entry['class_name'], kind, entry['metadata']))
+        self.log(f"  [Success] Registered {KIND_LABELS[kind]} Plugin: {entry['class_name']} from {filename} (lazy)")
+
+    def _load_module(self, module_name, module_path, filename):
+        spec = importlib.util.spec_from_file_location(module_name, module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        for name, obj in inspect.getmembers(module):
+            if inspect.isclass(obj) and obj.__module__ == module_name:
+                # Check inheritance against all known interfaces
+                for interface, kind in PLUGIN_INTERFACES.values():
+                    if issubclass(obj, interface) and obj is not interface:
+                        self._plugins_of_kind(kind).append(obj())
+                        self.log(f"  [Success] Loaded {KIND_LABELS[kind]} Plugin: {obj.__name__} from {filename}")
+                        return
+
+    def _plugins_of_kind(self, kind):
+        return {'sync': self.sync_plugins, 'scan': self.scan_plugins,
+                'export': self.export_plugins, 'diagnostic': self.diagnostic_plugins}[kind]
 
     def get_scan_plugins(self):
         """Returns a list of all loaded scan plugin instances."""
@@ -82,4 +281,4 @@ class PluginManager:
     # ▼▼▼ THIS IS THE MISSING METHOD ▼▼▼
     def get_sync_plugins(self):
         """Returns a list of all loaded sync plugin instances."""
-        return self.sync_plugins
\ No newline at end of file
+        return self.sync_plugins
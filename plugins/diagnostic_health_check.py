@@ -3,8 +3,8 @@
 import ctypes
 import datetime
 import socket
-import wmi
-from plugin_interface import DiagnosticPlugin
+from plugin_interface import DiagnosticPlugin, DISK_DRIVE_QUERY, OPERATING_SYSTEM_QUERY
+from wmi_broker import WMIQueryBroker
 
 # 尝试导入可选的库，如果失败则优雅地处理
 try:
@@ -33,22 +33,39 @@ class HealthCheckDiagnosticPlugin(DiagnosticPlugin):
     def name(self):
         return "系统综合诊断"
 
-    def run_diagnostic(self) -> list:
+    def run_diagnostic(self, wmi_broker=None) -> list:
         """
         执行所有诊断任务并返回结果列表。
+        传入 wmi_broker 时与扫描任务共享 WMI 连接与查询缓存：操作系统信息（含开机时间，进程内不会变化）、
+        硬盘型号与容量直接复用扫描时的结果；服务状态、事件日志、硬盘 S.M.A.R.T. 状态等易变数据
+        每次诊断用 cache=False 只读取需要的属性。
         """
         results = []
+        owns_broker = wmi_broker is None
+        if owns_broker:
+            wmi_broker = WMIQueryBroker()
 
+        try:
+            self._run_all_checks(wmi_broker, results)
+        finally:
+            # 自行创建的代理由插件负责释放本线程的连接；共享代理由调用方释放
+            if owns_broker:
+                wmi_broker.release()
+        return results
+
+    def _run_all_checks(self, wmi_broker, results: list):
         # 建立WMI连接，供后续检查使用
         try:
-            self.wmi_conn = wmi.WMI()
+            wmi_broker.connector()
+            self.wmi_conn = wmi_broker
             # 尝试连接到用于获取温度的特殊WMI命名空间
-            self.wmi_temp_conn = wmi.WMI(namespace="root\\wmi")
+            wmi_broker.connector("root\\wmi")
+            self.wmi_temp_conn = wmi_broker.namespace("root\\wmi")
         except Exception as e:
             results.append(
                 {'task': 'WMI服务连接', 'status': '失败', 'message': f'无法连接到WMI服务，部分诊断无法执行: {e}'})
             # 如果核心的WMI连接失败，则没有必要继续
-            return results
+            return
 
         # --- 按类别执行所有诊断任务 ---
         self._check_system_basics(results)
@@ -57,8 +74,6 @@ class HealthCheckDiagnosticPlugin(DiagnosticPlugin):
         self._check_hardware_status(results)
         self._check_network(results)
 
-        return results
-
     # --- 1. 系统基础诊断 ---
     def _check_system_basics(self, results: list):
         # 检查管理员权限
@@ -74,7 +89,7 @@ class HealthCheckDiagnosticPlugin(DiagnosticPlugin):
 
         # 检查系统运行时长
         try:
-            os_info = self.wmi_conn.Win32_OperatingSystem()[0]
+            os_info = self.wmi_conn.fetch(OPERATING_SYSTEM_QUERY)[0]
             last_boot_str = os_info.LastBootUpTime.split('.')[0]
             last_boot_time = datetime.datetime.strptime(last_boot_str, "%Y%m%d%H%M%S")
             uptime = datetime.datetime.now() - last_boot_time
@@ -115,7 +130,8 @@ class HealthCheckDiagnosticPlugin(DiagnosticPlugin):
         critical_services = {'Spooler': '打印服务', 'wuauserv': '更新服务', 'BFE': '防火墙服务'}
         for service_name, display_name in critical_services.items():
             try:
-                service = self.wmi_conn.Win32_Service(Name=service_name)[0]
+                service = self.wmi_conn.query('Win32_Service', cache=False, properties=('State',),
+                                              Name=service_name)[0]
                 status = '正常' if service.State == 'Running' else '警告'
                 message = f'状态: {service.State}'
                 results.append({'task': f'服务 ({display_name})', 'status': status, 'message': message})
@@ -126,7 +142,9 @@ class HealthCheckDiagnosticPlugin(DiagnosticPlugin):
         try:
             yesterday = datetime.datetime.now() - datetime.timedelta(days=1)
             query_date = yesterday.strftime("%Y%m%d%H%M%S")
-            errors = self.wmi_conn.Win32_NTLogEvent(Logfile='System', EventType=1, TimeGenerated=f">{query_date}")
+            errors = self.wmi_conn.query(
+                'Win32_NTLogEvent', cache=False, properties=('RecordNumber',),
+                where=f"Logfile = 'System' AND EventType = 1 AND TimeGenerated > '{query_date}'")
             status = '警告' if len(errors) > 10 else '正常'
             results.append(
                 {'task': '系统错误日志(24h)', 'status': status, 'message': f'发现 {len(errors)} 个严重错误。'})
@@ -135,18 +153,21 @@ class HealthCheckDiagnosticPlugin(DiagnosticPlugin):
 
     # --- 4. 硬件状态诊断 ---
     def _check_hardware_status(self, results: list):
-        # 硬盘健康
+        # 硬盘健康：硬盘列表与名称来自共享查询，S.M.A.R.T. 状态每次诊断重新读取
         try:
-            for drive in self.wmi_conn.Win32_DiskDrive():
-                status = '正常' if drive.Status == "OK" else '警告'
+            drives = self.wmi_conn.fetch(DISK_DRIVE_QUERY)
+            statuses = self._disk_statuses(drives)
+            for drive, drive_status in zip(drives, statuses):
+                status = '正常' if drive_status == "OK" else '警告'
                 results.append({'task': f"硬盘健康 ({drive.Caption})", 'status': status,
-                                'message': f'S.M.A.R.T. 状态: {drive.Status}'})
+                                'message': f'S.M.A.R.T. 状态: {drive_status}'})
         except Exception as e:
             results.append({'task': '硬盘健康 (S.M.A.R.T.)', 'status': '错误', 'message': str(e)})
 
         # 电池健康
         try:
-            batteries = self.wmi_conn.Win32_Battery()
+            batteries = self.wmi_conn.query('Win32_Battery', cache=False,
+                                             properties=('FullChargeCapacity', 'DesignCapacity'))
             if batteries:
                 health = (batteries[0].FullChargeCapacity / batteries[0].DesignCapacity) * 100
                 status = '警告' if health < 80 else '正常'
@@ -157,13 +178,23 @@ class HealthCheckDiagnosticPlugin(DiagnosticPlugin):
         # CPU温度
         try:
             if self.wmi_temp_conn:
-                temp_info = self.wmi_temp_conn.MSAcpi_ThermalZoneTemperature()[0]
+                temp_info = self.wmi_temp_conn.query('MSAcpi_ThermalZoneTemperature', cache=False,
+                                                 properties=('CurrentTemperature',))[0]
                 temp_c = (temp_info.CurrentTemperature / 10.0) - 273.15
                 status = '警告' if temp_c > 90 else '正常'
                 results.append({'task': 'CPU 温度', 'status': status, 'message': f'{temp_c:.1f} °C'})
         except Exception:
             results.append({'task': 'CPU 温度', 'status': '信息', 'message': '无法从此设备获取温度读数。'})
 
+    def _disk_statuses(self, drives):
+        """按 drives 的顺序返回各硬盘当前的 Status；序列号唯一时按序列号对应，否则按枚举顺序对应。"""
+        current = self.wmi_conn.query('Win32_DiskDrive', cache=False, properties=('SerialNumber', 'Status'))
+        serials = [(drive.SerialNumber or '').strip() for drive in drives]
+        by_serial = {(row.SerialNumber or '').strip(): row.Status for row in current}
+        if all(serials) and len(set(serials)) == len(serials) == len(by_serial):
+            return [by_serial.get(serial, '未知') for serial in serials]
+        return [row.Status for row in current] + ['未知'] * (len(drives) - len(current))
+
     # --- 5. 网络连接诊断 ---
     def _check_network(self, results: list):
         if not ping3:
@@ -187,7 +218,8 @@ class HealthCheckDiagnosticPlugin(DiagnosticPlugin):
 
     def _get_default_gateway(self) -> str | None:
         try:
-            routes = self.wmi_conn.Win32_IP4RouteTable(Destination='0.0.0.0', Mask='0.0.0.0')
+            routes = self.wmi_conn.query('Win32_IP4RouteTable', cache=False, properties=('NextHop',),
+                                         Destination='0.0.0.0', Mask='0.0.0.0')
             return routes[0].NextHop if routes else None
         except Exception:
             return None
@@ -1,13 +1,32 @@
-# plugins/export_excel.py (v1.1 - 修正 applymap 警告)
+# plugins/export_excel.py (v1.2 - 流式只写导出)
+
+"""
+Excel 导出：使用 openpyxl 的只写（write-only）工作簿逐行写出，不在内存中保留整张工作表。
+清理非法字符、设置对齐与字体、生成超链接都在同一次逐行遍历中完成；
+只写模式要求列宽在写第一行之前确定，因此列宽由一次只计算字符串长度的列扫描得出
+（类别、品牌等字典编码列只需扫描去重后的取值）。
+"""
 
-from plugin_interface import ExportPlugin
-import pandas as pd
-from openpyxl.styles import Font, Alignment
-from openpyxl.utils import get_column_letter
 import re
 
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Font
+from openpyxl.utils import get_column_letter
+
+from asset_table import ASSET_FIELDS, DICTIONARY_FIELDS, AssetTable
+from plugin_interface import ExportPlugin
+
 # 定义一个正则表达式来匹配非法字符
 ILLEGAL_CHARACTERS_RE = re.compile(r'[\x00-\x08\x0B\x0C\x0E-\x1F]')
+SHEET_TITLE = '电脑配置信息'
+# 列宽上限
+MAX_COLUMN_WIDTH = 60
+
+HEADER_TEXT_FONT = Font(name='微软雅黑', size=14, bold=True, color="808080")
+HEADER_FONT = Font(bold=True)
+LINK_FONT = Font(color="0000FF", underline="single")
+CELL_ALIGNMENT = Alignment(horizontal='left', vertical='center')
 
 
 def sanitize_for_excel(value):
@@ -17,6 +36,93 @@ def sanitize_for_excel(value):
     return value
 
 
+def _text_length(value):
+    return 0 if value is None else len(sanitize_for_excel(str(value)))
+
+
+def column_widths(table, header_text=None):
+    """
+    按列计算列宽：取表头与各单元格文本长度的最大值，(长度 + 2) * 1.2，且不超过 MAX_COLUMN_WIDTH。
+    页眉文本位于 A1，与旧版一致计入第一列。
+    """
+    widths = []
+    for field in ASSET_FIELDS:
+        values = table.distinct(field) if field in DICTIONARY_FIELDS else table.column(field)
+        widths.append(max(len(field), max(map(_text_length, values), default=0)))
+    if header_text:
+        widths[0] = max(widths[0], len(header_text))
+    return [min((length + 2) * 1.2, MAX_COLUMN_WIDTH) for length in widths]
+
+
+class _RowCells:
+    """
+    每列复用两个带样式的只写单元格（普通、超链接）。openpyxl 在 append() 返回前就已把整行写出，
+    因此下一行可以直接改写同一个单元格对象的值，避免为每个单元格新建对象和样式。
+    """
+
+    def __init__(self, worksheet, columns):
+        self.plain = [self._cell(worksheet, None) for _ in range(columns)]
+        self.link = [self._cell(worksheet, LINK_FONT) for _ in range(columns)]
+
+    @staticmethod
+    def _cell(worksheet, font):
+        cell = WriteOnlyCell(worksheet)
+        cell.alignment = CELL_ALIGNMENT
+        if font is not None:
+            cell.font = font
+        return cell
+
+    def row(self, values):
+        cells = []
+        for index, value in enumerate(values):
+            if isinstance(value, str):
+                value = ILLEGAL_CHARACTERS_RE.sub('', value)
+                if 'http' in value:
+                    cell = self.link[index]
+                    cell.value = value
+                    cell.hyperlink = value
+                    cells.append(cell)
+                    continue
+            cell = self.plain[index]
+            cell.value = value
+            cells.append(cell)
+        return cells
+
+
+def write_workbook(table, file_path, header_text=None):
+    """把资产表流式写入 file_path，返回写出的数据行数。"""
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet(SHEET_TITLE)
+    columns = len(ASSET_FIELDS)
+
+    for index, width in enumerate(column_widths(table, header_text), 1):
+        worksheet.column_dimensions[get_column_letter(index)].width = width
+
+    if header_text:
+        header_cell = WriteOnlyCell(worksheet, value=sanitize_for_excel(header_text))
+        header_cell.font = HEADER_TEXT_FONT
+        header_cell.alignment = Alignment(horizontal='center', vertical='center')
+        worksheet.append([header_cell])
+        worksheet.merged_cells.add(f'A1:{get_column_letter(columns)}1')
+
+    header_cells = []
+    for field in ASSET_FIELDS:
+        cell = WriteOnlyCell(worksheet, value=field)
+        cell.font = HEADER_FONT
+        cell.alignment = CELL_ALIGNMENT
+        header_cells.append(cell)
+    worksheet.append(header_cells)
+
+    cells = _RowCells(worksheet, columns)
+    count = 0
+    for values in table.iter_tuples():
+        worksheet.append(cells.row(values))
+        count += 1
+
+    workbook.save(file_path)
+    return count
+
+
 class ExcelExportPlugin(ExportPlugin):
     @property
     def name(self):
@@ -36,49 +142,9 @@ class ExcelExportPlugin(ExportPlugin):
 
     def export(self, data, file_path, header_text, log_callback):
         log_callback("  -> 开始生成 Excel 数据...")
-        df = pd.DataFrame(data, columns=['类别', '品牌', '型号', '大小', '序列号', '生产日期', '保修查询链接'])
-
-        # 使用新的 .map() 方法替代已弃用的 .applymap()
-        df = df.map(sanitize_for_excel)
-
-        start_row = 1 if header_text else 0
-
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='电脑配置信息', startrow=start_row)
-            worksheet = writer.sheets['电脑配置信息']
-
-            if header_text:
-                log_callback("  -> 正在为 Excel 添加页眉文本...")
-                worksheet.merge_cells(f'A1:{get_column_letter(df.shape[1])}1')
-                header_cell = worksheet['A1']
-                header_cell.value = header_text
-                header_cell.font = Font(name='微软雅黑', size=14, bold=True, color="808080")
-                header_cell.alignment = Alignment(horizontal='center', vertical='center')
-                log_callback("  -> Excel 页眉文本添加成功。")
-
-            header_font = Font(bold=True)
-            for cell in worksheet[start_row + 1]:
-                cell.font = header_font
-
-            alignment = Alignment(horizontal='left', vertical='center')
-            for row_cells in worksheet.iter_rows(min_row=start_row + 1):
-                for cell in row_cells:
-                    cell.alignment = alignment
-                    if isinstance(cell.value, str) and 'http' in cell.value:
-                        cell.font = Font(color="0000FF", underline="single")
-                        cell.hyperlink = cell.value
-
-            for col_idx, column in enumerate(worksheet.columns, 1):
-                max_length = 0
-                column_letter = get_column_letter(col_idx)
-                for cell in column:
-                    try:
-                        if len(str(cell.value)) > max_length:
-                            max_length = len(str(cell.value))
-                    except:
-                        pass
-                adjusted_width = (max_length + 2) * 1.2
-                worksheet.column_dimensions[column_letter].width = min(adjusted_width, 60)  # 设置一个最大宽度上限
-
-        log_callback("  -> Excel 格式化完成。")
-        return file_path
\ No newline at end of file
+        table = AssetTable.coerce(data)
+        if header_text:
+            log_callback("  -> 正在为 Excel 添加页眉文本...")
+        count = write_workbook(table, file_path, header_text)
+        log_callback(f"  -> 已写出 {count} 行，Excel 格式化完成。")
+        return file_path
@@ -0,0 +1,91 @@
+# plugins/export_jsonl.py
+
+"""
+JSON Lines 导出：第一行是带版本号的模式说明，之后每条资产记录一行，字段使用稳定的英文别名
+（与 AssetRecord 的属性名一致），采集端不必解析中文表头。
+记录由生成器逐条编码并写出，不会在内存中构造完整列表；文件名以 .gz 结尾时使用 gzip 压缩。
+写出过程中每隔 FLUSH_EVERY 条刷新一次（gzip 为同步刷新），采集端可以边写边读、增量导入。
+"""
+
+import datetime
+import gzip
+import json
+import socket
+
+from asset_table import ASSET_FIELDS, DEFAULT_VALUE, FIELD_ATTRIBUTES, AssetTable
+from plugin_interface import ExportPlugin
+
+SCHEMA_NAME = 'it-asset-tool.asset'
+SCHEMA_VERSION = 1
+FLUSH_EVERY = 1000
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str).encode
+
+
+def schema_header(header_text=None, host=None):
+    """模式说明行：字段别名 -> 中文字段名，以及导出来源信息。"""
+    return {
+        'type': 'schema',
+        'schema': SCHEMA_NAME,
+        'version': SCHEMA_VERSION,
+        'host': host or socket.gethostname(),
+        'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        'header': header_text or '',
+        'fields': {FIELD_ATTRIBUTES[field]: field for field in ASSET_FIELDS},
+    }
+
+
+def _iter_values(data):
+    if isinstance(data, AssetTable):
+        yield from data.iter_tuples()
+    else:
+        for row in data:
+            yield tuple(row.get(field, DEFAULT_VALUE) for field in ASSET_FIELDS)
+
+
+def iter_lines(data, header_text=None, host=None):
+    """逐行产出 JSON Lines 文本（含换行符），第一行为模式说明。"""
+    aliases = ('type',) + tuple(FIELD_ATTRIBUTES[field] for field in ASSET_FIELDS)
+    yield _encode(schema_header(header_text, host)) + '\n'
+    for values in _iter_values(data):
+        yield _encode(dict(zip(aliases, ('asset',) + values))) + '\n'
+
+
+def open_output(file_path):
+    if file_path.lower().endswith('.gz'):
+        return gzip.open(file_path, 'wt', encoding='utf-8', newline='\n')
+    return open(file_path, 'w', encoding='utf-8', newline='\n')
+
+
+class JSONLinesExportPlugin(ExportPlugin):
+    @property
+    def name(self):
+        return "导出为 JSON Lines"
+
+    @property
+    def file_extension(self):
+        return ".jsonl"
+
+    @property
+    def file_filter(self):
+        return "JSON Lines (*.jsonl);;JSON Lines gzip 压缩 (*.jsonl.gz)"
+
+    @property
+    def icon_name(self):
+        return "json"
+
+    def export(self, data, file_path, header_text, log_callback):
+        log_callback("  -> 开始写出 JSON Lines 数据...")
+        try:
+            count = 0
+            with open_output(file_path) as f:
+                for line in iter_lines(data, header_text):
+                    f.write(line)
+                    count += 1
+                    if count % FLUSH_EVERY == 0:
+                        f.flush()
+            log_callback(f"  -> JSON Lines 文件写入完成，共 {count - 1} 条记录。")
+            return file_path
+        except Exception as e:
+            log_callback(f"  -> 导出 JSON Lines 失败: {e}")
+            return None
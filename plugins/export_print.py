@@ -1,29 +1,10 @@
 # plugins/export_print.py
 
 import os
-import tempfile
-import uuid
 from plugin_interface import ExportPlugin
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
 
-
-# --- 字体查找辅助函数 ---
-def find_system_font(font_names: list) -> str | None:
-    """
-    在 Windows 字体目录中按顺序查找可用的字体文件。
-    """
-    font_dir = os.path.join(os.environ.get("SystemRoot", "C:\\Windows"), "Fonts")
-    if not os.path.isdir(font_dir):
-        return None
-
-    for font_name in font_names:
-        font_path = os.path.join(font_dir, font_name)
-        if os.path.exists(font_path):
-            return font_path
-    return None
+from pdf_fonts import PREFERRED_FONTS, default_font_registry
+from pdf_report import DEFAULT_LAYOUT, default_render_cache, print_file_path
 
 
 # --- 打印导出插件类 ---
@@ -33,8 +14,8 @@ class PrintExportPlugin(ExportPlugin):
         self.file_extension = ""
         self.file_filter = ""
         self.icon_name = "print"
-        self.preferred_fonts = ['msyh.ttf', 'simhei.ttf', 'deng.ttf', 'simsun.ttc']
-        self.pdf_font_name = 'Chinese-Font-For-Print'
+        self.preferred_fonts = PREFERRED_FONTS
+        self.layout = DEFAULT_LAYOUT  # 'list' 按类别逐项列出，'table' 紧凑表格
 
     def export(self, data, output_path, header_text, log_callback, printer_name):
         # 注意：此方法会接收所有参数，但 output_path 不会被使用
@@ -42,64 +23,22 @@ class PrintExportPlugin(ExportPlugin):
             log_callback(f"  -> 正在为打印机 '{printer_name}' 准备报告...")
 
             # 1. 自动查找字体
-            font_path = find_system_font(self.preferred_fonts)
-            if not font_path:
+            font = default_font_registry().register(self.preferred_fonts)
+            if font is None:
                 error_msg = "打印失败：在系统中找不到任何可用的中文字体。"
                 log_callback(f"  -> 错误：{error_msg}")
                 return error_msg
 
-            log_callback(f"  -> 成功找到字体: {os.path.basename(font_path)}")
-            pdfmetrics.registerFont(TTFont(self.pdf_font_name, font_path))
-
-            # 2. 创建临时PDF文件
-            temp_dir = tempfile.gettempdir()
-            temp_filename = f"asset_report_print_{uuid.uuid4().hex[:8]}.pdf"
-            temp_pdf_path = os.path.join(temp_dir, temp_filename)
-            log_callback(f"  -> 正在生成临时PDF文件用于打印: {temp_filename}")
-
-            # 3. 生成PDF内容 (此逻辑与 export_pdf.py 完全相同)
-            c = canvas.Canvas(temp_pdf_path, pagesize=letter)
-            width, height = letter
-            y_position = height - 40
-
-            if header_text:
-                c.setFont(self.pdf_font_name, 16)
-                c.drawCentredString(width / 2.0, y_position, header_text)
-                y_position -= 40
-
-            last_category = None
-            for item in data:
-                if y_position < 60:
-                    c.showPage()
-                    y_position = height - 40
-                    last_category = None
-
-                current_category = item.get('类别', '未知类别')
-
-                if current_category != last_category:
-                    y_position -= 20
-                    c.setFont(self.pdf_font_name, 14)
-                    c.drawString(50, y_position, f"--- {current_category} ---")
-                    y_position -= 25
-                    last_category = current_category
-
-                for key, value in item.items():
-                    if key == '类别':
-                        continue
-
-                    if y_position < 40:
-                        c.showPage()
-                        y_position = height - 40
-                        c.setFont(self.pdf_font_name, 14)
-                        c.drawString(50, y_position, f"--- {current_category} ---")
-                        y_position -= 25
+            log_callback(f"  -> 使用字体: {os.path.basename(font.path)}")
 
-                    c.setFont(self.pdf_font_name, 10)
-                    line = f"{key}: {value}"
-                    c.drawString(70, y_position, line)
-                    y_position -= 20
+            # 2. 渲染报告（与 PDF 导出共用排版和缓存）
+            pdf, cached = default_render_cache().render(data, header_text, font.name, self.layout)
+            if cached:
+                log_callback("  -> 报告内容未变化，直接使用已渲染的 PDF。")
 
-            c.save()
+            # 3. 写出打印用临时文件：文件名取自内容哈希，重复打印同一份报告时复用，旧文件在之后的打印中清理
+            temp_pdf_path = print_file_path(pdf)
+            log_callback(f"  -> 打印用PDF文件: {os.path.basename(temp_pdf_path)}")
 
             # 4. 自动打开生成的临时PDF
             try:
@@ -118,4 +57,4 @@ class PrintExportPlugin(ExportPlugin):
             log_callback(f"❌ {error_msg}")
             return error_msg
 
-# 智能插件管理器可以自动发现这个类，所以不需要 'plugin_class = ...'
\ No newline at end of file
+# 智能插件管理器可以自动发现这个类，所以不需要 'plugin_class = ...'
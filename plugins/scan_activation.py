@@ -1,9 +1,19 @@
 # plugins/scan_activation.py
 
-from plugin_interface import ScanPlugin
+from plugin_interface import AssetRecord, ScanPlugin, WMIQuery
 
 
 class ActivationScanPlugin(ScanPlugin):
+    # 只查询已安装产品密钥的 Windows 授权条目，避免枚举上百条 Office 等其它授权信息
+    queries = {
+        'licenses': WMIQuery('SoftwareLicensingProduct', ('Description', 'LicenseStatus', 'PartialProductKey'),
+                             where="PartialProductKey IS NOT NULL AND Description LIKE '%Windows%'"),
+    }
+    # 激活状态可能随时被用户或 KMS 更改，缓存时间较短
+    cache_ttl = 3600
+    # 授权服务在负载高的机器上本身就慢，给予更宽松的期限
+    timeout = 45
+
     @property
     def name(self):
         return "系统激活状态"
@@ -12,24 +22,22 @@ class ActivationScanPlugin(ScanPlugin):
         data = []
         status = "未激活或无法确定"
         try:
-            for product in wmi_connector.SoftwareLicensingProduct():
-                # 寻找包含 "Windows" 描述且有部分产品密钥的授权信息
-                if product.Description and "windows" in product.Description.lower() and product.PartialProductKey:
-                    # LicenseStatus=1 表示已授权
-                    if product.LicenseStatus == 1:
-                        status = "已激活"
-                        break
+            for product in wmi_connector.fetch(self.queries['licenses']):
+                # LicenseStatus=1 表示已授权
+                if product.LicenseStatus == 1:
+                    status = "已激活"
+                    break
         except Exception as e:
             print(f"扫描激活状态失败: {e}")
             status = f"查询失败: {e}"
 
-        data.append({
-            '类别': '系统激活状态',
-            '品牌': 'N/A',
-            '型号': status,
-            '大小': 'N/A',
-            '序列号': 'N/A',
-            '生产日期': 'N/A',
-            '保修查询链接': 'N/A'
-        })
+        data.append(AssetRecord(
+            category='系统激活状态',
+            brand='N/A',
+            model=status,
+            size='N/A',
+            serial='N/A',
+            production_date='N/A',
+            warranty_url='N/A'
+        ))
         return data
\ No newline at end of file
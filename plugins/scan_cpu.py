@@ -1,7 +1,9 @@
 # plugins/scan_cpu.py
-from plugin_interface import ScanPlugin
+from plugin_interface import AssetRecord, ScanPlugin, WMIQuery
 
 class CPUScanPlugin(ScanPlugin):
+    queries = {'processors': WMIQuery('Win32_Processor', ('Manufacturer', 'Name', 'ProcessorId'))}
+
     @property
     def name(self):
         return "CPU 信息"
@@ -9,18 +11,18 @@ class CPUScanPlugin(ScanPlugin):
     def scan(self, wmi_connector):
         data = []
         try:
-            for cpu in wmi_connector.Win32_Processor():
-                data.append({
-                    '类别': 'CPU',
-                    '品牌': cpu.Manufacturer,
-                    '型号': cpu.Name.strip(),
-                    '大小': 'N/A',
-                    '序列号': cpu.ProcessorId or "无法获取",
-                    '生产日期': 'N/A',
-                    '保修查询链接': 'N/A'
-                })
+            for cpu in wmi_connector.fetch(self.queries['processors']):
+                data.append(AssetRecord(
+                    category='CPU',
+                    brand=cpu.Manufacturer,
+                    model=cpu.Name.strip(),
+                    size='N/A',
+                    serial=cpu.ProcessorId or "无法获取",
+                    production_date='N/A',
+                    warranty_url='N/A'
+                ))
         except Exception as e:
             print(f"扫描CPU失败: {e}")
             # 即使失败也返回一个条目，让用户知道尝试过
-            data.append({'类别': 'CPU', '品牌': '扫描失败', '型号': str(e), '大小': 'N/A', '序列号': 'N/A', '生产日期': 'N/A', '保修查询链接': 'N/A'})
+            data.append(AssetRecord(category='CPU', brand='扫描失败', model=str(e), size='N/A', serial='N/A', production_date='N/A', warranty_url='N/A'))
         return data
\ No newline at end of file
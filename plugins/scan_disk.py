@@ -1,6 +1,6 @@
 # plugins/scan_disk.py
 
-from plugin_interface import ScanPlugin
+from plugin_interface import AssetRecord, ScanPlugin, DISK_DRIVE_QUERY
 
 def format_bytes(byte_size):
     """辅助函数，将字节转换为GB/MB等"""
@@ -17,6 +17,9 @@ def format_bytes(byte_size):
     return f"{byte_size:.2f} {power_labels[n]}"
 
 class DiskScanPlugin(ScanPlugin):
+    # 与系统诊断共用同一查询声明，会话内只向 WMI 请求一次
+    queries = {'disks': DISK_DRIVE_QUERY}
+
     @property
     def name(self):
         return "硬盘"
@@ -24,16 +27,16 @@ class DiskScanPlugin(ScanPlugin):
     def scan(self, wmi_connector):
         data = []
         try:
-            for disk in wmi_connector.Win32_DiskDrive():
-                data.append({
-                    '类别': '硬盘',
-                    '品牌': disk.Model.split()[0] if disk.Model else "N/A",
-                    '型号': disk.Model or "N/A",
-                    '大小': format_bytes(disk.Size),
-                    '序列号': disk.SerialNumber.strip() if disk.SerialNumber else "无法获取",
-                    '生产日期': 'N/A',
-                    '保修查询链接': 'N/A'
-                })
+            for disk in wmi_connector.fetch(self.queries['disks']):
+                data.append(AssetRecord(
+                    category='硬盘',
+                    brand=disk.Model.split()[0] if disk.Model else "N/A",
+                    model=disk.Model or "N/A",
+                    size=format_bytes(disk.Size),
+                    serial=disk.SerialNumber.strip() if disk.SerialNumber else "无法获取",
+                    production_date='N/A',
+                    warranty_url='N/A'
+                ))
         except Exception as e:
             print(f"扫描硬盘失败: {e}")
         return data
\ No newline at end of file
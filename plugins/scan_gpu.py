@@ -1,8 +1,10 @@
 # plugins/scan_gpu.py
 
-from plugin_interface import ScanPlugin
+from plugin_interface import AssetRecord, ScanPlugin, WMIQuery
 
 class GpuScanPlugin(ScanPlugin):
+    queries = {'controllers': WMIQuery('Win32_VideoController', ('Name',))}
+
     @property
     def name(self):
         return "显卡"
@@ -10,16 +12,16 @@ class GpuScanPlugin(ScanPlugin):
     def scan(self, wmi_connector):
         data = []
         try:
-            for gpu in wmi_connector.Win32_VideoController():
-                data.append({
-                    '类别': '显卡',
-                    '品牌': gpu.Name.split()[0] if gpu.Name else "N/A",
-                    '型号': gpu.Name or "N/A",
-                    '大小': 'N/A',
-                    '序列号': "N/A",
-                    '生产日期': 'N/A',
-                    '保修查询链接': 'N/A'
-                })
+            for gpu in wmi_connector.fetch(self.queries['controllers']):
+                data.append(AssetRecord(
+                    category='显卡',
+                    brand=gpu.Name.split()[0] if gpu.Name else "N/A",
+                    model=gpu.Name or "N/A",
+                    size='N/A',
+                    serial="N/A",
+                    production_date='N/A',
+                    warranty_url='N/A'
+                ))
         except Exception as e:
             print(f"扫描显卡失败: {e}")
         return data
\ No newline at end of file
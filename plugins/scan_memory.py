@@ -1,6 +1,6 @@
 # plugins/scan_memory.py
 
-from plugin_interface import ScanPlugin
+from plugin_interface import AssetRecord, ScanPlugin, WMIQuery
 
 def format_bytes(byte_size):
     """辅助函数，将字节转换为GB/MB等"""
@@ -17,6 +17,10 @@ def format_bytes(byte_size):
     return f"{byte_size:.2f} {power_labels[n]}"
 
 class MemoryScanPlugin(ScanPlugin):
+    queries = {
+        'modules': WMIQuery('Win32_PhysicalMemory', ('Manufacturer', 'PartNumber', 'Capacity', 'SerialNumber')),
+    }
+
     @property
     def name(self):
         return "内存条"
@@ -24,16 +28,16 @@ class MemoryScanPlugin(ScanPlugin):
     def scan(self, wmi_connector):
         data = []
         try:
-            for memory in wmi_connector.Win32_PhysicalMemory():
-                data.append({
-                    '类别': '内存',
-                    '品牌': memory.Manufacturer or "N/A",
-                    '型号': memory.PartNumber.strip() if memory.PartNumber else "N/A",
-                    '大小': format_bytes(memory.Capacity),
-                    '序列号': memory.SerialNumber or "N/A",
-                    '生产日期': 'N/A',
-                    '保修查询链接': 'N/A'
-                })
+            for memory in wmi_connector.fetch(self.queries['modules']):
+                data.append(AssetRecord(
+                    category='内存',
+                    brand=memory.Manufacturer or "N/A",
+                    model=memory.PartNumber.strip() if memory.PartNumber else "N/A",
+                    size=format_bytes(memory.Capacity),
+                    serial=memory.SerialNumber or "N/A",
+                    production_date='N/A',
+                    warranty_url='N/A'
+                ))
         except Exception as e:
             print(f"扫描内存失败: {e}")
         return data
\ No newline at end of file
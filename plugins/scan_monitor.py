@@ -1,10 +1,19 @@
 # plugins/scan_monitor.py
 
-from plugin_interface import ScanPlugin
-import wmi
+from plugin_interface import AssetRecord, ScanPlugin, WMIQuery
 
 
 class MonitorScanPlugin(ScanPlugin):
+    # 显示器信息在 'wmi' 命名空间下
+    queries = {
+        'monitors': WMIQuery('WmiMonitorID', ('ManufacturerName', 'UserFriendlyName', 'SerialNumberID',
+                                              'YearOfManufacture', 'WeekOfManufacture'), namespace='wmi'),
+    }
+    # 笔记本经常插拔扩展坞和外接显示器
+    cache_ttl = 600
+    # 部分扩展坞会让 WmiMonitorID 挂起，尽快放弃
+    timeout = 15
+
     @property
     def name(self):
         return "显示器信息"
@@ -12,14 +21,12 @@ class MonitorScanPlugin(ScanPlugin):
     def scan(self, wmi_connector):
         data = []
         try:
-            # 显示器信息在 'wmi' 命名空间下
-            c_wmi_monitor = wmi.WMI(namespace="wmi")
-            monitors = c_wmi_monitor.WmiMonitorID()
+            monitors = wmi_connector.fetch(self.queries['monitors'])
 
             if not monitors:
                 data.append(
-                    {'类别': '显示器', '品牌': '无法获取', '型号': '未检测到外部显示器', '大小': 'N/A', '序列号': 'N/A',
-                     '生产日期': 'N/A', '保修查询链接': 'N/A'})
+                    AssetRecord(category='显示器', brand='无法获取', model='未检测到外部显示器', size='N/A', serial='N/A',
+                     production_date='N/A', warranty_url='N/A'))
                 return data
 
             for mon in monitors:
@@ -30,18 +37,18 @@ class MonitorScanPlugin(ScanPlugin):
                 year, week = mon.YearOfManufacture, mon.WeekOfManufacture
                 prod_date = f"{year}-W{week}" if year and week else "N/A"
 
-                data.append({
-                    '类别': '显示器',
-                    '品牌': manufacturer,
-                    '型号': model,
-                    '大小': 'N/A',  # WMI不直接提供尺寸
-                    '序列号': serial,
-                    '生产日期': prod_date,
-                    '保修查询链接': 'N/A'
-                })
+                data.append(AssetRecord(
+                    category='显示器',
+                    brand=manufacturer,
+                    model=model,
+                    size='N/A',  # WMI不直接提供尺寸
+                    serial=serial,
+                    production_date=prod_date,
+                    warranty_url='N/A'
+                ))
         except Exception as e:
             print(f"扫描显示器失败: {e}")
-            data.append({'类别': '显示器', '品牌': '获取失败', '型号': str(e), '大小': 'N/A', '序列号': 'N/A',
-                         '生产日期': 'N/A', '保修查询链接': 'N/A'})
+            data.append(AssetRecord(category='显示器', brand='获取失败', model=str(e), size='N/A', serial='N/A',
+                         production_date='N/A', warranty_url='N/A'))
 
         return data
\ No newline at end of file
@@ -1,8 +1,10 @@
 # plugins/scan_motherboard.py
 
-from plugin_interface import ScanPlugin
+from plugin_interface import AssetRecord, ScanPlugin, BASEBOARD_QUERY
 
 class MotherboardScanPlugin(ScanPlugin):
+    queries = {'boards': BASEBOARD_QUERY}
+
     @property
     def name(self):
         return "主板/整机"
@@ -10,7 +12,7 @@ class MotherboardScanPlugin(ScanPlugin):
     def scan(self, wmi_connector):
         data = []
         try:
-            for board in wmi_connector.Win32_BaseBoard():
+            for board in wmi_connector.fetch(self.queries['boards']):
                 manufacturer = board.Manufacturer
                 serial_number = board.SerialNumber.strip() if board.SerialNumber else ""
                 warranty_link = 'N/A'
@@ -25,15 +27,15 @@ class MotherboardScanPlugin(ScanPlugin):
                     elif 'lenovo' in mfg_lower:
                         warranty_link = f"https://pcsupport.lenovo.com/sg-en/search?query={serial_number}"
 
-                data.append({
-                    '类别': '主板/整机',
-                    '品牌': manufacturer,
-                    '型号': board.Product,
-                    '大小': 'N/A',
-                    '序列号': serial_number,
-                    '生产日期': 'N/A',
-                    '保修查询链接': warranty_link
-                })
+                data.append(AssetRecord(
+                    category='主板/整机',
+                    brand=manufacturer,
+                    model=board.Product,
+                    size='N/A',
+                    serial=serial_number,
+                    production_date='N/A',
+                    warranty_url=warranty_link
+                ))
         except Exception as e:
             print(f"扫描主板失败: {e}")
         return data
\ No newline at end of file
@@ -1,6 +1,14 @@
-from plugin_interface import ScanPlugin
+from plugin_interface import AssetRecord, ScanPlugin, WMIQuery
 
 class NetworkScanPlugin(ScanPlugin):
+    # 筛选出启用了IP且有MAC地址的物理网卡，条件直接下推到 WQL
+    queries = {
+        'adapters': WMIQuery('Win32_NetworkAdapterConfiguration', ('Description', 'MACAddress', 'IPAddress'),
+                             where="IPEnabled = TRUE AND MACAddress IS NOT NULL"),
+    }
+    # IP 地址会随网络环境变化
+    cache_ttl = 600
+
     @property
     def name(self):
         return "网络适配器"
@@ -8,18 +16,17 @@ class NetworkScanPlugin(ScanPlugin):
     def scan(self, wmi_connector):
         data = []
         try:
-            # 筛选出启用了IP且有MAC地址的物理网卡
-            for nic in wmi_connector.Win32_NetworkAdapterConfiguration(IPEnabled=True):
+            for nic in wmi_connector.fetch(self.queries['adapters']):
                 if nic.MACAddress:
-                    data.append({
-                        '类别': '网卡',
-                        '品牌': nic.Description,
-                        '型号': f"MAC: {nic.MACAddress}",
-                        '大小': 'N/A',
-                        '序列号': (nic.IPAddress[0] if nic.IPAddress else "N/A"),
-                        '生产日期': 'N/A',
-                        '保修查询链接': 'N/A'
-                    })
+                    data.append(AssetRecord(
+                        category='网卡',
+                        brand=nic.Description,
+                        model=f"MAC: {nic.MACAddress}",
+                        size='N/A',
+                        serial=(nic.IPAddress[0] if nic.IPAddress else "N/A"),
+                        production_date='N/A',
+                        warranty_url='N/A'
+                    ))
         except Exception as e:
             print(f"扫描网卡失败: {e}")
         return data
\ No newline at end of file
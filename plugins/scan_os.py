@@ -1,8 +1,10 @@
 # plugins/scan_os.py
 
-from plugin_interface import ScanPlugin
+from plugin_interface import AssetRecord, ScanPlugin, OPERATING_SYSTEM_QUERY
 
 class OsScanPlugin(ScanPlugin):
+    queries = {'os': OPERATING_SYSTEM_QUERY}
+
     @property
     def name(self):
         return "操作系统"
@@ -10,16 +12,16 @@ class OsScanPlugin(ScanPlugin):
     def scan(self, wmi_connector):
         data = []
         try:
-            os_info = wmi_connector.Win32_OperatingSystem()[0]
-            data.append({
-                '类别': '操作系统',
-                '品牌': 'Microsoft',
-                '型号': os_info.Caption,
-                '大小': 'N/A',
-                '序列号': os_info.SerialNumber, # 系统序列号
-                '生产日期': 'N/A',
-                '保修查询链接': 'N/A'
-            })
+            os_info = wmi_connector.fetch(self.queries['os'])[0]
+            data.append(AssetRecord(
+                category='操作系统',
+                brand='Microsoft',
+                model=os_info.Caption,
+                size='N/A',
+                serial=os_info.SerialNumber, # 系统序列号
+                production_date='N/A',
+                warranty_url='N/A'
+            ))
         except Exception as e:
             print(f"扫描操作系统失败: {e}")
         return data
\ No newline at end of file
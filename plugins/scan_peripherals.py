@@ -1,6 +1,6 @@
 # plugins/scan_peripherals.py
 
-from plugin_interface import ScanPlugin
+from plugin_interface import AssetRecord, ScanPlugin, WMIQuery
 
 
 def filter_devices(devices, blacklist):
@@ -23,6 +23,12 @@ def filter_devices(devices, blacklist):
 
 
 class PeripheralsScanPlugin(ScanPlugin):
+    queries = {
+        'keyboards': WMIQuery('Win32_Keyboard', ('Name', 'Description')),
+        'pointing_devices': WMIQuery('Win32_PointingDevice', ('Name', 'Description', 'Manufacturer')),
+    }
+    cache_ttl = 600
+
     @property
     def name(self):
         return "键盘和鼠标"
@@ -37,20 +43,20 @@ class PeripheralsScanPlugin(ScanPlugin):
 
         try:
             # 扫描键盘
-            keyboards = wmi_connector.Win32_Keyboard()
+            keyboards = wmi_connector.fetch(self.queries['keyboards'])
             for kbd in filter_devices(keyboards, keyboard_blacklist):
-                data.append({
-                    '类别': '键盘', '品牌': kbd.Name.split()[0], '型号': kbd.Description,
-                    '大小': 'N/A', '序列号': 'N/A', '生产日期': 'N/A', '保修查询链接': 'N/A'
-                })
+                data.append(AssetRecord(
+                    category='键盘', brand=kbd.Name.split()[0], model=kbd.Description,
+                    size='N/A', serial='N/A', production_date='N/A', warranty_url='N/A'
+                ))
 
             # 扫描鼠标
-            pointing_devices = wmi_connector.Win32_PointingDevice()
+            pointing_devices = wmi_connector.fetch(self.queries['pointing_devices'])
             for ptr in filter_devices(pointing_devices, mouse_blacklist):
-                data.append({
-                    '类别': '鼠标', '品牌': ptr.Manufacturer, '型号': ptr.Description,
-                    '大小': 'N/A', '序列号': 'N/A', '生产日期': 'N/A', '保修查询链接': 'N/A'
-                })
+                data.append(AssetRecord(
+                    category='鼠标', brand=ptr.Manufacturer, model=ptr.Description,
+                    size='N/A', serial='N/A', production_date='N/A', warranty_url='N/A'
+                ))
         except Exception as e:
             print(f"扫描外设失败: {e}")
 
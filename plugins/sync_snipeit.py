@@ -1,8 +1,70 @@
 # plugins/sync_snipeit.py
 
+import csv
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
-import json
 from plugin_interface import SyncPlugin
+from snapshot_cache import default_cache_path
+from snipeit_client import (DEFAULT_MAX_RETRIES, DEFAULT_POOL_MAXSIZE, PAGE_LIMIT, CircuitOpenError, EntityIndex,
+                            RateLimiter, SnipeITClient, asset_diff, is_transient_error, normalize_name,
+                            normalize_serial)
+from snipeit_endpoint import DEFAULT_ENDPOINT_TTL, Endpoint, EndpointSelector
+from snipeit_id_cache import DEFAULT_TTL as DEFAULT_ID_CACHE_TTL, SnipeITIDCache
+from snipeit_outbox import DEFAULT_MAX_ATTEMPTS, SyncOutbox
+from snipeit_planner import CREATE, FAILED, PATCH, PENDING_ID, UNCHANGED, SyncPlan
+
+# 同步开始时一次性预取并建立名称索引的实体类型
+PREFETCH_ENTITIES = ('manufacturers', 'models')
+# 同时处理的资产数
+DEFAULT_CONCURRENCY = 4
+CATEGORY_ID_MAP = {'台式机': 1, '笔记本': 2, '显示器': 3}
+DEFAULT_CATEGORY = '台式机'
+# 资产数达到该值时改为一次性分页拉取 /hardware 建立序列号索引，而不是逐台调用 hardware/byserial；
+# 有了序列号索引就能顺带列出“仅存在于 Snipe-IT”的资产。config 中 reconcile 为 True 时不论资产数都预取并核对
+SERIAL_PREFETCH_MIN_ASSETS = 20
+# 日志中列出的“仅存在于 Snipe-IT”的资产条数上限，完整列表写入 orphan_report_path
+ORPHAN_LOG_LIMIT = 20
+# 按序列号查询资产的请求失败（与“资产不存在”区分）
+LOOKUP_FAILED = object()
+# dry-run 时逐条列出的资产操作数上限
+PLAN_DETAIL_LIMIT = 50
+# 发件箱重放时每批处理的资产数
+DEFAULT_OUTBOX_BATCH = 50
+
+
+def component_summary(rows, category):
+    """
+    把同一类别的配件行汇总为一个字符串，例如 "Samsung 16GB / Kingston 8GB"。
+    config['custom_fields'] 把类别映射到 Snipe-IT 自定义字段的数据库列名（由 parse_custom_fields 解析），
+    例如 {'CPU': '_snipeit_cpu_1', '内存': '_snipeit_ram_2', '硬盘': '_snipeit_disk_3'}。
+    """
+    parts = []
+    for row in rows:
+        if row.get('类别') != category:
+            continue
+        text = ' '.join(str(row.get(field)) for field in ('型号', '大小') if row.get(field) and row.get(field) != 'N/A')
+        if text:
+            parts.append(text)
+    return ' / '.join(parts)
+
+
+class _AssetLog:
+    """代替 worker 收集单台资产的日志，处理完后整段输出，并发同步时各资产的日志不会交错。"""
+
+    def __init__(self):
+        self.lines = []
+        self.log_message = self
+
+    def emit(self, message):
+        self.lines.append(message)
+
+
+def default_orphan_report_path():
+    return os.path.join(os.path.dirname(default_cache_path()), 'snipeit_orphans.csv')
 
 
 class SnipeITSyncPlugin(SyncPlugin):
@@ -11,63 +73,328 @@ class SnipeITSyncPlugin(SyncPlugin):
         self.icon_name = "sync"
         self.headers = {}
         self.base_url = ""
+        self.client = None
+        self.endpoints = None
+        self.index = EntityIndex()
+        self.id_cache = None
+        self.serial_index = None
+        self._serial_lock = threading.Lock()
+        self.orphan_assets = []
+        self.outbox = None
+        self.dead_lettered = 0
+        # 当前线程最近一次失败的 API 请求是否为暂时性错误；失败的实体创建 {(类型, 规范化名称): 是否暂时性}
+        self._failure = threading.local()
+        self._entity_failures = {}
+        self.results = {}
+        self._results_lock = threading.Lock()
+        self.plan = None
 
-    def _determine_active_url(self, worker, internal_url, external_url):
-        if internal_url:
-            worker.log_message.emit(f"  -> 正在尝试连接内网URL: {internal_url}...")
-            try:
-                response = requests.get(f"{internal_url.rstrip('/')}/api/v1/statuslabels", headers=self.headers,
-                                        timeout=2)
-                response.raise_for_status()
-                worker.log_message.emit("  -> ✅ 内网URL连接成功，将使用此地址。")
-                return internal_url
-            except requests.exceptions.RequestException as e:
-                worker.log_message.emit(f"  -> ⚠️ 内网URL连接失败: {e}")
-        if external_url:
-            worker.log_message.emit(f"  -> 正在尝试连接外网URL: {external_url}...")
+    def _determine_active_url(self, worker, internal_url, external_url, config=None):
+        """同时探测内网与外网地址，先健康响应的胜出；有未过期的缓存结果时直接使用。"""
+        config = config or {}
+        self.endpoints = EndpointSelector(
+            self.client, [Endpoint('内网URL', internal_url, 2), Endpoint('外网URL', external_url, 5)],
+            cache_path=config.get('endpoint_cache_path'), ttl=config.get('endpoint_ttl', DEFAULT_ENDPOINT_TTL),
+            log_callback=worker.log_message.emit)
+        return self.endpoints.select()
+
+    def _api_request(self, worker, method, endpoint, payload=None):
+        if method.upper() not in ('GET', 'POST', 'PATCH', 'PUT', 'DELETE'):
+            raise NotImplementedError(f"不支持的请求方法: {method}")
+        base_url = self.base_url
+        self._failure.transient = False
+        for attempt in range(2):
+            url = f"{base_url.rstrip('/')}/api/v1/{endpoint.lstrip('/')}"
             try:
-                response = requests.get(f"{external_url.rstrip('/')}/api/v1/statuslabels", headers=self.headers,
-                                        timeout=5)
+                # 通过连接池发送，同一主机的请求复用已建立的 TCP/TLS 连接
+                response = self.client.request(method, url, payload=payload)
                 response.raise_for_status()
-                worker.log_message.emit("  -> ✅ 外网URL连接成功，将使用此地址。")
-                return external_url
+                return response.json()
+            except (requests.exceptions.ConnectionError, CircuitOpenError) as e:
+                # 当前地址连不上（或其断路器已打开）时切换到另一个可用地址；POST 可能已被服务器处理，不自动重发
+                new_url = self.endpoints.failover(base_url) if self.endpoints else None
+                if new_url and new_url != base_url:
+                    self.base_url = base_url = new_url
+                    if attempt == 0 and method.upper() != 'POST':
+                        continue
+                self._failure.transient = True
+                worker.log_message.emit(f"  -> ❌ API 请求失败: {e}")
+                return None
             except requests.exceptions.RequestException as e:
-                worker.log_message.emit(f"  -> ❌ 外网URL连接失败: {e}")
-        return None
+                self._failure.transient = is_transient_error(e)
+                worker.log_message.emit(f"  -> ❌ API 请求失败: {e}")
+                return None
 
-    def _api_request(self, worker, method, endpoint, payload=None):
-        url = f"{self.base_url.rstrip('/')}/api/v1/{endpoint.lstrip('/')}"
+    def _fetch_all(self, worker, endpoint):
+        """按 limit/offset 分页读取列表接口的全部行；任意一页失败时返回 None。"""
+        rows, offset = [], 0
+        while True:
+            page = self._api_request(worker, 'GET', endpoint, payload={'limit': PAGE_LIMIT, 'offset': offset})
+            if not page or 'rows' not in page:
+                return None
+            rows.extend(page['rows'])
+            offset += len(page['rows'])
+            if not page['rows'] or offset >= page.get('total', 0):
+                return rows
+
+    def _entity_exists(self, worker, endpoint, entity_id):
+        """确认实体 ID 仍然存在：404 返回 False，网络错误等无法确认的情况返回 None。"""
+        url = f"{self.base_url.rstrip('/')}/api/v1/{endpoint}/{entity_id}"
         try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=self.headers, params=payload, timeout=10)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=self.headers, data=json.dumps(payload), timeout=10)
-            else:
-                raise NotImplementedError(f"不支持的请求方法: {method}")
-            response.raise_for_status()
-            return response.json()
+            response = self.client.get(url)
         except requests.exceptions.RequestException as e:
-            worker.log_message.emit(f"  -> ❌ API 请求失败: {e}")
+            worker.log_message.emit(f"  -> ⚠️ 无法确认 {endpoint}/{entity_id} 是否存在: {e}")
+            return None
+        if response.status_code == 404:
+            return False
+        return True if response.ok else None
+
+    def _prefetch_index(self, worker):
+        for endpoint in PREFETCH_ENTITIES:
+            # 磁盘缓存中已有该类实体时跳过整表预取，未命中的名称再逐个查询
+            if self.id_cache and self.id_cache.has_entries(self.base_url, endpoint):
+                continue
+            rows = self._fetch_all(worker, endpoint)
+            if rows is None:
+                worker.log_message.emit(f"  -> ⚠️ 预取 {endpoint} 失败，将逐个查询。")
+                continue
+            self.index.load(endpoint, rows)
+            worker.log_message.emit(f"  -> 已预取 {endpoint}: {len(rows)} 条。")
+
+    def _remember(self, endpoint, name, entity_id):
+        self.index.add(endpoint, name, entity_id)
+        if self.id_cache:
+            self.id_cache.put(self.base_url, endpoint, name, entity_id)
+
+    def _prefetch_serials(self, worker):
+        """分页读取全部资产，返回 {规范化序列号: 资产}；失败时返回 None，调用方退回逐台查询。"""
+        rows = self._fetch_all(worker, 'hardware')
+        if rows is None:
+            worker.log_message.emit("  -> ⚠️ 预取资产列表失败，将逐台按序列号查询。")
             return None
+        worker.log_message.emit(f"  -> 已预取资产 {len(rows)} 台。")
+        return {normalize_serial(row.get('serial')): row for row in rows if row.get('serial')}
 
-    def _get_or_create(self, worker, search_name, endpoint, creation_payload=None):
-        worker.log_message.emit(f"  -> 正在查询 {search_name}...")
-        response_data = self._api_request(worker, 'GET', endpoint, payload={'search': search_name})
-        if response_data and response_data.get('total', 0) > 0:
-            for item in response_data['rows']:
-                if item.get('name', '').lower() == search_name.lower():
-                    worker.log_message.emit(f"  -> ✅ 已找到 '{search_name}' (ID: {item['id']})")
-                    return item['id']
+    def _find_asset(self, worker, serial):
+        """按序列号查找已存在的资产，优先使用预取的序列号索引；查询请求失败时返回 LOOKUP_FAILED。"""
+        if self.serial_index is not None:
+            return self.serial_index.get(normalize_serial(serial))
+        existing_asset = self._api_request(worker, 'GET', f"hardware/byserial/{serial}")
+        if existing_asset is None:
+            return LOOKUP_FAILED
+        if existing_asset.get('total', 0) > 0:
+            return existing_asset['rows'][0]
+        return None
+
+    def _report_orphans(self, worker, main_assets, report_path=None):
+        """列出 Snipe-IT 中存在、但本次扫描数据中没有的资产；需要先预取序列号索引。"""
+        log_callback = worker.log_message.emit
+        scanned = {normalize_serial(item.get('序列号')) for item in main_assets}
+        self.orphan_assets = [asset for serial, asset in self.serial_index.items() if serial not in scanned]
+        log_callback(f"\n--- Snipe-IT 中存在但扫描数据中没有的资产: {len(self.orphan_assets)} 台 ---")
+        for asset in self.orphan_assets[:ORPHAN_LOG_LIMIT]:
+            log_callback(f"  - {asset.get('serial')}  {asset.get('asset_tag') or ''}  {asset.get('name') or ''}")
+        if len(self.orphan_assets) > ORPHAN_LOG_LIMIT:
+            log_callback(f"  ... 其余 {len(self.orphan_assets) - ORPHAN_LOG_LIMIT} 台未列出。")
+        if report_path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok=True)
+                with open(report_path, 'w', newline='', encoding='utf-8-sig') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(['ID', '序列号', '资产标签', '名称', '型号'])
+                    for asset in self.orphan_assets:
+                        writer.writerow([asset.get('id'), asset.get('serial'), asset.get('asset_tag'),
+                                         asset.get('name'), (asset.get('model') or {}).get('name', '')])
+                log_callback(f"  -> 完整列表已写入: {report_path}")
+            except OSError as e:
+                log_callback(f"  -> ❌ 写入报告失败: {e}")
+
+    def _count(self, outcome):
+        with self._results_lock:
+            self.results[outcome] = self.results.get(outcome, 0) + 1
+
+    def _lookup_entity(self, worker, search_name, endpoint):
+        """只读地查找实体 ID：内存索引 -> 磁盘 ID 缓存（确认仍存在）-> search 查询；不存在时返回 None。"""
+        cached_id = self.index.get(endpoint, search_name)
+        if cached_id is not None:
+            return cached_id
+        cached_id = self.id_cache.get(self.base_url, endpoint, search_name) if self.id_cache else None
+        if cached_id is not None:
+            # 每次同步对缓存的 ID 确认一次，之后由内存索引直接命中
+            if self._entity_exists(worker, endpoint, cached_id) is not False:
+                self.index.add(endpoint, search_name, cached_id)
+                return cached_id
+            worker.log_message.emit(f"  -> 缓存的 '{search_name}' (ID: {cached_id}) 已不存在，重新查询...")
+            self.id_cache.invalidate(self.base_url, endpoint, cached_id)
+        # 已完整预取的类型在索引中找不到即说明不存在
+        if not self.index.is_complete(endpoint):
+            response_data = self._api_request(worker, 'GET', endpoint, payload={'search': search_name})
+            if response_data and response_data.get('total', 0) > 0:
+                for item in response_data['rows']:
+                    if normalize_name(item.get('name')) == normalize_name(search_name):
+                        self._remember(endpoint, search_name, item['id'])
+                        return item['id']
+        return None
+
+    def _create_entity(self, worker, search_name, endpoint, payload):
         worker.log_message.emit(f"  -> '{search_name}' 不存在，正在创建...")
-        payload_to_create = creation_payload if creation_payload is not None else {'name': search_name}
-        creation_data = self._api_request(worker, 'POST', endpoint, payload=payload_to_create)
+        creation_data = self._api_request(worker, 'POST', endpoint, payload=payload)
         if creation_data and creation_data.get('status') == 'success':
             new_id = creation_data.get('payload', {}).get('id')
+            self._remember(endpoint, search_name, new_id)
             worker.log_message.emit(f"  -> ✅ 成功创建 '{search_name}' (新 ID: {new_id})")
             return new_id
         worker.log_message.emit(f"  -> ❌ 创建 '{search_name}' 失败。")
+        # 服务器返回了错误（例如校验失败）时重试无用；请求本身没有得到响应时才是暂时性失败
+        self._entity_failures[(endpoint, normalize_name(search_name))] = \
+            creation_data is None and self._failure.transient
         return None
 
+    @staticmethod
+    def _server_messages(result):
+        """服务器以 status=error 拒绝请求时附带的错误说明，例如字段校验失败的原因。"""
+        messages = result.get('messages') if isinstance(result, dict) else None
+        return f": {messages}" if messages else ""
+
+    def _transient_failure(self, result):
+        """本线程刚结束的 API 请求失败是否为暂时性的；result 为服务器返回的（非 success）数据时视为永久性。"""
+        return result is None and getattr(self._failure, 'transient', False)
+
+    def _scanned_fields(self, job, model_id):
+        """
+        由扫描数据决定的资产字段：型号与配置的自定义字段。新建时写入，已有资产只比较并更新这些字段；
+        名称、资产标签只在新建时写入（行中带有 资产名称/资产标签 时使用其值，否则为“品牌 型号”与序列号），
+        之后在 Snipe-IT 中维护；状态由 Snipe-IT 中的借出/归还流程管理，同步不会覆盖。
+        """
+        return {'model_id': model_id, **job['custom_fields']}
+
+    def _plan(self, worker, jobs, concurrency):
+        """
+        规划阶段（只读）：每个制造商、型号名称只查询一次，逐台查找已有资产，
+        得到去重后的新建清单与每台资产的操作。
+        """
+        plan = SyncPlan(jobs)
+        started = time.perf_counter()
+        category_id = CATEGORY_ID_MAP.get(DEFAULT_CATEGORY)
+        for job in jobs:
+            job['manufacturer'] = job['asset'].get('品牌', '未知制造商')
+            job['model'] = job['asset'].get('型号', '未知型号')
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='snipeit-plan') as pool:
+            manufacturers = {normalize_name(job['manufacturer']): job['manufacturer'] for job in jobs}
+            models = {}
+            for job in jobs:
+                models.setdefault(normalize_name(job['model']), job)
+            found = dict(zip(manufacturers, pool.map(
+                lambda name: self._lookup_entity(worker, name, 'manufacturers'), manufacturers.values())))
+            found_models = dict(zip(models, pool.map(
+                lambda job: self._lookup_entity(worker, job['model'], 'models'), models.values())))
+
+            def find_asset(job):
+                asset = self._find_asset(worker, job['asset'].get('序列号'))
+                return asset, asset is LOOKUP_FAILED and self._transient_failure(None)
+
+            existing = list(pool.map(find_asset, jobs))
+
+        for job, (existing_asset, lookup_transient) in zip(jobs, existing):
+            job['manufacturer_id'] = found[normalize_name(job['manufacturer'])]
+            job['model_id'] = found_models[normalize_name(job['model'])]
+            if not category_id:
+                job['action'], job['error'] = FAILED, f"未在 CATEGORY_ID_MAP 中配置 '{DEFAULT_CATEGORY}' 的ID"
+                job['retryable'] = False
+                continue
+            if existing_asset is LOOKUP_FAILED:
+                job['action'], job['error'] = FAILED, "查询资产失败"
+                job['retryable'] = lookup_transient
+                continue
+            if job['manufacturer_id'] is None:
+                plan.add_entity('manufacturers', job['manufacturer'])
+            if job['model_id'] is None:
+                plan.add_entity('models', job['model'], manufacturer=job['manufacturer'])
+            job['existing'] = existing_asset
+            if not existing_asset:
+                job['action'] = CREATE
+                continue
+            changes = asset_diff(existing_asset, self._scanned_fields(job, job['model_id'] or PENDING_ID))
+            job['action'], job['changes'] = (PATCH, changes) if changes else (UNCHANGED, {})
+
+        # 包括地址探测与预取在内，本次同步到目前为止发送的全部读请求
+        plan.read_calls = sum(entry['requests'] for label, entry in self.client.endpoint_stats().items()
+                              if label.startswith('GET '))
+        plan.read_seconds = time.perf_counter() - started
+        return plan
+
+    def _log_plan(self, worker, plan, concurrency, config, details=False):
+        stats = self.client.endpoint_stats()
+        requests_made = sum(entry['requests'] for entry in stats.values())
+        latency = sum(entry['avg'] * entry['requests'] for entry in stats.values()) / requests_made \
+            if requests_made else 0.0
+        log_callback = worker.log_message.emit
+        log_callback("--- 同步计划 ---")
+        for line in plan.summary_lines(latency, concurrency, config.get('rate_limit')):
+            log_callback(line)
+        if details:
+            for line in plan.detail_lines(config.get('plan_detail_limit', PLAN_DETAIL_LIMIT)):
+                log_callback(line)
+
+    def _execute(self, worker, plan, concurrency):
+        """执行阶段：按依赖顺序创建制造商、型号，再并发新建或更新资产；返回各任务的结果。"""
+        category_id = CATEGORY_ID_MAP.get(DEFAULT_CATEGORY)
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='snipeit-sync') as pool:
+            list(pool.map(lambda entity: self._create_entity(worker, entity['name'], 'manufacturers',
+                                                             {'name': entity['name']}),
+                          plan.entities['manufacturers'].values()))
+
+            def create_model(entity):
+                manufacturer_id = self.index.get('manufacturers', entity['manufacturer'])
+                if manufacturer_id is None:
+                    worker.log_message.emit(f"  -> ❌ 型号 '{entity['name']}' 的制造商创建失败，跳过。")
+                    self._entity_failures[('models', normalize_name(entity['name']))] = self._entity_failures.get(
+                        ('manufacturers', normalize_name(entity['manufacturer'])), False)
+                    return None
+                payload = {'name': entity['name'], 'category_id': category_id, 'manufacturer_id': manufacturer_id}
+                return self._create_entity(worker, entity['name'], 'models', payload)
+
+            list(pool.map(create_model, plan.entities['models'].values()))
+            return list(pool.map(lambda job: self._execute_job(worker, job), plan.jobs))
+
+    def _execute_job(self, worker, job):
+        cancel_event = getattr(worker, 'cancel_event', None)
+        if cancel_event is not None and cancel_event.is_set():
+            return None
+        asset_log = _AssetLog()
+        try:
+            outcome = self._sync_asset(asset_log, job)
+        except Exception as e:
+            asset_log.emit(f"  -> ❌ 处理资产时出错: {e}")
+            outcome, job['retryable'] = 'failed', False
+        if outcome == 'failed' and self.outbox is not None:
+            self._queue_failure(asset_log, job)
+        elif outcome is not None and self.outbox is not None and job['op']:
+            self.outbox.complete(job['op'])
+        worker.log_message.emit('\n'.join(asset_log.lines))
+        self._count(outcome)
+        return outcome
+
+    def _queue_failure(self, asset_log, job):
+        """
+        只有暂时性失败（连接错误、超时、5xx、断路器打开）进入发件箱等待重放；
+        服务器明确拒绝的请求（4xx、校验失败等）重放也不会成功，重放中的这类操作与重试次数用尽的操作移入死信列表。
+        """
+        retryable = job.get('retryable', False)
+        if job['op']:
+            error = asset_log.lines[-1].strip() if asset_log.lines else None
+            if self.outbox.fail(job['op'], error=error, retryable=retryable):
+                with self._results_lock:
+                    self.dead_lettered += 1
+                reason = "重试次数已用尽" if retryable else "服务器拒绝了该请求"
+                asset_log.emit(f"  -> ❌ {reason}，已从离线发件箱移入死信列表，不再自动重放。")
+        elif retryable:
+            self.outbox.enqueue(job['asset'].get('序列号'), job['rows'])
+            asset_log.emit("  -> ⚠️ 已存入离线发件箱，下次同步时自动重试。")
+        else:
+            asset_log.emit("  -> ⚠️ 该错误重试也无法解决，未加入离线发件箱，请检查数据后重新同步。")
+
     def sync(self, worker, data: list, config: dict):
         log_callback = worker.log_message.emit
         api_key = config.get('key')
@@ -83,50 +410,196 @@ class SnipeITSyncPlugin(SyncPlugin):
 
         self.headers = {"Authorization": f"Bearer {api_key}", "Accept": "application/json",
                         "Content-Type": "application/json"}
-        self.base_url = self._determine_active_url(worker, internal_url, external_url)
-        if not self.base_url:
-            log_callback("❌ 错误：内网和外网URL都无法连接，同步任务中止。")
-            return
+        concurrency = max(1, int(config.get('concurrency', DEFAULT_CONCURRENCY)))
+        limiter = RateLimiter(config.get('rate_limit'), config.get('rate_burst'))
+        pool_size = max(concurrency, config.get('pool_size', DEFAULT_POOL_MAXSIZE))
+        self.client = SnipeITClient(self.headers, pool_maxsize=pool_size,
+                                    pooled=config.get('connection_pooling', True), limiter=limiter,
+                                    max_retries=config.get('max_retries', DEFAULT_MAX_RETRIES))
+        self.id_cache = None
+        if config.get('id_cache', True):
+            self.id_cache = SnipeITIDCache(config.get('id_cache_path'),
+                                           ttl=config.get('id_cache_ttl', DEFAULT_ID_CACHE_TTL))
+        self.outbox = None
+        if config.get('outbox', True):
+            self.outbox = SyncOutbox(config.get('outbox_path'),
+                                     max_attempts=config.get('outbox_max_attempts', DEFAULT_MAX_ATTEMPTS))
+        self.dead_lettered = 0
+        self._entity_failures = {}
+        try:
+            self._sync_assets(worker, data, internal_url, external_url, concurrency, config)
+        finally:
+            if self.id_cache:
+                self.id_cache.save()
+                cache_stats = self.id_cache.stats()
+                log_callback(f"ID 缓存: 命中 {cache_stats['hits']} 次，未命中 {cache_stats['misses']} 次。")
+            stats = self.client.stats()
+            log_callback(f"HTTP 统计: 共发送 {stats['requests']} 个请求，新建连接 {stats['connections']} 个，"
+                         f"被限流 {stats['rate_limited']} 次，限流等待 {stats['throttle_wait']:.1f}s，"
+                         f"5xx 重试 {stats['retries']} 次，断路器打开 {stats['breaker_opened']} 次。")
+            for label, entry in sorted(self.client.endpoint_stats().items()):
+                log_callback(f"  {label}: {entry['requests']} 次，平均 {entry['avg'] * 1000:.0f}ms，"
+                             f"最慢 {entry['max'] * 1000:.0f}ms，重试 {entry['retries']} 次")
+            self.client.close()
 
-        log_callback(f"--- 开始同步资产到 Snipe-IT ({self.base_url}) ---")
-        CATEGORY_ID_MAP = {'台式机': 1, '笔记本': 2, '显示器': 3}
+    def _build_jobs(self, data, config, op=None):
+        """
+        把扫描数据拆成逐台资产的同步任务: {asset, rows, custom_fields, op}。
+        扫描数据中没有主机信息，只有单台机器时才能确定配件属于哪台资产，此时 rows 包含全部配件行。
+        """
         main_assets = [item for item in data if
                        item.get('类别') == '主板/整机' and item.get('序列号') and item.get('序列号') != 'N/A']
-
+        single = len(main_assets) == 1
+        jobs = []
         for asset_data in main_assets:
-            serial = asset_data.get('序列号')
-            manufacturer_name = asset_data.get('品牌', '未知制造商')
-            model_name = asset_data.get('型号', '未知型号')
-            category_name_in_snipeit = '台式机'
-            log_callback(f"\n--- 正在处理序列号: {serial} ---")
+            rows = list(data) if single else [asset_data]
+            custom_fields = {}
+            if single:
+                for category, column in (config.get('custom_fields') or {}).items():
+                    summary = component_summary(rows, category)
+                    if summary:
+                        custom_fields[column] = summary
+            jobs.append({'asset': asset_data, 'rows': rows, 'custom_fields': custom_fields, 'op': op})
+        return jobs
 
-            manufacturer_id = self._get_or_create(worker, manufacturer_name, 'manufacturers')
-            if not manufacturer_id: continue
+    def _run_jobs(self, worker, jobs, concurrency, config):
+        """规划并执行一组同步任务，返回各任务的结果；发件箱中的任务根据结果出队或推迟重试。"""
+        if not jobs:
+            return []
+        self.plan = self._plan(worker, jobs, concurrency)
+        self._log_plan(worker, self.plan, concurrency, config)
+        return self._execute(worker, self.plan, concurrency)
 
-            category_id = CATEGORY_ID_MAP.get(category_name_in_snipeit)
-            if not category_id:
-                log_callback(f"  -> ❌ 错误：未在 CATEGORY_ID_MAP 中配置 '{category_name_in_snipeit}' 的ID。")
-                continue
+    def _drain_outbox(self, worker, concurrency, config, exclude):
+        """分批重放发件箱中已到期的操作；某一批全部失败时说明服务器仍有问题，停止本次重放。"""
+        log_callback = worker.log_message.emit
+        ops = self.outbox.due(exclude=exclude)
+        if not ops:
+            return []
+        log_callback(f"--- 正在重放离线发件箱中的 {len(ops)} 个待同步资产 ---")
+        batch_size = max(1, int(config.get('outbox_batch', DEFAULT_OUTBOX_BATCH)))
+        replayed = []
+        for start in range(0, len(ops), batch_size):
+            jobs = []
+            for op in ops[start:start + batch_size]:
+                jobs.extend(self._build_jobs(op['rows'], config, op=op)[:1])
+            outcomes = self._run_jobs(worker, jobs, concurrency, config)
+            replayed.extend(job['asset'] for job in jobs)
+            if outcomes and all(outcome in ('failed', None) for outcome in outcomes):
+                log_callback("  -> ⚠️ 本批次全部失败，剩余操作留待下次同步重放。")
+                break
+        if self.dead_lettered:
+            log_callback(f"  -> ❌ {self.dead_lettered} 个操作已移入死信列表 (共 {len(self.outbox.dead_letters())} 条)，"
+                         f"详见 {self.outbox.path}")
+        log_callback(f"--- 发件箱重放结束，剩余 {len(self.outbox)} 个待同步资产 ---")
+        return replayed
 
-            model_payload = {'name': model_name, 'category_id': category_id, 'manufacturer_id': manufacturer_id}
-            model_id = self._get_or_create(worker, model_name, 'models', creation_payload=model_payload)
-            if not model_id: continue
+    def _sync_assets(self, worker, data, internal_url, external_url, concurrency=DEFAULT_CONCURRENCY, config=None):
+        config = config or {}
+        log_callback = worker.log_message.emit
+        dry_run = config.get('dry_run', False)
+        jobs = self._build_jobs(data, config)
+        self.base_url = self._determine_active_url(worker, internal_url, external_url, config)
+        if not self.base_url:
+            if dry_run:
+                log_callback("❌ 错误：内网和外网URL都无法连接，无法生成同步计划。")
+            elif self.outbox is not None and jobs:
+                self.outbox.enqueue_many((job['asset'].get('序列号'), job['rows']) for job in jobs)
+                log_callback(f"⚠️ 内网和外网URL都无法连接，{len(jobs)} 台资产已存入离线发件箱 "
+                             f"(共 {len(self.outbox)} 个待同步)，下次连接成功时自动同步。")
+            else:
+                log_callback("❌ 错误：内网和外网URL都无法连接，同步任务中止。")
+            return
 
-            asset_payload = {
-                "model_id": model_id, "serial": serial,
-                "name": asset_data.get('资产名称', f"{manufacturer_name} {model_name}"),
-                "status_id": 2, "asset_tag": asset_data.get('资产标签', serial)
-            }
+        log_callback(f"--- 开始{'规划' if dry_run else '同步'}资产到 Snipe-IT ({self.base_url}，并发 {concurrency}) ---")
+        self.index = EntityIndex()
+        self._prefetch_index(worker)
+        # 本次扫描中的序列号以新数据为准，发件箱中同一序列号的旧操作直接丢弃
+        live_serials = {normalize_serial(job['asset'].get('序列号')) for job in jobs}
+        outbox_jobs = []
+        if self.outbox is not None and dry_run:
+            # dry-run 不修改发件箱，只把其中到期的操作一并列入计划
+            for op in self.outbox.due(exclude=live_serials):
+                outbox_jobs.extend(self._build_jobs(op['rows'], config)[:1])
+        elif self.outbox is not None:
+            for serial in live_serials:
+                self.outbox.discard(serial)
+        pending = len(outbox_jobs) if dry_run else len(self.outbox) if self.outbox is not None else 0
+        # reconcile 强制预取并核对；prefetch_serials: True/False 强制开启或关闭，都未设置时按资产数自动决定
+        reconcile = config.get('reconcile', False)
+        prefetch_serials = True if reconcile else config.get('prefetch_serials')
+        if prefetch_serials is None:
+            prefetch_serials = len(jobs) + pending >= SERIAL_PREFETCH_MIN_ASSETS
+        self.serial_index = self._prefetch_serials(worker) if prefetch_serials else None
+        report_path = config.get('orphan_report_path') or (default_orphan_report_path() if reconcile else None)
+        self.results = {}
 
-            existing_asset = self._api_request(worker, 'GET', f"hardware/byserial/{serial}")
-            if existing_asset and existing_asset.get('total', 0) > 0:
-                asset_id = existing_asset['rows'][0]['id']
-                log_callback(f"  -> ✅ 资产已存在 (ID: {asset_id})，未来可在此处执行更新操作。")
-            else:
-                log_callback(f"  -> 资产不存在，正在创建...")
-                creation_result = self._api_request(worker, 'POST', 'hardware', payload=asset_payload)
-                if creation_result and creation_result.get('status') == 'success':
-                    log_callback(f"  -> ✅ 成功在 Snipe-IT 中创建新资产！")
-                else:
-                    log_callback(f"  -> ❌ 创建资产失败。")
-        log_callback("\n--- 所有资产同步任务完成 ---")
\ No newline at end of file
+        if dry_run:
+            self.plan = self._plan(worker, outbox_jobs + jobs, concurrency)
+            self._log_plan(worker, self.plan, concurrency, config, details=True)
+            if self.serial_index is not None:
+                self._report_orphans(worker, [job['asset'] for job in self.plan.jobs], report_path)
+            log_callback("\n--- dry-run 结束：未向 Snipe-IT 写入任何数据 ---")
+            return
+
+        synced_assets = self._drain_outbox(worker, concurrency, config, live_serials) if pending else []
+        self._run_jobs(worker, jobs, concurrency, config)
+        synced_assets.extend(job['asset'] for job in jobs)
+
+        cancel_event = getattr(worker, 'cancel_event', None)
+        if cancel_event is not None and cancel_event.is_set():
+            log_callback("\n⛔ 同步已取消，剩余资产未处理。")
+        elif self.serial_index is not None:
+            self._report_orphans(worker, synced_assets, report_path)
+        log_callback(f"\n同步结果: 新建 {self.results.get('created', 0)} 台，更新 {self.results.get('updated', 0)} 台，"
+                     f"无变化 {self.results.get('unchanged', 0)} 台，失败 {self.results.get('failed', 0)} 台。")
+        log_callback("\n--- 所有资产同步任务完成 ---")
+
+    def _sync_asset(self, worker, job):
+        """按计划同步一台资产，返回 'created' / 'updated' / 'unchanged' / 'failed'。"""
+        log_callback = worker.log_message.emit
+        asset_data = job['asset']
+        serial = asset_data.get('序列号')
+        log_callback(f"\n--- 正在处理序列号: {serial} ---")
+        if job['action'] == FAILED:
+            log_callback(f"  -> ❌ {job.get('error')}，跳过本次同步。")
+            return 'failed'
+
+        model_id = job['model_id'] or self.index.get('models', job['model'])
+        if not model_id:
+            log_callback(f"  -> ❌ 型号 '{job['model']}' 不可用，跳过本次同步。")
+            job['retryable'] = self._entity_failures.get(('models', normalize_name(job['model'])), False)
+            return 'failed'
+
+        existing_asset = job['existing']
+        if existing_asset:
+            asset_id = existing_asset['id']
+            changes = asset_diff(existing_asset, self._scanned_fields(job, model_id))
+            if not changes:
+                log_callback(f"  -> ✅ 资产已存在 (ID: {asset_id})，信息无变化。")
+                return 'unchanged'
+            log_callback(f"  -> 资产已存在 (ID: {asset_id})，正在更新字段: {', '.join(changes)}...")
+            result = self._api_request(worker, 'PATCH', f"hardware/{asset_id}", payload=changes)
+            if result and result.get('status') == 'success':
+                log_callback(f"  -> ✅ 资产更新成功。")
+                return 'updated'
+            log_callback(f"  -> ❌ 更新资产失败{self._server_messages(result)}。")
+            job['retryable'] = self._transient_failure(result)
+            return 'failed'
+
+        asset_payload = {
+            "serial": serial, "name": asset_data.get('资产名称', f"{job['manufacturer']} {job['model']}"),
+            "status_id": 2, "asset_tag": asset_data.get('资产标签', serial),
+            **self._scanned_fields(job, model_id)
+        }
+        log_callback(f"  -> 资产不存在，正在创建...")
+        creation_result = self._api_request(worker, 'POST', 'hardware', payload=asset_payload)
+        if creation_result and creation_result.get('status') == 'success':
+            log_callback(f"  -> ✅ 成功在 Snipe-IT 中创建新资产！")
+            if self.serial_index is not None and creation_result.get('payload'):
+                with self._serial_lock:
+                    self.serial_index[normalize_serial(serial)] = creation_result['payload']
+            return 'created'
+        log_callback(f"  -> ❌ 创建资产失败{self._server_messages(creation_result)}。")
+        job['retryable'] = self._transient_failure(creation_result)
+        return 'failed'
@@ -0,0 +1,309 @@
+# scan_engine.py
+
+"""
+并发扫描引擎：在有界线程池中并行执行扫描插件。
+"""
+
+import itertools
+import queue
+import threading
+import time
+
+from asset_table import AssetRecord, AssetTable
+from snapshot_cache import machine_fingerprint
+from wmi_broker import WMIQueryBroker, default_connector_factory
+
+# pythoncom 仅在 Windows 上可用；在其它平台（如使用假连接器做基准测试时）优雅降级
+try:
+    import pythoncom
+except ImportError:
+    pythoncom = None
+
+# 默认的并发扫描线程数
+DEFAULT_MAX_WORKERS = 4
+# 插件未声明 timeout 时的默认执行期限（秒）
+DEFAULT_PLUGIN_TIMEOUT = 30
+# 等待工作线程事件时的轮询间隔（秒），决定超时与取消的响应速度
+POLL_INTERVAL = 0.2
+
+
+def timeout_rows(plugin, timeout):
+    """插件超时时代替其结果的标记行，提示用户该部分数据不完整。"""
+    return [AssetRecord(
+        category=getattr(plugin, 'name', '未命名插件'),
+        brand='扫描超时',
+        model=f'超过 {timeout:g} 秒未返回，结果不完整',
+    )]
+
+
+class ScanEngine:
+    """
+    在有界线程池中并发运行扫描插件。
+    每个工作线程独立初始化 COM 并持有自己的 WMI 连接，结果按插件原始顺序合并，保证输出确定。
+    插件拿到的是会话级的 WMIQueryBroker，同一个类在一次会话中只会被查询一次。
+    每个插件在各自的期限内运行：超时的插件以标记行代替结果，卡住的线程被放弃并由新线程补位；
+    取消时跳过尚未开始的插件，空闲线程立即释放 COM 后退出。
+    每次 run() 结束后 timed_out 为本次超时的插件名称集合，调用方据此判断结果是否完整，不必检查标记行的文本。
+    """
+
+    def __init__(self, connector_factory=None, max_workers=DEFAULT_MAX_WORKERS,
+                 default_timeout=DEFAULT_PLUGIN_TIMEOUT):
+        self.connector_factory = connector_factory or default_connector_factory
+        self.max_workers = max(1, int(max_workers))
+        self.default_timeout = default_timeout
+        self.timed_out = set()
+
+    def run(self, scan_plugins, log_callback=print, progress_callback=None, broker=None, cache=None,
+            force_refresh=False, cancel_event=None):
+        """
+        执行所有扫描插件并返回合并后的硬件数据表 (AssetTable)，行顺序与插件顺序一致。
+        如果所有插件都因 WMI 连接失败而无法执行，则返回 None。
+        传入 broker 可与诊断等其它任务共享同一会话的查询缓存；
+        传入 cache (SnapshotCache) 时，指纹一致且未过期的插件直接使用磁盘缓存，force_refresh 可强制全部重扫；
+        cancel_event (threading.Event) 被设置后停止调度剩余插件，并返回已完成部分的结果。
+        """
+        total_steps = len(scan_plugins)
+        self.timed_out = set()
+        if total_steps == 0:
+            return AssetTable()
+        if broker is None:
+            broker = WMIQueryBroker(self.connector_factory)
+        cancel_event = cancel_event or threading.Event()
+
+        results = [None] * total_steps
+        try:
+            fingerprint, pending = None, list(range(total_steps))
+            if cache is not None:
+                fingerprint, pending = self._load_cached(scan_plugins, results, cache, broker, force_refresh,
+                                                         log_callback)
+
+            completed = total_steps - len(pending)
+            if progress_callback and completed:
+                progress_callback(int((completed / total_steps) * 100))
+            pool = _PluginPool(self, scan_plugins, broker, cancel_event, log_callback, progress_callback)
+            connect_errors, succeeded = pool.run(pending, results, completed)
+            self.timed_out = {getattr(scan_plugins[index], 'name', '未命名插件') for index in pool.timed_out}
+        finally:
+            # 计算指纹时在当前线程建立了连接，必须在调用方 CoUninitialize 之前释放
+            broker.release()
+
+        if progress_callback:
+            progress_callback(100)
+
+        stats = broker.stats()
+        log_callback(f"WMI 查询缓存: 命中 {stats['hits']} 次，实际查询 {stats['misses']} 次。")
+
+        if pending and len(connect_errors) == len(pending) == total_steps:
+            log_callback(f"❌ WMI 连接失败: {connect_errors[0]}")
+            return None
+
+        if cache is not None and fingerprint:
+            # 只缓存正常完成的插件；超时或取消的部分下次仍需重新扫描
+            for index in succeeded:
+                cache.put(fingerprint, scan_plugins[index], results[index])
+            try:
+                cache.save()
+            except OSError as e:
+                log_callback(f"⚠️ 快照缓存写入失败: {e}")
+            log_callback(f"快照缓存: 命中 {total_steps - len(pending)} 个模块，重新扫描 {len(pending)} 个模块。")
+
+        hardware_data = AssetTable()
+        for result in results:
+            # 旧插件返回的字典、快照缓存中的字典都在这里统一适配为列存储
+            hardware_data.extend(result)
+        return hardware_data
+
+    def plugin_timeout(self, plugin):
+        return getattr(plugin, 'timeout', None) or self.default_timeout
+
+    def _load_cached(self, scan_plugins, results, cache, broker, force_refresh, log_callback):
+        """计算机器指纹并填入仍然有效的缓存结果，返回 (指纹, 需要重新扫描的插件下标)。"""
+        pending = list(range(len(scan_plugins)))
+        try:
+            fingerprint = machine_fingerprint(broker)
+        except Exception as e:
+            log_callback(f"⚠️ 无法计算机器指纹，本次不使用快照缓存: {e}")
+            return None, pending
+        if force_refresh:
+            log_callback("已选择强制刷新，忽略所有快照缓存。")
+            return fingerprint, pending
+
+        pending = []
+        for index, plugin in enumerate(scan_plugins):
+            cached = cache.get(fingerprint, plugin)
+            if cached:
+                results[index] = cached
+                log_callback(f"♻️ 模块 '{getattr(plugin, 'name', '未命名插件')}' 使用快照缓存。")
+            else:
+                pending.append(index)
+        return fingerprint, pending
+
+
+class _PluginPool:
+    """一次扫描中使用的工作线程池，负责调度、超时监控与取消。"""
+
+    def __init__(self, engine, scan_plugins, broker, cancel_event, log_callback, progress_callback):
+        self.engine = engine
+        self.scan_plugins = scan_plugins
+        self.broker = broker
+        self.cancel_event = cancel_event
+        self.log_callback = log_callback
+        self.progress_callback = progress_callback
+        self.tasks = queue.Queue()
+        self.events = queue.Queue()
+        self.abandoned_workers = set()
+        self.live_workers = set()
+        self.timed_out = []  # 超时的插件下标
+        self._worker_ids = itertools.count()
+        self._lock = threading.Lock()
+
+    def run(self, pending, results, completed):
+        """执行 pending 中的插件并把结果写入 results，返回 (连接失败列表, 正常完成的插件下标)。"""
+        connect_errors, succeeded = [], []
+        if not pending:
+            return connect_errors, succeeded
+        total_steps = len(self.scan_plugins)
+
+        for index in pending:
+            self.tasks.put((index, self.scan_plugins[index]))
+        worker_count = min(self.engine.max_workers, len(pending))
+        for _ in range(worker_count):
+            self.tasks.put(None)
+        self.log_callback(f"正在启动 {worker_count} 个扫描线程...")
+        for _ in range(worker_count):
+            self._spawn_worker()
+
+        running = {}  # 插件下标 -> (开始时间, 截止时间, 工作线程 ID)
+        finished = set()
+        while len(finished) < len(pending):
+            if self.cancel_event.is_set():
+                self._cancel(pending, finished, running)
+                break
+            try:
+                event = self.events.get(timeout=POLL_INTERVAL)
+            except queue.Empty:
+                event = None
+            expired = self._expire_overdue(running, finished, results)
+            if expired:
+                completed += expired
+                self._report_progress(completed, total_steps)
+            if event is None:
+                continue
+
+            kind, index, payload = event
+
+            plugin = self.scan_plugins[index]
+            plugin_name = getattr(plugin, 'name', '未命名插件')
+            if index in finished:
+                # 已被判定超时的插件最终返回了结果，丢弃以保持输出一致
+                if kind != 'start':
+                    self.log_callback(f"  -> 模块 '{plugin_name}' 在超时后才返回，结果已丢弃。")
+                continue
+            if kind == 'start':
+                started = time.perf_counter()
+                running[index] = (started, started + self.engine.plugin_timeout(plugin), payload)
+                self.log_callback(f"--- 正在扫描: {plugin_name} ---")
+                continue
+
+            started, _, _ = running.pop(index)
+            elapsed = time.perf_counter() - started
+            if kind == 'ok':
+                if payload:
+                    results[index] = payload
+                    succeeded.append(index)
+                    self.log_callback(f"✅ 模块 '{plugin_name}' 扫描成功 (耗时 {elapsed:.2f}s)。")
+                else:
+                    self.log_callback(f"⚠️ 模块 '{plugin_name}' 扫描完成，但未返回数据。")
+            elif kind == 'connect_error':
+                connect_errors.append(payload)
+                self.log_callback(f"❌ 模块 '{plugin_name}' 无法建立 WMI 连接: {payload}")
+            else:
+                self.log_callback(f"❌ 模块 '{plugin_name}' 扫描失败: {payload}")
+
+            finished.add(index)
+            completed += 1
+            self._report_progress(completed, total_steps)
+        return connect_errors, succeeded
+
+    def _expire_overdue(self, running, finished, results):
+        """把超过期限的插件标记为超时，放弃其线程并启动新线程补位，返回本次超时的插件数。"""
+        now = time.perf_counter()
+        expired = 0
+        for index, (_, deadline, worker_id) in list(running.items()):
+            if now < deadline:
+                continue
+            plugin = self.scan_plugins[index]
+            timeout = self.engine.plugin_timeout(plugin)
+            del running[index]
+            finished.add(index)
+            results[index] = timeout_rows(plugin, timeout)
+            self.timed_out.append(index)
+            with self._lock:
+                self.abandoned_workers.add(worker_id)
+            self.log_callback(f"⏱️ 模块 '{getattr(plugin, 'name', '未命名插件')}' 超过 {timeout:g} 秒未返回，已跳过。")
+            self._spawn_worker()
+            expired += 1
+        return expired
+
+    def _cancel(self, pending, finished, running):
+        """丢弃尚未开始的插件，并唤醒所有空闲线程让其释放 COM 后退出。"""
+        skipped = 0
+        while True:
+            try:
+                item = self.tasks.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                skipped += 1
+        with self._lock:
+            self.abandoned_workers.update(worker_id for _, _, worker_id in running.values())
+            live = len(self.live_workers)
+        for _ in range(live):
+            self.tasks.put(None)
+        abandoned = len(pending) - len(finished) - skipped
+        self.log_callback(f"⛔ 扫描已取消：跳过 {skipped} 个未开始的模块，放弃 {abandoned} 个正在运行的模块。")
+
+    def _report_progress(self, completed, total_steps):
+        if self.progress_callback:
+            self.progress_callback(int((completed / total_steps) * 100))
+
+    def _spawn_worker(self):
+        worker_id = next(self._worker_ids)
+        with self._lock:
+            self.live_workers.add(worker_id)
+        threading.Thread(target=self._worker_loop, args=(worker_id,), daemon=True).start()
+
+    def _worker_loop(self, worker_id):
+        """工作线程主循环：初始化 COM，按需建立本线程专属的连接，依次执行分配到的插件。"""
+        if pythoncom:
+            pythoncom.CoInitialize()
+        connected = False
+        try:
+            while not self.cancel_event.is_set():
+                item = self.tasks.get()
+                if item is None:
+                    break
+                index, plugin = item
+                self.events.put(('start', index, worker_id))
+                if not connected:
+                    try:
+                        self.broker.connector()
+                        connected = True
+                    except Exception as e:
+                        self.events.put(('connect_error', index, e))
+                        continue
+                try:
+                    self.events.put(('ok', index, plugin.scan(self.broker)))
+                except Exception as e:
+                    self.events.put(('error', index, e))
+                with self._lock:
+                    if worker_id in self.abandoned_workers:
+                        # 已有新线程补位，本线程不再领取任务
+                        break
+        finally:
+            with self._lock:
+                self.live_workers.discard(worker_id)
+            # 必须在 CoUninitialize 之前释放本线程的 COM 对象
+            self.broker.release()
+            if pythoncom:
+                pythoncom.CoUninitialize()
@@ -0,0 +1,136 @@
+# snapshot_cache.py
+
+"""
+硬件快照缓存：把每个扫描插件的结果保存到磁盘，以机器指纹 + 插件 TTL 判断是否可以直接复用。
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+
+from asset_table import rows_to_dicts
+from plugin_interface import BASEBOARD_QUERY, OPERATING_SYSTEM_QUERY
+
+CACHE_VERSION = 1
+SNAPSHOT_VERSION = 1
+DEFAULT_TTL = 24 * 3600  # 未继承 ScanPlugin 的对象没有 cache_ttl 时使用的默认有效期（秒）
+
+
+def default_cache_path():
+    base_dir = os.environ.get('LOCALAPPDATA') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base_dir, 'IT-Asset-Tool', 'scan_cache.json')
+
+
+def machine_fingerprint(wmi_connector):
+    """
+    用主板序列号、系统安装时间和上次开机时间计算一个廉价的机器指纹。
+    这两个查询与主板、操作系统扫描插件共用声明，因此不会产生额外的 WMI 往返。
+    重启、重装系统或更换主板后指纹都会变化，缓存随之整体失效。
+    """
+    board = wmi_connector.fetch(BASEBOARD_QUERY)
+    os_info = wmi_connector.fetch(OPERATING_SYSTEM_QUERY)
+    parts = [
+        (board[0].SerialNumber or '').strip() if board else '',
+        (os_info[0].InstallDate or '') if os_info else '',
+        (os_info[0].LastBootUpTime or '') if os_info else '',
+    ]
+    return hashlib.sha1('|'.join(parts).encode('utf-8')).hexdigest()
+
+
+def write_snapshot(path, data, host=None, **extra):
+    """把扫描结果写成 JSON 快照文件；extra 中的字段（如批量扫描的状态、重试次数）一并写入。"""
+    snapshot = {
+        'version': SNAPSHOT_VERSION,
+        'host': host or socket.gethostname(),
+        'generated_at': datetime.datetime.now().isoformat(timespec='seconds'),
+        **extra,
+        'data': rows_to_dicts(data or []),
+    }
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+    return path
+
+
+def read_snapshot(path):
+    """读取 write_snapshot 写出的快照文件并返回其内容（字典），资产行在 'data' 中；版本不符时抛出 ValueError。"""
+    with open(path, 'r', encoding='utf-8') as f:
+        snapshot = json.load(f)
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+        raise ValueError(f"不支持的快照格式: {path}")
+    return snapshot
+
+
+def plugin_cache_key(plugin):
+    return getattr(plugin, 'cache_key', None) or type(plugin).__name__
+
+
+class SnapshotCache:
+    """
+    磁盘上的扫描结果缓存，结构为 {插件: {fingerprint, saved_at, data}}。
+    条目在指纹不一致或超过插件的 cache_ttl 后视为过期；cache_ttl 为 0 的插件从不缓存。
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_cache_path()
+        self.hits = 0
+        self.misses = 0
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def get(self, fingerprint, plugin):
+        """返回插件仍然有效的缓存结果，没有或已过期时返回 None。"""
+        ttl = getattr(plugin, 'cache_ttl', DEFAULT_TTL)
+        with self._lock:
+            entry = self._load().get(plugin_cache_key(plugin)) if ttl else None
+            if entry and entry.get('fingerprint') == fingerprint and time.time() - entry.get('saved_at', 0) < ttl:
+                self.hits += 1
+                return entry.get('data')
+            self.misses += 1
+            return None
+
+    def put(self, fingerprint, plugin, data):
+        if not getattr(plugin, 'cache_ttl', DEFAULT_TTL):
+            return
+        with self._lock:
+            self._load()[plugin_cache_key(plugin)] = {
+                'fingerprint': fingerprint, 'saved_at': time.time(), 'data': rows_to_dicts(data)
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._save_locked()
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = json.load(f)
+                if content.get('version') == CACHE_VERSION:
+                    self._entries = content.get('entries', {})
+            except (OSError, ValueError):
+                pass  # 缓存文件不存在或已损坏时视为空缓存
+        return self._entries
+
+    def _save_locked(self):
+        if self._entries is None:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'entries': self._entries}, f, ensure_ascii=False)
+        os.replace(temp_path, self.path)
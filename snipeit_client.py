@@ -0,0 +1,480 @@
+# snipeit_client.py
+
+"""
+Snipe-IT API 的 HTTP 客户端：持有一个带连接池的 requests.Session，
+同一主机的请求复用 TCP/TLS 连接（keep-alive），并统计请求数与实际新建的连接数。
+"""
+
+import collections
+import email.utils
+import json
+import random
+import socket
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# 连接池缓存的主机数（内网 + 外网地址）
+DEFAULT_POOL_CONNECTIONS = 4
+# 每个主机保留的空闲连接数，应不小于并发请求数
+DEFAULT_POOL_MAXSIZE = 10
+# 普通 API 请求的超时（秒）
+DEFAULT_TIMEOUT = 10
+# 空闲连接开始发送 TCP keep-alive 探测前的等待时间（秒），防止被防火墙或反向代理静默断开
+DEFAULT_KEEPALIVE_IDLE = 60
+# 收到 429 后按 Retry-After 等待并重发的最大次数
+DEFAULT_RATE_LIMIT_RETRIES = 5
+# 429 响应没有可用的 Retry-After 头时的等待时间（秒）
+DEFAULT_RETRY_AFTER = 1.0
+# 幂等请求遇到 5xx 时的最大重试次数，以及指数退避的基数与上限（秒）
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE = 0.5
+DEFAULT_BACKOFF_MAX = 8.0
+# 重放不会产生副作用、可以自动重试的方法
+IDEMPOTENT_METHODS = ('GET', 'PUT', 'PATCH', 'DELETE')
+# 断路器：最近 window 个请求中至少 min_calls 个且失败率达到 threshold 时打开，cooldown 秒后放行一个试探请求
+DEFAULT_BREAKER_WINDOW = 20
+DEFAULT_BREAKER_MIN_CALLS = 5
+DEFAULT_BREAKER_THRESHOLD = 0.5
+DEFAULT_BREAKER_COOLDOWN = 30.0
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """断路器处于打开状态，请求未发送即失败。"""
+
+
+def backoff_delay(attempt, base=DEFAULT_BACKOFF_BASE, maximum=DEFAULT_BACKOFF_MAX):
+    """第 attempt 次重试（从 1 开始）前的等待时间：指数增长的上限内取随机值（full jitter）。"""
+    return random.uniform(0, min(maximum, base * 2 ** (attempt - 1)))
+
+
+def endpoint_label(method, url):
+    """用于统计的接口名，例如 'GET hardware/byserial'、'PATCH hardware/{id}'。"""
+    path = urlsplit(url).path
+    path = path.split('/api/v1/', 1)[1] if '/api/v1/' in path else path
+    parts = ['{id}' if part.isdigit() else part for part in path.strip('/').split('/')[:2]]
+    return f"{method} {'/'.join(parts)}"
+
+
+class CircuitBreaker:
+    """
+    单个主机的断路器。closed 状态下记录最近请求的成败；失败率超过阈值后打开，
+    打开期间所有请求直接抛出 CircuitOpenError；冷却结束后进入 half-open，只放行一个试探请求，
+    成功则关闭，失败则重新打开；试探请求没有得到结果（抛出了其它异常）时调用 release() 交还名额。
+    """
+
+    def __init__(self, window=DEFAULT_BREAKER_WINDOW, min_calls=DEFAULT_BREAKER_MIN_CALLS,
+                 threshold=DEFAULT_BREAKER_THRESHOLD, cooldown=DEFAULT_BREAKER_COOLDOWN):
+        self.min_calls = min_calls
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.opened_count = 0
+        self._outcomes = collections.deque(maxlen=window)
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_request(self):
+        """允许发送时返回本次请求是否为 half-open 状态下的试探请求，否则抛出 CircuitOpenError。"""
+        with self._lock:
+            if self.state == 'open':
+                if time.monotonic() - self._opened_at < self.cooldown:
+                    raise CircuitOpenError("断路器已打开：服务器近期错误率过高，暂停发送请求")
+                self.state = 'half-open'
+            if self.state == 'half-open':
+                if self._trial_in_flight:
+                    raise CircuitOpenError("断路器半开：正在等待试探请求的结果")
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def release(self):
+        """试探请求未调用 record() 就结束时交还试探名额，下一个请求重新试探，断路器不会卡在半开状态。"""
+        with self._lock:
+            if self.state == 'half-open':
+                self._trial_in_flight = False
+
+    def record(self, success):
+        with self._lock:
+            if self.state == 'half-open':
+                self._trial_in_flight = False
+                if success:
+                    self.state = 'closed'
+                    self._outcomes.clear()
+                else:
+                    self._open_locked()
+                return
+            self._outcomes.append(success)
+            failures = self._outcomes.count(False)
+            if len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.threshold:
+                self._open_locked()
+
+    def _open_locked(self):
+        self.state = 'open'
+        self.opened_count += 1
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+
+def is_transient_error(error):
+    """
+    连接错误、超时、断路器打开以及 429/5xx 响应是暂时性的，稍后重试可能成功；
+    其它 4xx（例如 422 数据校验失败、型号或类别不存在）重试也不会成功。
+    """
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, CircuitOpenError)):
+        return True
+    response = getattr(error, 'response', None)
+    if response is not None:
+        return response.status_code == 429 or response.status_code >= 500
+    return False
+
+
+def parse_retry_after(value, default=DEFAULT_RETRY_AFTER):
+    """解析 Retry-After 头：既可以是秒数，也可以是 HTTP 日期；无法解析时返回 default。"""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimiter:
+    """
+    线程安全的令牌桶限流器。rate 为每秒补充的令牌数（None 表示不限速），burst 为桶容量。
+    收到 429 时调用 pause()：所有线程在 Retry-After 指定的时间内都不再发送请求，之后从空桶重新开始。
+    """
+
+    def __init__(self, rate=None, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate or 1.0)
+        self.waited = 0.0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """取得一个令牌，必要时阻塞等待。"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                wait = self._paused_until - now
+                if wait <= 0:
+                    if not self.rate:
+                        return
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+                self.waited += wait
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        with self._lock:
+            now = time.monotonic()
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._tokens, self._updated = 0.0, self._paused_until
+
+
+def keepalive_socket_options(idle=DEFAULT_KEEPALIVE_IDLE):
+    """在 urllib3 默认套接字选项基础上开启 TCP keep-alive；平台不支持的细项会被跳过。"""
+    options = list(HTTPConnection.default_socket_options) + [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    if idle and hasattr(socket, 'TCP_KEEPIDLE'):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, int(idle)))
+    if idle and hasattr(socket, 'TCP_KEEPINTVL'):
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, int(idle) // 4)))
+    return options
+
+
+def _counting_pool_class(base, on_new_connection):
+    class CountingConnectionPool(base):
+        def _new_conn(self):
+            on_new_connection()
+            return super()._new_conn()
+
+    return CountingConnectionPool
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """记录新建连接数并为连接开启 TCP keep-alive 的 HTTPAdapter。"""
+
+    def __init__(self, on_new_connection, keepalive_idle=DEFAULT_KEEPALIVE_IDLE, **kwargs):
+        self._on_new_connection = on_new_connection
+        self._keepalive_idle = keepalive_idle
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault('socket_options', keepalive_socket_options(self._keepalive_idle))
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _counting_pool_class(HTTPConnectionPool, self._on_new_connection),
+            'https': _counting_pool_class(HTTPSConnectionPool, self._on_new_connection),
+        }
+
+
+class SnipeITClient:
+    """
+    Snipe-IT API 客户端。
+    pooled=False 时每个请求使用一次性的会话，行为等同于直接调用 requests.get/post，仅用于基准对比和排查问题。
+    所有请求先经过 limiter（RateLimiter）；收到 429 时按 Retry-After 暂停全部请求后重发，最多 rate_limit_retries 次。
+    幂等请求（GET/PUT/PATCH/DELETE）遇到 5xx 时按带随机抖动的指数退避重试，最多 max_retries 次；其它 4xx 不重试。
+    每个主机有各自的 CircuitBreaker，5xx、超时和连接错误计为失败，错误率过高时后续请求立即失败。
+    """
+
+    def __init__(self, headers=None, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 keepalive_idle=DEFAULT_KEEPALIVE_IDLE, timeout=DEFAULT_TIMEOUT, pooled=True, limiter=None,
+                 rate_limit_retries=DEFAULT_RATE_LIMIT_RETRIES, max_retries=DEFAULT_MAX_RETRIES,
+                 backoff_base=DEFAULT_BACKOFF_BASE, breaker_factory=CircuitBreaker):
+        self.headers = dict(headers or {})
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keepalive_idle = keepalive_idle
+        self.timeout = timeout
+        self.pooled = pooled
+        self.limiter = limiter or RateLimiter()
+        self.rate_limit_retries = rate_limit_retries
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.breaker_factory = breaker_factory
+        self.request_count = 0
+        self.connection_count = 0
+        self.rate_limited_count = 0
+        self.retry_count = 0
+        self._breakers = {}
+        self._endpoint_stats = {}
+        self._lock = threading.Lock()
+        self.session = self._new_session() if pooled else None
+
+    def _new_session(self):
+        session = requests.Session()
+        session.headers.update(self.headers)
+        adapter = PooledHTTPAdapter(self._count_connection, keepalive_idle=self.keepalive_idle,
+                                    pool_connections=self.pool_connections, pool_maxsize=self.pool_maxsize)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return session
+
+    def _count_connection(self):
+        with self._lock:
+            self.connection_count += 1
+
+    def request(self, method, url, payload=None, timeout=None, max_retries=None):
+        """
+        发送请求并返回 requests.Response；GET 的 payload 作为查询参数，其它方法作为 JSON 请求体。
+        max_retries 可覆盖 5xx 的重试次数，例如健康检查传入 0 以便尽快得到结果。
+        网络错误以 requests.exceptions.RequestException 抛出（断路器打开时为 CircuitOpenError），由调用方决定如何处理。
+        """
+        method = method.upper()
+        options = {'timeout': timeout or self.timeout}
+        if payload is not None:
+            if method == 'GET':
+                options['params'] = payload
+            else:
+                options['data'] = json.dumps(payload)
+        max_retries = self.max_retries if max_retries is None else max_retries
+        breaker = self.breaker(url)
+        label = endpoint_label(method, url)
+        rate_limited = server_errors = 0
+        while True:
+            trial = breaker.before_request()
+            recorded = False
+            try:
+                self.limiter.acquire()
+                with self._lock:
+                    self.request_count += 1
+                start = time.perf_counter()
+                try:
+                    response = self._send(method, url, options)
+                except requests.exceptions.RequestException:
+                    breaker.record(False)
+                    recorded = True
+                    self._record(label, time.perf_counter() - start)
+                    raise
+                self._record(label, time.perf_counter() - start)
+                if response.status_code == 429 and rate_limited < self.rate_limit_retries:
+                    rate_limited += 1
+                    with self._lock:
+                        self.rate_limited_count += 1
+                    self._record(label, retried=True)
+                    breaker.record(True)
+                    recorded = True
+                    self.limiter.pause(parse_retry_after(response.headers.get('Retry-After')))
+                    response.close()
+                    continue
+                breaker.record(response.status_code < 500)
+                recorded = True
+                if response.status_code >= 500 and method in IDEMPOTENT_METHODS and server_errors < max_retries:
+                    server_errors += 1
+                    with self._lock:
+                        self.retry_count += 1
+                    self._record(label, retried=True)
+                    response.close()
+                    time.sleep(backoff_delay(server_errors, self.backoff_base))
+                    continue
+                return response
+            finally:
+                if trial and not recorded:
+                    breaker.release()
+
+    def breaker(self, url):
+        """返回 url 所在主机的断路器。"""
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            if host not in self._breakers:
+                self._breakers[host] = self.breaker_factory()
+            return self._breakers[host]
+
+    def _record(self, label, latency=None, retried=False):
+        with self._lock:
+            entry = self._endpoint_stats.setdefault(label, {'requests': 0, 'retries': 0, 'total': 0.0, 'max': 0.0})
+            if retried:
+                entry['retries'] += 1
+            if latency is not None:
+                entry['requests'] += 1
+                entry['total'] += latency
+                entry['max'] = max(entry['max'], latency)
+
+    def endpoint_stats(self):
+        """按接口汇总的 {接口名: {requests, retries, avg, max}}，延迟单位为秒。"""
+        with self._lock:
+            return {label: {'requests': entry['requests'], 'retries': entry['retries'],
+                            'avg': entry['total'] / entry['requests'] if entry['requests'] else 0.0,
+                            'max': entry['max']}
+                    for label, entry in self._endpoint_stats.items()}
+
+    def _send(self, method, url, options):
+        if self.pooled:
+            return self.session.request(method, url, **options)
+        with self._new_session() as session:
+            return session.request(method, url, **options)
+
+    def get(self, url, params=None, timeout=None, max_retries=None):
+        return self.request('GET', url, payload=params, timeout=timeout, max_retries=max_retries)
+
+    def stats(self):
+        with self._lock:
+            return {'requests': self.request_count, 'connections': self.connection_count,
+                    'rate_limited': self.rate_limited_count, 'throttle_wait': self.limiter.waited,
+                    'retries': self.retry_count,
+                    'breaker_opened': sum(breaker.opened_count for breaker in self._breakers.values())}
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+
+
+# 分页拉取列表接口时每页的条数（Snipe-IT 默认允许的最大值）
+PAGE_LIMIT = 500
+
+
+def normalize_name(name):
+    """实体名称的规范化形式：合并空白并忽略大小写，与 Snipe-IT 判断重名的方式一致。"""
+    return ' '.join(str(name or '').split()).casefold()
+
+
+def normalize_serial(serial):
+    """序列号的比较形式：去掉首尾空白并统一大写。"""
+    return str(serial or '').strip().upper()
+
+
+def _comparable(value):
+    if isinstance(value, dict):
+        value = value.get('id', value.get('value'))
+    return '' if value is None else str(value).strip()
+
+
+def existing_asset_values(asset):
+    """把 Snipe-IT 返回的资产记录展开为与写入字段同名的扁平字典（model_id、自定义字段的数据库列名等）。"""
+    values = {key: value for key, value in asset.items() if not isinstance(value, (dict, list))}
+    if isinstance(asset.get('model'), dict):
+        values['model_id'] = asset['model'].get('id')
+    if isinstance(asset.get('status_label'), dict):
+        values['status_id'] = asset['status_label'].get('id')
+    for field in (asset.get('custom_fields') or {}).values():
+        if isinstance(field, dict) and field.get('field'):
+            values[field['field']] = field.get('value')
+    return values
+
+
+def asset_diff(existing, desired):
+    """返回 desired 中与已有资产记录取值不同的字段；两边都按去掉首尾空白的字符串比较。"""
+    current = existing_asset_values(existing)
+    return {key: value for key, value in desired.items() if _comparable(current.get(key)) != _comparable(value)}
+
+
+# Snipe-IT 自定义字段在数据库中的列名前缀，API 写入时必须使用列名而不是显示名称
+CUSTOM_FIELD_PREFIX = '_snipeit_'
+
+
+def parse_custom_fields(specs):
+    """
+    解析“类别=数据库列名”形式的自定义字段映射，返回 {类别: 列名}，例如 "CPU=_snipeit_cpu_1; 内存=_snipeit_ram_2"。
+    specs 可以是一个字符串或字符串列表（命令行每个 --custom-field 一项），条目之间可用逗号或分号分隔；
+    格式错误或列名不以 _snipeit_ 开头时抛出 ValueError。
+    """
+    if isinstance(specs, str):
+        specs = [specs]
+    mapping = {}
+    for spec in specs or ():
+        for item in spec.replace('；', ';').replace('，', ',').replace(',', ';').split(';'):
+            if not item.strip():
+                continue
+            category, sep, column = item.partition('=')
+            category, column = category.strip(), column.strip()
+            if not sep or not category or not column:
+                raise ValueError(f"自定义字段映射 '{item.strip()}' 应为 类别=数据库列名")
+            if not column.startswith(CUSTOM_FIELD_PREFIX):
+                raise ValueError(f"'{column}' 不是自定义字段的数据库列名（应以 {CUSTOM_FIELD_PREFIX} 开头）")
+            mapping[category] = column
+    return mapping
+
+
+class EntityIndex:
+    """
+    同步过程中使用的内存索引：{实体类型: {规范化名称: ID}}。
+    某类实体被完整预取后记入 loaded，此后该类型未命中即可确定服务器上不存在，无需再发 search 请求。
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self.loaded = set()
+        self._lock = threading.Lock()
+
+    def load(self, entity, rows):
+        with self._lock:
+            ids = self._ids.setdefault(entity, {})
+            for row in rows:
+                if row.get('name') and row.get('id') is not None:
+                    ids.setdefault(normalize_name(row['name']), row['id'])
+            self.loaded.add(entity)
+
+    def get(self, entity, name):
+        with self._lock:
+            return self._ids.get(entity, {}).get(normalize_name(name))
+
+    def add(self, entity, name, entity_id):
+        if entity_id is None:
+            return
+        with self._lock:
+            self._ids.setdefault(entity, {})[normalize_name(name)] = entity_id
+
+    def is_complete(self, entity):
+        with self._lock:
+            return entity in self.loaded
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(ids) for ids in self._ids.values())
@@ -0,0 +1,215 @@
+# snipeit_endpoint.py
+
+"""
+Snipe-IT 服务器地址选择：内网与外网地址同时探测，先返回健康响应的地址胜出。
+胜出的地址连同测得的延迟按 TTL 缓存到磁盘，有效期内直接使用并在后台重新验证；
+同步过程中当前地址出现连接错误时切换到另一个仍然可用的地址。
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+
+from snapshot_cache import default_cache_path
+
+ENDPOINT_CACHE_VERSION = 1
+# 缓存的胜出地址的有效期（秒）
+DEFAULT_ENDPOINT_TTL = 3600
+# 健康检查使用的接口
+PROBE_ENDPOINT = 'statuslabels'
+# 故障切换时连接失败的地址在这段时间内（秒）不再作为候选，之后重新参与探测；期间探测成功也会立即恢复
+FAILED_ENDPOINT_RETRY = 60
+
+
+def default_endpoint_cache_path():
+    return os.path.join(os.path.dirname(default_cache_path()), 'snipeit_endpoint.json')
+
+
+class Endpoint:
+    def __init__(self, label, url, timeout):
+        self.label = label
+        self.url = url
+        self.timeout = timeout
+
+
+class EndpointSelector:
+    """
+    在多个候选地址（例如内网 2 秒超时、外网 5 秒超时）之间选择可用的一个。
+    client 为 SnipeITClient；log_callback 接收与原先逐个探测时相同风格的日志。
+    """
+
+    def __init__(self, client, endpoints, cache_path=None, ttl=DEFAULT_ENDPOINT_TTL, log_callback=print):
+        self.client = client
+        self.endpoints = [e for e in endpoints if e.url]
+        self.cache_path = cache_path or default_endpoint_cache_path()
+        self.ttl = ttl
+        self.log = log_callback
+        self.active = None
+        self.latency = None
+        self._failed = {}  # {地址: 连接失败的时间}
+        self._lock = threading.Lock()
+        self._revalidation = None
+        self._failover_done = None  # 正在进行的故障切换完成时设置的 Event
+
+    @property
+    def cache_key(self):
+        return '|'.join(e.url.rstrip('/').lower() for e in self.endpoints)
+
+    def probe(self, endpoint):
+        """探测一个地址，返回延迟（秒）；不可用时抛出 requests.exceptions.RequestException。"""
+        start = time.perf_counter()
+        response = self.client.get(f"{endpoint.url.rstrip('/')}/api/v1/{PROBE_ENDPOINT}", timeout=endpoint.timeout,
+                                   max_retries=0)
+        response.raise_for_status()
+        latency = time.perf_counter() - start
+        with self._lock:
+            # 之前故障切换时失败的地址已恢复：重新作为候选地址，之后的故障切换可以再切回来
+            self._failed.pop(endpoint.url, None)
+        return latency
+
+    def select(self):
+        """返回选中的地址；有未过期的缓存时立即返回并在后台重新验证，否则同时探测所有候选地址。"""
+        cached = self._load_cached()
+        if cached:
+            self.active, self.latency = cached['url'], cached.get('latency')
+            self.log(f"  -> 使用缓存的地址 {self.active} (延迟 {self.latency * 1000:.0f}ms)，后台重新验证中。")
+            self._revalidation = threading.Thread(target=self._revalidate, name='snipeit-endpoint-probe', daemon=True)
+            self._revalidation.start()
+            return self.active
+        endpoint, latency = self._race(self.endpoints, verbose=True)
+        if endpoint is None:
+            return None
+        self._set_active(endpoint, latency)
+        return self.active
+
+    def failover(self, failed_url):
+        """
+        当前地址出现连接错误时调用：在其余候选地址中探测出可用的一个并切换过去，返回新的地址。
+        并发线程同时报告同一个地址失败时只会探测、切换一次，其余线程等待该次结果；没有可用地址时返回 None。
+        探测在锁外进行，期间其它线程读取或切换地址不会被阻塞，只在公布结果时持锁。
+        """
+        with self._lock:
+            if self.active != failed_url:
+                return self.active
+            self._failed[failed_url] = time.monotonic()
+            others = [e for e in self.endpoints if not self._recently_failed_locked(e.url)]
+            in_progress = self._failover_done
+            if in_progress is None:
+                self._failover_done = threading.Event()
+        if in_progress is not None:
+            in_progress.wait()
+            with self._lock:
+                return self.active if self.active != failed_url else None
+
+        endpoint = None
+        try:
+            endpoint, latency = self._race(others, verbose=False)
+        finally:
+            with self._lock:
+                if endpoint is not None and self.active == failed_url:
+                    self.log(f"  -> ⚠️ {failed_url} 连接失败，已切换到{endpoint.label} {endpoint.url}。")
+                    self._set_active_locked(endpoint, latency)
+                done, self._failover_done = self._failover_done, None
+                active = self.active
+            done.set()
+        return active if active != failed_url else None
+
+    def _race(self, endpoints, verbose):
+        """同时探测多个地址，返回最先健康响应的 (地址, 延迟)；全部失败时返回 (None, None)。"""
+        if not endpoints:
+            return None, None
+        pool = ThreadPoolExecutor(max_workers=len(endpoints), thread_name_prefix='snipeit-endpoint-probe')
+        try:
+            if verbose:
+                for endpoint in endpoints:
+                    self.log(f"  -> 正在尝试连接{endpoint.label}: {endpoint.url}...")
+            pending = {pool.submit(self.probe, endpoint): endpoint for endpoint in endpoints}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    endpoint = pending.pop(future)
+                    try:
+                        latency = future.result()
+                    except requests.exceptions.RequestException as e:
+                        if verbose:
+                            self.log(f"  -> ⚠️ {endpoint.label}连接失败: {e}")
+                        continue
+                    if verbose:
+                        self.log(f"  -> ✅ {endpoint.label}连接成功 ({latency * 1000:.0f}ms)，将使用此地址。")
+                    return endpoint, latency
+            return None, None
+        finally:
+            # 不等待较慢的探测结束，它们会在各自的超时内自行结束
+            pool.shutdown(wait=False)
+
+    def _revalidate(self):
+        endpoint, latency = self._race(self.endpoints, verbose=False)
+        with self._lock:
+            if endpoint is None:
+                self._drop_cached()
+            elif endpoint.url != self.active and not self._recently_failed_locked(self.active):
+                # 其它地址更快响应：下次同步时使用，本次不中途切换以免与进行中的请求冲突
+                self._save_cached(endpoint, latency)
+            elif endpoint.url == self.active:
+                self.latency = latency
+                self._save_cached(endpoint, latency)
+
+    def _recently_failed_locked(self, url):
+        failed_at = self._failed.get(url)
+        if failed_at is None:
+            return False
+        if time.monotonic() - failed_at < FAILED_ENDPOINT_RETRY:
+            return True
+        del self._failed[url]
+        return False
+
+    def _set_active(self, endpoint, latency):
+        with self._lock:
+            self._set_active_locked(endpoint, latency)
+
+    def _set_active_locked(self, endpoint, latency):
+        self.active, self.latency = endpoint.url, latency
+        self._save_cached(endpoint, latency)
+
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                content = json.load(f)
+            if content.get('version') == ENDPOINT_CACHE_VERSION:
+                return content.get('entries', {})
+        except (OSError, ValueError):
+            pass  # 缓存文件不存在或已损坏时重新探测
+        return {}
+
+    def _write_cache(self, entries):
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            temp_path = f"{self.cache_path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': ENDPOINT_CACHE_VERSION, 'entries': entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            pass  # 缓存写入失败不影响同步
+
+    def _load_cached(self):
+        if not self.ttl:
+            return None
+        entry = self._read_cache().get(self.cache_key)
+        urls = {e.url for e in self.endpoints}
+        if entry and entry.get('url') in urls and time.time() - entry.get('checked_at', 0) < self.ttl:
+            return entry
+        return None
+
+    def _save_cached(self, endpoint, latency):
+        entries = self._read_cache()
+        entries[self.cache_key] = {'url': endpoint.url, 'latency': latency, 'checked_at': time.time()}
+        self._write_cache(entries)
+
+    def _drop_cached(self):
+        entries = self._read_cache()
+        if entries.pop(self.cache_key, None) is not None:
+            self._write_cache(entries)
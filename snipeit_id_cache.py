@@ -0,0 +1,117 @@
+# snipeit_id_cache.py
+
+"""
+Snipe-IT 实体 ID 缓存：把 (服务器地址, 实体类型, 规范化名称) -> ID 的映射保存到磁盘，
+使每天定时运行的同步不必每次重新查询制造商、型号等实体。条目超过 TTL 后失效，
+ID 在服务器上已不存在（返回 404）时由调用方调用 invalidate() 删除。
+"""
+
+import json
+import os
+import threading
+import time
+
+from snapshot_cache import default_cache_path
+from snipeit_client import normalize_name
+
+CACHE_VERSION = 1
+DEFAULT_TTL = 7 * 24 * 3600  # 实体 ID 很少变化，默认缓存一周（秒）
+
+
+def default_id_cache_path():
+    return os.path.join(os.path.dirname(default_cache_path()), 'snipeit_ids.json')
+
+
+def _server_key(base_url):
+    return (base_url or '').rstrip('/').lower()
+
+
+class SnipeITIDCache:
+    """
+    磁盘上的实体 ID 缓存，结构为 {服务器地址: {实体类型: {规范化名称: [ID, saved_at]}}}。
+    不同服务器（内网与外网地址视为不同服务器）的条目互不影响。
+    """
+
+    def __init__(self, path=None, ttl=DEFAULT_TTL):
+        self.path = path or default_id_cache_path()
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def get(self, base_url, entity, name):
+        """返回仍在有效期内的 ID，没有或已过期时返回 None。"""
+        with self._lock:
+            record = self._table(base_url, entity).get(normalize_name(name))
+            if record and time.time() - record[1] < self.ttl:
+                self.hits += 1
+                return record[0]
+            self.misses += 1
+            return None
+
+    def has_entries(self, base_url, entity):
+        """该服务器的这类实体是否有未过期的条目。"""
+        now = time.time()
+        with self._lock:
+            return any(now - saved_at < self.ttl for _, saved_at in self._table(base_url, entity).values())
+
+    def put(self, base_url, entity, name, entity_id):
+        if entity_id is None:
+            return
+        with self._lock:
+            self._table(base_url, entity, create=True)[normalize_name(name)] = [entity_id, time.time()]
+            self._dirty = True
+
+    def invalidate(self, base_url, entity, entity_id):
+        """删除指向 entity_id 的所有条目，用于 ID 已在服务器上被删除的情况。"""
+        with self._lock:
+            table = self._table(base_url, entity)
+            for name in [n for n, record in table.items() if record[0] == entity_id]:
+                del table[name]
+                self._dirty = True
+
+    def clear(self):
+        with self._lock:
+            self._entries = {}
+            self._dirty = True
+        self.save()
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or self._entries is None:
+                return
+            now = time.time()
+            # 写回前顺带清理过期条目，防止文件无限增长
+            for server in self._entries.values():
+                for table in server.values():
+                    for name in [n for n, record in table.items() if now - record[1] >= self.ttl]:
+                        del table[name]
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'entries': self._entries}, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+            self._dirty = False
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def _table(self, base_url, entity, create=False):
+        entries = self._load()
+        if not create:
+            return entries.get(_server_key(base_url), {}).get(entity, {})
+        return entries.setdefault(_server_key(base_url), {}).setdefault(entity, {})
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    content = json.load(f)
+                if content.get('version') == CACHE_VERSION:
+                    self._entries = content.get('entries', {})
+            except (OSError, ValueError):
+                pass  # 缓存文件不存在或已损坏时视为空缓存
+        return self._entries
@@ -0,0 +1,205 @@
+# snipeit_outbox.py
+
+"""
+Snipe-IT 同步的离线发件箱：服务器不可达（例如笔记本不在 VPN 内）时，把待同步的资产记录到磁盘，
+下次能连上服务器时分批重放。发件箱按序列号压缩——同一序列号的多次扫描只保留最新的一次 upsert，
+每个操作带有由序列号和内容计算的幂等键，重放时只会删除与取出时内容一致的操作。
+只有暂时性的失败会留在发件箱中退避重试；永久性错误或重试次数达到 max_attempts 的操作移入死信列表，不再重放。
+磁盘上是只追加的 JSON Lines 日志：每次修改只追加一行，加载时按顺序重放并在日志明显膨胀时压缩重写，
+因此逐台入队、重放 N 台资产写出的数据量与 N 成正比，而不是每次都重写整个文件。
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from asset_table import rows_to_dicts
+from snapshot_cache import default_cache_path
+from snipeit_client import normalize_serial
+
+OUTBOX_VERSION = 2
+# 重放失败后的首次重试间隔与最大间隔（秒），每失败一次间隔翻倍
+DEFAULT_BASE_DELAY = 5 * 60
+DEFAULT_MAX_DELAY = 6 * 3600
+# 同一操作最多重放的次数，超过后移入死信列表
+DEFAULT_MAX_ATTEMPTS = 8
+# 死信列表保留的最近条目数
+DEAD_LETTER_LIMIT = 500
+# 加载时日志行数超过有效记录数的 2 倍且不少于该值时压缩重写
+COMPACT_MIN_LINES = 200
+
+_encode = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=str).encode
+
+
+def default_outbox_path():
+    return os.path.join(os.path.dirname(default_cache_path()), 'snipeit_outbox.jsonl')
+
+
+def idempotency_key(serial, rows):
+    content = json.dumps(rows, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha1(f"{normalize_serial(serial)}|{content}".encode('utf-8')).hexdigest()
+
+
+class SyncOutbox:
+    """
+    磁盘上的待同步操作队列，结构为 {规范化序列号: {key, serial, rows, queued_at, attempts, next_attempt, error}}。
+    rows 是该资产的“主板/整机”行以及属于它的配件行，重放时原样交给同步流程。
+    放弃重放的操作连同最后的错误信息保存在同一文件的死信列表中，供管理员排查后手动处理。
+    日志第一行为版本头，之后每行是一条修改记录：
+      put（入队，带完整操作）、retry（失败后推迟，只带次数与时间）、done（完成或丢弃）、dead（移入死信列表）。
+    每次修改立即追加到磁盘，进程被强制结束也不会丢失已入队的操作；写到一半的最后一行在加载时忽略。
+    """
+
+    def __init__(self, path=None, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = path or default_outbox_path()
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_attempts = max(1, int(max_attempts))
+        self._entries = None
+        self._dead_letters = []
+        self._rewrite = False  # 磁盘上的文件不是当前版本的日志，下次写入时整体重写
+        self._lock = threading.Lock()
+
+    def enqueue(self, serial, rows):
+        """加入一个 upsert 操作并返回其幂等键；同一序列号已有待处理操作时用新内容替换。"""
+        return self.enqueue_many([(serial, rows)])[0]
+
+    def enqueue_many(self, items):
+        """批量入队 [(序列号, rows), ...]，只追加写一次，返回各操作的幂等键。"""
+        records, keys = [], []
+        now = time.time()
+        for serial, rows in items:
+            rows = rows_to_dicts(rows)
+            key = idempotency_key(serial, rows)
+            keys.append(key)
+            records.append({'op': 'put', 'serial': normalize_serial(serial), 'entry': {
+                'key': key, 'serial': serial, 'rows': rows, 'queued_at': now,
+                'attempts': 0, 'next_attempt': 0, 'error': None,
+            }})
+        with self._lock:
+            self._load()
+            for record in records:
+                self._apply(record)
+            self._append_locked(records)
+        return keys
+
+    def due(self, limit=None, exclude=()):
+        """返回已到重试时间的操作（按入队时间排序），exclude 为需要跳过的规范化序列号。"""
+        now = time.time()
+        with self._lock:
+            ops = [dict(op) for serial, op in self._load().items()
+                   if serial not in exclude and op.get('next_attempt', 0) <= now]
+        ops.sort(key=lambda op: op['queued_at'])
+        return ops[:limit] if limit else ops
+
+    def complete(self, op):
+        """操作已成功同步；如果期间同一序列号被新的扫描替换，则保留新的操作。"""
+        with self._lock:
+            serial = normalize_serial(op['serial'])
+            if self._load().get(serial, {}).get('key') == op['key']:
+                self._commit_locked({'op': 'done', 'serial': serial})
+
+    def fail(self, op, error=None, retryable=True):
+        """
+        记录一次失败：暂时性失败按指数退避推迟下一次重试；永久性失败（retryable=False）
+        或重试次数达到 max_attempts 时移入死信列表。返回该操作是否被移入死信列表。
+        """
+        with self._lock:
+            serial = normalize_serial(op['serial'])
+            current = self._load().get(serial)
+            if not current or current.get('key') != op['key']:
+                return False
+            attempts = current.get('attempts', 0) + 1
+            if not retryable or attempts >= self.max_attempts:
+                entry = dict(current, attempts=attempts, error=error, failed_at=time.time())
+                self._commit_locked({'op': 'dead', 'serial': serial, 'entry': entry})
+                return True
+            delay = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+            self._commit_locked({'op': 'retry', 'serial': serial, 'attempts': attempts, 'error': error,
+                                 'next_attempt': time.time() + delay})
+            return False
+
+    def dead_letters(self):
+        """已放弃重放的操作（按移入时间排序），每项含 serial、rows、attempts、error、failed_at。"""
+        with self._lock:
+            self._load()
+            return [dict(op) for op in self._dead_letters]
+
+    def discard(self, serial):
+        with self._lock:
+            serial = normalize_serial(serial)
+            if serial in self._load():
+                self._commit_locked({'op': 'done', 'serial': serial})
+
+    def __len__(self):
+        with self._lock:
+            return len(self._load())
+
+    def _apply(self, record):
+        """把一条日志记录应用到内存中的队列。"""
+        kind, serial = record.get('op'), record.get('serial')
+        if kind == 'put':
+            self._entries[serial] = record['entry']
+        elif kind == 'done':
+            self._entries.pop(serial, None)
+        elif kind == 'retry' and serial in self._entries:
+            self._entries[serial].update(attempts=record['attempts'], error=record.get('error'),
+                                         next_attempt=record['next_attempt'])
+        elif kind == 'dead':
+            self._entries.pop(serial, None)
+            self._dead_letters.append(record['entry'])
+            del self._dead_letters[:-DEAD_LETTER_LIMIT]
+
+    def _commit_locked(self, record):
+        self._apply(record)
+        self._append_locked([record])
+
+    def _load(self):
+        if self._entries is None:
+            self._entries, self._dead_letters = {}, []
+            lines = 0
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    header = json.loads(f.readline() or '{}')
+                    self._rewrite = header.get('version') != OUTBOX_VERSION
+                    if not self._rewrite:
+                        for line in f:
+                            lines += 1
+                            try:
+                                self._apply(json.loads(line))
+                            except (ValueError, KeyError, TypeError, AttributeError):
+                                # 进程中断时写了一半的行；重写日志，避免后续追加的记录接在它后面
+                                self._rewrite = True
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError):
+                self._rewrite = True  # 发件箱文件已损坏时视为空队列
+            if lines > max(COMPACT_MIN_LINES, 2 * (len(self._entries) + len(self._dead_letters))):
+                try:
+                    self._compact_locked()
+                except OSError:
+                    pass  # 压缩失败不影响使用，下次加载时再试
+        return self._entries
+
+    def _compact_locked(self):
+        """只保留当前的有效记录，写入临时文件后整体替换日志。"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8', newline='\n') as f:
+            f.write(_encode({'version': OUTBOX_VERSION}) + '\n')
+            for entry in self._dead_letters:
+                f.write(_encode({'op': 'dead', 'serial': normalize_serial(entry.get('serial')), 'entry': entry}) + '\n')
+            for serial, entry in self._entries.items():
+                f.write(_encode({'op': 'put', 'serial': serial, 'entry': entry}) + '\n')
+        os.replace(temp_path, self.path)
+        self._rewrite = False
+
+    def _append_locked(self, records):
+        if self._rewrite or not os.path.exists(self.path):
+            self._compact_locked()  # 新建日志：写入版本头与当前全部记录
+            return
+        with open(self.path, 'a', encoding='utf-8', newline='\n') as f:
+            f.write(''.join(_encode(record) + '\n' for record in records))
@@ -0,0 +1,92 @@
+# snipeit_planner.py
+
+"""
+Snipe-IT 同步计划：先只读地查询服务器现状，把扫描数据整理成去重后的操作清单
+（需要新建的制造商、型号，需要新建或 PATCH 的资产），并估算写请求数与耗时；
+执行时按 制造商 -> 型号 -> 资产 的依赖顺序只发送必要的写请求。dry-run 只输出计划，不写入任何数据。
+"""
+
+import math
+
+from snipeit_client import normalize_name
+
+# 依赖顺序：型号依赖制造商，资产依赖型号
+ENTITY_ORDER = ('manufacturers', 'models')
+# 资产操作
+CREATE, PATCH, UNCHANGED, FAILED = 'create', 'patch', 'unchanged', 'failed'
+# 计划中尚未创建的型号在 PATCH 字段中的占位值
+PENDING_ID = '<待创建>'
+
+
+class SyncPlan:
+    """
+    一次同步的执行计划。
+    entities: {实体类型: {规范化名称: {'name', 'manufacturer'(仅型号)}}}，每个名称只创建一次；
+    jobs: 同步任务列表，规划后每个任务带有 action（create/patch/unchanged/failed）及 changes、error 等字段。
+    """
+
+    def __init__(self, jobs=()):
+        self.entities = {endpoint: {} for endpoint in ENTITY_ORDER}
+        self.jobs = list(jobs)
+        self.read_calls = 0      # 截至规划完成时发送的读请求数
+        self.read_seconds = 0.0  # 规划阶段耗时（秒）
+
+    def add_entity(self, endpoint, name, **details):
+        self.entities[endpoint].setdefault(normalize_name(name), dict(details, name=name))
+
+    def jobs_with(self, action):
+        return [job for job in self.jobs if job.get('action') == action]
+
+    def counts(self):
+        counts = {action: 0 for action in (CREATE, PATCH, UNCHANGED, FAILED)}
+        for job in self.jobs:
+            counts[job.get('action', FAILED)] += 1
+        return counts
+
+    @property
+    def write_calls(self):
+        counts = self.counts()
+        return sum(len(entities) for entities in self.entities.values()) + counts[CREATE] + counts[PATCH]
+
+    def estimate_seconds(self, latency, concurrency, rate_limit=None):
+        """
+        估算执行阶段的耗时：各阶段按并发数分轮执行，每轮耗时取平均请求延迟；
+        设置了客户端限速时，不会快于 写请求数 / 速率。
+        """
+        concurrency = max(1, concurrency)
+        counts = self.counts()
+        phases = [len(self.entities[endpoint]) for endpoint in ENTITY_ORDER] + [counts[CREATE] + counts[PATCH]]
+        seconds = sum(math.ceil(size / concurrency) for size in phases) * latency
+        if rate_limit:
+            seconds = max(seconds, self.write_calls / rate_limit)
+        return seconds
+
+    def summary_lines(self, latency, concurrency, rate_limit=None):
+        counts = self.counts()
+        lines = []
+        for endpoint, label in zip(ENTITY_ORDER, ('制造商', '型号')):
+            names = [entity['name'] for entity in self.entities[endpoint].values()]
+            lines.append(f"  新建{label} {len(names)} 个" + (f": {', '.join(names)}" if names else ""))
+        lines.append(f"  新建资产 {counts[CREATE]} 台，更新资产 {counts[PATCH]} 台，"
+                     f"无变化 {counts[UNCHANGED]} 台，无法处理 {counts[FAILED]} 台")
+        lines.append(f"  已发送读请求 {self.read_calls} 个 (规划耗时 {self.read_seconds:.1f}s)；"
+                     f"执行需要写请求 {self.write_calls} 个，预计耗时 "
+                     f"{self.estimate_seconds(latency, concurrency, rate_limit):.1f}s")
+        return lines
+
+    def detail_lines(self, limit=None):
+        """逐台资产的计划操作，用于 dry-run 输出。"""
+        lines = []
+        for job in self.jobs:
+            serial = job['asset'].get('序列号')
+            action = job.get('action')
+            if action == CREATE:
+                lines.append(f"  + {serial}: 新建 ({job['model']})")
+            elif action == PATCH:
+                changes = ', '.join(f"{key}={value}" for key, value in job['changes'].items())
+                lines.append(f"  ~ {serial}: 更新 {changes}")
+            elif action == FAILED:
+                lines.append(f"  ! {serial}: {job.get('error') or '无法处理'}")
+        if limit and len(lines) > limit:
+            lines = lines[:limit] + [f"  ... 其余 {len(lines) - limit} 条未列出。"]
+        return lines
@@ -0,0 +1,182 @@
+# wmi_broker.py
+
+"""
+WMI 查询代理：位于插件与 WMI 连接之间，在一次会话内对相同的 (命名空间, 类, 过滤条件) 查询只执行一次。
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+
+from plugin_interface import WMIQuery
+
+DEFAULT_NAMESPACE = 'root\\cimv2'
+
+
+def default_connector_factory(namespace=None):
+    """创建一个连接到本机指定命名空间的 WMI 连接。"""
+    import wmi
+    if namespace and namespace != DEFAULT_NAMESPACE:
+        return wmi.WMI(namespace=namespace)
+    return wmi.WMI()
+
+
+def remote_connector_factory(computer, user=None, password=None):
+    """
+    返回连接到远程计算机的连接器工厂，签名与 default_connector_factory 相同。
+    扫描引擎会为该主机的每个工作线程调用一次，各自建立独立的 DCOM 连接。
+    """
+
+    def factory(namespace=None):
+        import wmi
+        options = {'computer': computer}
+        if user:
+            options.update(user=user, password=password or '')
+        if namespace and namespace != DEFAULT_NAMESPACE:
+            options['namespace'] = namespace
+        return wmi.WMI(**options)
+
+    return factory
+
+
+def normalize_namespace(namespace):
+    """把 'wmi'、'root/wmi'、'ROOT\\WMI' 等写法统一为 'root\\wmi'。"""
+    if not namespace:
+        return DEFAULT_NAMESPACE
+    namespace = namespace.replace('/', '\\').strip('\\').lower()
+    if not namespace.startswith('root'):
+        namespace = f"root\\{namespace}"
+    return namespace
+
+
+def materialize(wmi_object, properties=()):
+    """
+    把 WMI 对象的属性读取为普通 Python 对象；指定 properties 时只读取这些属性。
+    COM 对象不能跨线程（套间）使用，而物化后的快照可以在所有扫描线程间安全共享。
+    """
+    if properties:
+        names = properties
+    elif hasattr(wmi_object, 'properties'):
+        names = list(wmi_object.properties)
+    else:
+        names = list(vars(wmi_object))
+    return SimpleNamespace(**{name: getattr(wmi_object, name, None) for name in names})
+
+
+class WMINamespaceView:
+    """绑定到某个命名空间的代理视图，用法与 wmi.WMI() 连接相同：view.Win32_Xxx(**filters)。"""
+
+    def __init__(self, broker, namespace):
+        self._broker = broker
+        self._namespace = namespace
+
+    def query(self, class_name, cache=True, properties=(), where=None, **filters):
+        return self._broker.query(class_name, namespace=self._namespace, cache=cache,
+                                  properties=properties, where=where, **filters)
+
+    def fetch(self, wmi_query, cache=True):
+        if wmi_query.namespace is None:
+            wmi_query = WMIQuery(wmi_query.class_name, wmi_query.properties, wmi_query.where, self._namespace)
+        return self._broker.fetch(wmi_query, cache=cache)
+
+    def namespace(self, namespace):
+        return self._broker.namespace(namespace)
+
+    def __getattr__(self, class_name):
+        if class_name.startswith('_'):
+            raise AttributeError(class_name)
+        return lambda **filters: self.query(class_name, **filters)
+
+
+class WMIQueryBroker:
+    """
+    会话级 WMI 查询代理。
+    - 每个线程按命名空间持有自己的连接（COM 对象不能跨线程共享）；
+    - 查询以 WQL 形式下发，只选取声明的属性，过滤条件下推到 WHERE 子句；
+    - 结果被物化后按 (命名空间, 类, 过滤条件) 缓存，同一会话内每个类只向 WMI 请求一次；
+      已缓存的属性集合覆盖了新请求的属性时直接命中，否则按属性并集重新查询一次；
+    - 并发请求同一查询时，只有一个线程真正执行，其余线程等待并复用结果；
+    - 通过 hits / misses 计数器和 timings 记录确认节省了多少次 COM 往返。
+    """
+
+    def __init__(self, connector_factory=None):
+        self.connector_factory = connector_factory or default_connector_factory
+        self.hits = 0
+        self.misses = 0
+        self.timings = []  # [(命名空间, WQL, 耗时秒数, 返回行数)]
+        self._local = threading.local()
+        self._cache = {}
+        self._key_locks = {}
+        self._lock = threading.Lock()
+
+    def connector(self, namespace=None):
+        """返回当前线程在指定命名空间下的连接，必要时新建。"""
+        namespace = normalize_namespace(namespace)
+        connectors = getattr(self._local, 'connectors', None)
+        if connectors is None:
+            connectors = self._local.connectors = {}
+        if namespace not in connectors:
+            connectors[namespace] = self.connector_factory(namespace=namespace)
+        return connectors[namespace]
+
+    def release(self):
+        """释放当前线程持有的所有连接。必须在该线程调用 CoUninitialize 之前调用。"""
+        self._local.connectors = {}
+
+    def namespace(self, namespace):
+        """返回绑定到指定命名空间的视图，例如 broker.namespace('wmi').WmiMonitorID()。"""
+        return WMINamespaceView(self, normalize_namespace(namespace))
+
+    def query(self, class_name, namespace=None, cache=True, properties=(), where=None, **filters):
+        """
+        查询指定 WMI 类并返回物化后的对象列表，兼容 wmi 模块 Win32_Xxx(**filters) 的等值过滤写法。
+        cache=False 用于服务状态、事件日志等易变数据，每次都直接查询且不写入缓存。
+        """
+        return self.fetch(WMIQuery(class_name, properties, where or filters or None, namespace), cache=cache)
+
+    def fetch(self, wmi_query, cache=True):
+        """执行插件声明的 WMIQuery 并返回物化后的对象列表。"""
+        namespace = normalize_namespace(wmi_query.namespace)
+        requested = frozenset(wmi_query.properties) or None
+        if not cache:
+            return self._fetch(namespace, wmi_query, wmi_query.properties)
+
+        key = (namespace, wmi_query.class_name.lower(), wmi_query.where_clause())
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached and (cached[0] is None or (requested is not None and requested <= cached[0])):
+                    self.hits += 1
+                    return list(cached[1])
+                self.misses += 1
+            if requested is None or cached is None:
+                covered = requested
+            else:
+                covered = None if cached[0] is None else requested | cached[0]
+            rows = self._fetch(namespace, wmi_query, tuple(sorted(covered)) if covered else ())
+            with self._lock:
+                self._cache[key] = (covered, rows)
+            return list(rows)
+
+    def stats(self):
+        """返回缓存命中统计。"""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._cache)}
+
+    def _fetch(self, namespace, wmi_query, properties):
+        wql = wmi_query.wql(properties)
+        start = time.perf_counter()
+        rows = [materialize(obj, properties) for obj in self.connector(namespace).query(wql)]
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self.timings.append((namespace, wql, elapsed, len(rows)))
+        return rows
+
+    def __getattr__(self, class_name):
+        # 兼容插件中 wmi_connector.Win32_Xxx(**filters) 的写法
+        if class_name.startswith('_'):
+            raise AttributeError(class_name)
+        return lambda **filters: self.query(class_name, **filters)
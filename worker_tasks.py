@@ -0,0 +1,103 @@
+# worker_tasks.py
+
+"""
+后台任务函数与无界面的日志/进度输出。
+任务函数的第一个参数永远是 worker：既可以是 main.Worker (Qt 信号)，也可以是 HeadlessWorker (普通回调)，
+因此图形界面和命令行入口共用同一套扫描、诊断、导出逻辑，本模块不导入任何 GUI 库。
+"""
+
+import threading
+import traceback
+
+from scan_engine import ScanEngine
+from wmi_broker import WMIQueryBroker
+
+
+class CallbackSignal:
+    """与 Qt Signal.emit 接口一致的简单回调包装。"""
+
+    def __init__(self, callback=None):
+        self.callback = callback
+
+    def emit(self, *args):
+        if self.callback:
+            self.callback(*args)
+
+
+class HeadlessWorker:
+    """
+    与 main.Worker 具有相同信号属性的无界面 worker，
+    log_message / progress_update / error_message 都转发给普通回调函数。
+    """
+
+    def __init__(self, log_callback=print, progress_callback=None):
+        self.log_message = CallbackSignal(log_callback)
+        self.progress_update = CallbackSignal(progress_callback)
+        self.error_message = CallbackSignal(lambda title, text: log_callback(f"{title}: {text}"))
+        self.cancel_event = threading.Event()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+
+def _scan_worker_task_plugin(worker, scan_plugins, wmi_broker=None, snapshot_cache=None, force_refresh=False,
+                             engine=None):
+    log_signal, progress_signal = worker.log_message.emit, worker.progress_update.emit
+    if len(scan_plugins) == 0: return []
+    log_signal("正在连接 WMI 核心服务...")
+    engine = engine or ScanEngine()
+    return engine.run(scan_plugins, log_signal, progress_signal, broker=wmi_broker, cache=snapshot_cache,
+                      force_refresh=force_refresh, cancel_event=getattr(worker, 'cancel_event', None))
+
+
+def _diagnostics_worker_task(worker, diag_plugins, wmi_broker=None):
+    log_signal = worker.log_message.emit
+    all_results = {}
+    wmi_broker = wmi_broker or WMIQueryBroker()
+    for plugin in diag_plugins:
+        plugin_name = getattr(plugin, 'name', '未命名插件')
+        log_signal(f"--- 正在运行诊断: {plugin_name} ---")
+        try:
+            results = plugin.run_diagnostic(wmi_broker)
+            all_results[plugin_name] = results
+            log_signal(f"✅ 模块 '{plugin_name}' 诊断完成。")
+        except Exception as e:
+            log_signal(f"❌ 模块 '{plugin.name}' 诊断失败: {e}")
+            all_results[plugin_name] = [{'task': '插件执行', 'status': '错误', 'message': str(e)}]
+    # 释放本线程的 WMI 连接，必须在 Worker 调用 CoUninitialize 之前完成
+    wmi_broker.release()
+    stats = wmi_broker.stats()
+    log_signal(f"WMI 查询缓存: 命中 {stats['hits']} 次，实际查询 {stats['misses']} 次。")
+    return all_results
+
+
+def _export_worker_task(worker, plugin, data, file_path, header_text, printer_name):
+    result = None
+    try:
+        worker.log_message.emit(f"  -> 正在尝试调用插件 '{getattr(plugin, 'name', '未命名插件')}'...")
+        try:
+            result = plugin.export(data, file_path, header_text, worker.log_message.emit, printer_name)
+        except TypeError:
+            try:
+                result = plugin.export(data, file_path, header_text, worker.log_message.emit)
+            except TypeError:
+                try:
+                    result = plugin.export(data, file_path, header_text)
+                except TypeError as final_e:
+                    worker.log_message.emit(
+                        f"❌ 插件 '{getattr(plugin, 'name', '未知插件')}' 的调用失败，参数不匹配。最终错误: {final_e}")
+    except Exception as general_e:
+        worker.log_message.emit(f"❌ 插件 {getattr(plugin, 'name', '未知插件')} 导出时发生内部错误: {general_e}")
+        worker.log_message.emit(traceback.format_exc())
+    return result
+
+
+def _sync_worker_task(worker, plugin, data, config):
+    """调用同步插件；config 中 dry_run 为 True 时插件只输出同步计划，不写入服务器。"""
+    try:
+        plugin.sync(worker, data, config)
+        return True
+    except Exception as e:
+        worker.log_message.emit(f"❌ 插件 {getattr(plugin, 'name', '未知插件')} 同步时发生内部错误: {e}")
+        worker.log_message.emit(traceback.format_exc())
+        return False